@@ -0,0 +1,242 @@
+"""Накопительная статистика тренировок по пользователям.
+
+Aggregator принимает события (пользователь, время, результат)
+и за O(1) обновляет итоги по типу тренировки: за всё время и в окнах
+день/неделя/месяц. Запросы отвечают по готовым суммам без пересчёта
+истории. Время - секунды Unix в UTC.
+"""
+import calendar
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Hashable, Optional
+
+from homework import InfoMessage, Training
+
+SECONDS_IN_DAY = 24 * 60 * 60
+# 1 января 1970 - четверг, сдвиг выравнивает недели по понедельникам
+WEEK_SHIFT_DAYS = 3
+PERIODS = ('day', 'week', 'month')
+# Сколько последних окон каждого вида хранить для пользователя
+KEEP_WINDOWS = {'day': 62, 'week': 26, 'month': 24}
+
+
+class Totals:
+    """Суммы показателей группы тренировок."""
+    __slots__ = ('count', 'duration', 'distance', 'speed', 'calories')
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.duration = 0.0
+        self.distance = 0.0
+        self.speed = 0.0
+        self.calories = 0.0
+
+    def add(self, info_message: InfoMessage) -> None:
+        """Учесть одну тренировку."""
+        self.count += 1
+        self.duration += info_message.duration
+        self.distance += info_message.distance
+        self.speed += info_message.speed
+        self.calories += info_message.calories
+
+    def merge(self, other: 'Totals') -> None:
+        """Прибавить суммы другой группы."""
+        self.count += other.count
+        self.duration += other.duration
+        self.distance += other.distance
+        self.speed += other.speed
+        self.calories += other.calories
+
+    @property
+    def mean_speed(self) -> float:
+        """Средняя скорость по тренировкам группы."""
+        return self.speed / self.count if self.count else 0.0
+
+    @property
+    def mean_calories(self) -> float:
+        """Средние затраты калорий на тренировку."""
+        return self.calories / self.count if self.count else 0.0
+
+    def as_dict(self) -> dict:
+        """Суммы и средние в виде словаря."""
+        return {'count': self.count, 'duration': self.duration,
+                'distance': self.distance, 'calories': self.calories,
+                'mean_speed': self.mean_speed,
+                'mean_calories': self.mean_calories}
+
+    def __getstate__(self) -> tuple:
+        # Кортеж вместо словаря слотов: pickle вдвое быстрее
+        return (self.count, self.duration, self.distance, self.speed,
+                self.calories)
+
+    def __setstate__(self, state: tuple) -> None:
+        (self.count, self.duration, self.distance, self.speed,
+         self.calories) = state
+
+    def __repr__(self) -> str:
+        return f'Totals({self.as_dict()})'
+
+
+@lru_cache(maxsize=4096)
+def month_index(day: int) -> int:
+    """Номер месяца от начала эпохи для номера дня."""
+    moment = time.gmtime(day * SECONDS_IN_DAY)
+    return (moment.tm_year - 1970) * 12 + moment.tm_mon - 1
+
+
+def window_indexes(timestamp: float) -> tuple:
+    """Номера окон день, неделя и месяц, в которые попадает timestamp."""
+    day = int(timestamp // SECONDS_IN_DAY)
+    return day, (day + WEEK_SHIFT_DAYS) // 7, month_index(day)
+
+
+def window_start(period: str, index: int) -> float:
+    """Время начала окна period с номером index."""
+    if period == 'day':
+        return float(index * SECONDS_IN_DAY)
+    if period == 'week':
+        return float((index * 7 - WEEK_SHIFT_DAYS) * SECONDS_IN_DAY)
+    year, month = divmod(index, 12)
+    return float(calendar.timegm((1970 + year, month + 1, 1, 0, 0, 0)))
+
+
+class Aggregator:
+    """Накопительные итоги тренировок по пользователям и окнам времени.
+
+    Для каждого пользователя хранятся итоги за всё время и последние
+    keep[period] окон каждого вида. Окно, вытесненное более новым,
+    удаляется; опоздавшие события в удалённые окна не попадают
+    и считаются в dropped, хотя итоги за всё время учитывают их.
+    """
+
+    def __init__(self, keep: Optional[dict] = None) -> None:
+        self.keep = dict(KEEP_WINDOWS, **(keep or {}))
+        self.totals = {}
+        self.windows = {period: {} for period in PERIODS}
+        self.events = 0
+        self.dropped = 0
+
+    def add(self, user_id: Hashable, timestamp: float,
+            info_message: InfoMessage) -> None:
+        """Учесть результат тренировки пользователя.
+
+        Время не числом или вне календаря и нехэшируемый пользователь
+        вызывают исключение до того, как итоги изменятся.
+        """
+        indexes = window_indexes(timestamp)
+        training_type = info_message.training_type
+        user_totals = self.totals.get(user_id)
+        if user_totals is None:
+            user_totals = self.totals[user_id] = {}
+        self.events += 1
+        totals = user_totals.get(training_type)
+        if totals is None:
+            totals = user_totals[training_type] = Totals()
+        totals.add(info_message)
+        for period, index in zip(PERIODS, indexes):
+            window = self.window_totals(period, user_id, index)
+            if window is None:
+                self.dropped += 1
+                continue
+            totals = window.get(training_type)
+            if totals is None:
+                totals = window[training_type] = Totals()
+            totals.add(info_message)
+
+    def add_training(self, user_id: Hashable, timestamp: float,
+                     training: Training) -> None:
+        """Учесть тренировку пользователя."""
+        self.add(user_id, timestamp, training.show_training_info())
+
+    def window_totals(self, period: str, user_id: Hashable,
+                      index: int) -> Optional[dict]:
+        """Итоги окна по типам, окно создаётся при необходимости.
+
+        Возвращает None, если окно старше хранимых.
+        """
+        user_windows = self.windows[period].get(user_id)
+        if user_windows is None:
+            user_windows = self.windows[period][user_id] = OrderedDict()
+        window = user_windows.get(index)
+        if window is not None:
+            return window
+        keep = self.keep[period]
+        if len(user_windows) >= keep and index < next(iter(user_windows)):
+            return None
+        late = user_windows and index < next(reversed(user_windows))
+        window = user_windows[index] = {}
+        if late:
+            # Опоздавшее событие: восстанавливаем порядок окон
+            for later in [key for key in user_windows if key > index]:
+                user_windows.move_to_end(later)
+        if len(user_windows) > keep:
+            user_windows.popitem(last=False)
+        return window
+
+    def user_totals(self, user_id: Hashable,
+                    training_type: Optional[str] = None) -> Totals:
+        """Итоги пользователя за всё время по типу или по всем типам."""
+        return combine(self.totals.get(user_id, {}), training_type)
+
+    def window(self, user_id: Hashable, period: str, timestamp: float,
+               training_type: Optional[str] = None) -> Totals:
+        """Итоги пользователя в окне period, содержащем timestamp."""
+        index = window_indexes(timestamp)[PERIODS.index(period)]
+        user_windows = self.windows[period].get(user_id, {})
+        return combine(user_windows.get(index, {}), training_type)
+
+    def history(self, user_id: Hashable, period: str) -> list:
+        """Хранимые окна пользователя: (начало окна, тип, итоги)."""
+        return [(window_start(period, index), training_type, totals)
+                for index, window
+                in self.windows[period].get(user_id, {}).items()
+                for training_type, totals in window.items()]
+
+    def merge(self, other: 'Aggregator') -> None:
+        """Прибавить итоги другого агрегатора, например частичного."""
+        self.events += other.events
+        self.dropped += other.dropped
+        for user_id, user_totals in other.totals.items():
+            own = self.totals.setdefault(user_id, {})
+            for training_type, totals in user_totals.items():
+                own.setdefault(training_type, Totals()).merge(totals)
+        for period in PERIODS:
+            for user_id, user_windows in other.windows[period].items():
+                for index, window in user_windows.items():
+                    own = self.window_totals(period, user_id, index)
+                    if own is None:
+                        self.dropped += 1
+                        continue
+                    for training_type, totals in window.items():
+                        own.setdefault(training_type, Totals()).merge(totals)
+
+    def absorb(self, other: 'Aggregator') -> None:
+        """Прибавить итоги агрегатора, который дальше не используется.
+
+        Итоги пользователей, которых здесь ещё нет, переходят без
+        копирования, поэтому для частичных итогов по разным
+        пользователям это быстрее merge.
+        """
+        if other.keep != self.keep:
+            self.merge(other)
+            return
+        rest = Aggregator(other.keep)
+        rest.events, rest.dropped = other.events, other.dropped
+        for user_id, user_totals in other.totals.items():
+            target = rest if user_id in self.totals else self
+            target.totals[user_id] = user_totals
+            for period in PERIODS:
+                user_windows = other.windows[period].get(user_id)
+                if user_windows is not None:
+                    target.windows[period][user_id] = user_windows
+        self.merge(rest)
+
+
+def combine(by_type: dict, training_type: Optional[str] = None) -> Totals:
+    """Итоги одного типа или сумма по всем типам."""
+    combined = Totals()
+    for name, totals in by_type.items():
+        if training_type is None or name == training_type:
+            combined.merge(totals)
+    return combined
@@ -0,0 +1,183 @@
+"""Поиск аномалий в потоке пакетов от устройств.
+
+search_errors_in_values проверяет только границы веса и роста, а сбойный
+датчик может прислать, например, огромное число шагов за минуту:
+каждый параметр допустим, а скорость нелепа. AnomalyDetector держит
+для каждого устройства и типа тренировки скользящие среднее
+и дисперсию скорости и калорий. Они экспоненциально взвешенные (EWMA)
+с alpha = 2 / (window + 1), поэтому память на устройство O(1), а вес
+пакета убывает вдвое примерно за треть window. Пакет отмечается, если
+скорость или калории отходят от среднего дальше threshold стандартных
+отклонений и дальше spread от среднего. Отмеченные пакеты в статистику
+не входят, чтобы сбойный датчик не расширял себе границы. Но после
+recovery отмеченных подряд пакетов отклонение считается новой нормой
+(сменился пользователь или датчик откалиброван заново): пакеты
+по-прежнему отмечаются, но входят в статистику, и она догоняет новый
+уровень. Первые warmup пакетов устройства только накапливают
+статистику. Бесконечные показатели отмечаются всегда, даже до warmup,
+и в статистику не входят никогда.
+
+Запуск: python anomaly.py ФАЙЛ [--window N] [--threshold K]
+                               [--warmup N] [--recovery N]
+Файл - события в формате cluster.py: [устройство, время, код,
+[параметры]]. Отмеченные события печатаются строками JSON с полем
+anomaly - speed или calories.
+"""
+import argparse
+import json
+import sys
+from math import isfinite
+from typing import Iterable, Iterator
+
+from homework import calculate_package
+
+WINDOW = 50
+THRESHOLD = 4.0
+WARMUP = 10
+SPREAD = 0.05
+RECOVERY = 20
+SPEED = 'speed'
+CALORIES = 'calories'
+
+
+class AnomalyDetector:
+    """Скользящая статистика устройств и отметка выбросов.
+
+    states - по коду тренировки словарь устройств со списками: пакетов,
+    среднее и дисперсия скорости, среднее и дисперсия калорий, отмечено
+    подряд. Словарь кода заводится с первым пакетом этого кода.
+    """
+
+    def __init__(self, window: int = WINDOW, threshold: float = THRESHOLD,
+                 warmup: int = WARMUP, spread: float = SPREAD,
+                 recovery: int = RECOVERY) -> None:
+        self.alpha = 2 / (window + 1)
+        self.rest = 1 - self.alpha
+        self.limit = threshold * threshold
+        self.spread = spread * spread
+        self.warmup = warmup
+        self.recovery = recovery
+        self.states = {}
+        self.flagged = 0
+
+    def check(self, device, workout_type: str, speed: float,
+              calories: float):
+        """Учесть показатели пакета устройства.
+
+        Возвращает SPEED или CALORIES для выброса, иначе None.
+        """
+        try:
+            states = self.states[workout_type]
+        except KeyError:
+            states = self.states[workout_type] = {}
+        state = states.get(device)
+        if state is None:
+            return self.start(states, device, speed, calories)
+        count, mean_speed, var_speed, mean_calories, var_calories, \
+            streak = state
+        speed_diff = speed - mean_speed
+        calories_diff = calories - mean_calories
+        # Квадраты нужны и для порога; inf или nan в сумме значат, что
+        # показатель бесконечен или отклонение не представимо
+        speed_square = speed_diff * speed_diff
+        calories_square = calories_diff * calories_diff
+        if not isfinite(speed_square + calories_square):
+            return self.unsound(speed_square)
+        anomaly = None
+        if count >= self.warmup:
+            if speed_square > (self.limit * var_speed
+                               + self.spread * mean_speed * mean_speed):
+                anomaly = SPEED
+            elif calories_square > (
+                    self.limit * var_calories
+                    + self.spread * mean_calories * mean_calories):
+                anomaly = CALORIES
+            if anomaly is not None:
+                self.flagged += 1
+                state[5] = streak = streak + 1
+                if streak < self.recovery:
+                    return anomaly
+            else:
+                state[5] = 0
+        alpha = self.alpha
+        speed_step = alpha * speed_diff
+        calories_step = alpha * calories_diff
+        state[0] = count + 1
+        state[1] = mean_speed + speed_step
+        state[2] = (var_speed + speed_diff * speed_step) * self.rest
+        state[3] = mean_calories + calories_step
+        state[4] = (var_calories + calories_diff * calories_step) * self.rest
+        return anomaly
+
+    def start(self, states: dict, device, speed: float,
+              calories: float):
+        """Завести статистику устройства по первому пакету."""
+        if not isfinite(speed + calories):
+            return self.unsound(speed)
+        states[device] = [1, speed, 0.0, calories, 0.0, 0]
+        return None
+
+    def unsound(self, speed: float) -> str:
+        """Отметить бесконечный показатель, не трогая статистику."""
+        self.flagged += 1
+        return CALORIES if isfinite(speed) else SPEED
+
+    def devices(self) -> set:
+        """Устройства, по которым есть статистика."""
+        return set().union(*self.states.values())
+
+    def forget(self, device) -> None:
+        """Удалить статистику устройства по всем типам тренировок."""
+        for states in self.states.values():
+            states.pop(device, None)
+
+
+def detect(events: Iterable[tuple],
+           detector: AnomalyDetector) -> Iterator[tuple]:
+    """Отмеченные события: (событие, InfoMessage, показатель).
+
+    События - (устройство, время, код, параметры), пакеты, отклонённые
+    calculate_package, пропускаются.
+    """
+    check = detector.check
+    for event in events:
+        device, _, workout_type, data = event
+        info_message, error = calculate_package(workout_type, data)
+        if error is not None:
+            continue
+        anomaly = check(device, workout_type, info_message.speed,
+                        info_message.calories)
+        if anomaly is not None:
+            yield event, info_message, anomaly
+
+
+def main(argv=None) -> None:
+    """Точка входа командной строки."""
+    from cluster import EventFile
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('path', help='файл событий')
+    parser.add_argument('--window', type=int, default=WINDOW,
+                        help='окно статистики в пакетах')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help='порог в стандартных отклонениях')
+    parser.add_argument('--warmup', type=int, default=WARMUP,
+                        help='пакетов устройства до первых отметок')
+    parser.add_argument('--recovery', type=int, default=RECOVERY,
+                        help='отметок подряд до принятия нового уровня')
+    args = parser.parse_args(argv)
+    detector = AnomalyDetector(args.window, args.threshold, args.warmup,
+                               recovery=args.recovery)
+    for (device, timestamp, workout_type, data), info_message, anomaly \
+            in detect(EventFile(args.path), detector):
+        print(json.dumps({'device': device, 'time': timestamp,
+                          'workout_type': workout_type, 'data': data,
+                          'speed': info_message.speed,
+                          'calories': info_message.calories,
+                          'anomaly': anomaly}, ensure_ascii=False))
+    print(f'Устройств: {len(detector.devices())}, '
+          f'отмечено: {detector.flagged}.', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
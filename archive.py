@@ -0,0 +1,203 @@
+"""Двоичный архив пакетов от датчиков.
+
+Файл начинается с заголовка и таблицы кодов тренировок, за ними идут
+записи фиксированной длины 48 байт: номер кода в таблице (1 байт),
+7 байт выравнивания и пять float64 параметров пакета, недостающие
+параметры заполнены нулями.
+
+Чтение идёт через mmap без копирования: столбцы доступны как
+memoryview, например для NumPy:
+numpy.frombuffer(archive.records, dtype=[('code', 'u1'), ('', 'V7'),
+                                         ('values', '<f8', 5)])
+
+Запуск: python archive.py pack ВХОД АРХИВ | unpack АРХИВ
+"""
+import argparse
+import mmap
+import struct
+import sys
+from itertools import islice
+from typing import Iterable, Iterator
+
+from homework import WORKOUT_TYPES, validate_package
+
+MAGIC = b'FTRK'
+VERSION = 1
+HEADER = struct.Struct('<4sHH8x')
+TYPE_CODE = struct.Struct('<8s')
+RECORD = struct.Struct('<B7x5d')
+VALUES = 5
+DOUBLE_SIZE = 8
+WRITE_BATCH = 4096
+
+
+class ArchiveWriter:
+    """Запись пакетов в новый двоичный архив.
+
+    Пакеты копятся в буфере и пишутся блоками по WRITE_BATCH записей.
+    """
+
+    def __init__(self, path: str, workout_types: Iterable[str] = None
+                 ) -> None:
+        self.workout_types = tuple(workout_types or WORKOUT_TYPES)
+        self.codes = {workout_type: code
+                      for code, workout_type in enumerate(self.workout_types)}
+        self.file = open(path, 'wb')
+        self.file.write(HEADER.pack(MAGIC, VERSION, len(self.workout_types)))
+        for workout_type in self.workout_types:
+            self.file.write(TYPE_CODE.pack(workout_type.encode('ascii')))
+        self.buffer = bytearray()
+        self.count = 0
+
+    def write(self, workout_type: str, data) -> None:
+        """Добавить пакет в архив."""
+        if len(data) > VALUES:
+            raise ValueError(f'В пакете больше {VALUES} параметров.')
+        self.buffer += RECORD.pack(self.codes[workout_type], *data,
+                                   *[0.0] * (VALUES - len(data)))
+        self.count += 1
+        if len(self.buffer) >= WRITE_BATCH * RECORD.size:
+            self.flush()
+
+    def write_many(self, packages: Iterable[tuple]) -> None:
+        """Добавить в архив все пакеты."""
+        for workout_type, data in packages:
+            self.write(workout_type, data)
+
+    def flush(self) -> None:
+        """Записать накопленные пакеты в файл."""
+        self.file.write(self.buffer)
+        self.buffer.clear()
+
+    def close(self) -> None:
+        """Записать остаток буфера и закрыть файл."""
+        self.flush()
+        self.file.close()
+
+    def __enter__(self) -> 'ArchiveWriter':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+class Archive:
+    """Чтение двоичного архива через mmap без копирования данных."""
+
+    def __init__(self, path: str) -> None:
+        with open(path, 'rb') as file:
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, types = HEADER.unpack_from(self.map)
+        if magic != MAGIC or version != VERSION:
+            self.map.close()
+            raise ValueError(f'{path} не является архивом версии {VERSION}.')
+        self.workout_types = tuple(
+            TYPE_CODE.unpack_from(self.map, HEADER.size + TYPE_CODE.size * i
+                                  )[0].rstrip(b'\0').decode('ascii')
+            for i in range(types))
+        self.offset = HEADER.size + TYPE_CODE.size * types
+        size = len(self.map) - self.offset
+        if size % RECORD.size:
+            self.map.close()
+            raise ValueError(f'{path}: неполная последняя запись.')
+        self.records = memoryview(self.map)[self.offset:]
+
+    def __len__(self) -> int:
+        return len(self.records) // RECORD.size
+
+    @property
+    def codes(self) -> memoryview:
+        """Номера кодов тренировок всех записей."""
+        return self.records[::RECORD.size]
+
+    def column(self, index: int) -> memoryview:
+        """Параметр с номером index всех записей как float64."""
+        doubles = self.records.cast('d')
+        step = RECORD.size // DOUBLE_SIZE
+        return doubles[1 + index::step]
+
+    def __iter__(self) -> Iterator[tuple]:
+        """Пакеты архива в виде пар (код, параметры)."""
+        lengths = [len(WORKOUT_TYPES[workout_type].FIELDS)
+                   for workout_type in self.workout_types]
+        step = WRITE_BATCH * RECORD.size
+        for start in range(0, len(self.records), step):
+            # Блок разбирается целиком, чтобы между yield не держать
+            # ссылку на буфер отображения и не мешать close
+            with self.records[start:start + step] as chunk:
+                records = list(RECORD.iter_unpack(chunk))
+            for code, *values in records:
+                yield self.workout_types[code], values[:lengths[code]]
+
+    def iter_batches(self, size: int = 65536) -> Iterator[tuple]:
+        """Столбцы параметров блоками по size записей.
+
+        Возвращает пары (код тренировки, столбцы) для compute_batch
+        и validate_batch, по одной паре на тип в каждом блоке.
+        """
+        fields = [WORKOUT_TYPES[workout_type].FIELDS
+                  for workout_type in self.workout_types]
+        for start in range(0, len(self), size):
+            rows = [[] for _ in self.workout_types]
+            with self.records[start * RECORD.size:
+                              (start + size) * RECORD.size] as chunk:
+                for code, *values in RECORD.iter_unpack(chunk):
+                    rows[code].append(values)
+            for code, group in enumerate(rows):
+                if group:
+                    columns = dict(zip(fields[code], zip(*group)))
+                    yield self.workout_types[code], columns
+
+    def close(self) -> None:
+        """Освободить отображение файла.
+
+        Если живы представления из codes или column, отображение
+        закрывается вместе с последним из них.
+        """
+        self.records.release()
+        try:
+            self.map.close()
+        except BufferError:
+            pass
+
+    def __enter__(self) -> 'Archive':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+def main(argv=None) -> None:
+    """Точка входа командной строки."""
+    import json
+
+    from pipeline import guess_format, open_input, read_packages
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+    pack = commands.add_parser('pack', help='упаковать пакеты в архив')
+    pack.add_argument('input', help="файл jsonl или csv, '-' - stdin")
+    pack.add_argument('archive')
+    unpack = commands.add_parser('unpack', help='вывести архив в jsonl')
+    unpack.add_argument('archive')
+    args = parser.parse_args(argv)
+    if args.command == 'pack':
+        with open_input(args.input) as stream, \
+                ArchiveWriter(args.archive) as writer:
+            for workout_type, data in read_packages(
+                    stream, guess_format(args.input)):
+                if validate_package(workout_type, data) is None:
+                    writer.write(workout_type, data)
+        return
+    with Archive(args.archive) as archive:
+        packages = iter(archive)
+        while True:
+            lines = [json.dumps(package) + '\n'
+                     for package in islice(packages, WRITE_BATCH)]
+            if not lines:
+                break
+            sys.stdout.write(''.join(lines))
+
+
+if __name__ == '__main__':
+    main()
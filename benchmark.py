@@ -0,0 +1,1156 @@
+"""Замеры производительности фитнес трекера.
+
+Запуск: python benchmark.py [имя_замера ...] [--size N]
+                            [--save ФАЙЛ] [--compare ФАЙЛ] [--threshold T]
+Без имён выполняются все зарегистрированные замеры.
+
+--save сохраняет пропускную способность всех замеров в JSON как базовую
+линию, --compare сравнивает с ней и завершается с кодом 1, если
+какой-либо замер стал медленнее больше чем на долю threshold.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from itertools import cycle, islice
+
+import aggregation
+import anomaly
+import archive
+import cache
+import cli
+import cluster
+import coefficients
+import columnar
+import deadletter
+import generator
+import metrics
+import homework
+import livestore
+import parallel
+import pipeline
+import server
+import session
+import storage
+import writers
+
+BENCHMARKS = {}
+# Результаты текущего замера: (название, операций в секунду)
+RESULTS = []
+END_TO_END_SIZES = (1_000, 100_000, 10_000_000)
+# Число пользователей в LiveStore для замера записи
+LIVE_USERS = 1_000_000
+
+
+def benchmark(func):
+    """Зарегистрировать функцию замера под её именем."""
+    BENCHMARKS[func.__name__.replace('bench_', '', 1)] = func
+    return func
+
+
+def best_time(func, repeat: int = 3) -> float:
+    """Лучшее время выполнения func из repeat попыток, в секундах."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def report(name: str, count: int, seconds: float) -> None:
+    """Запомнить и напечатать строку результата замера."""
+    RESULTS.append((name, count / seconds))
+    print(f'{name:<40} {count / seconds:>14,.0f} оп/с '
+          f'({seconds * 1000:.1f} мс на {count:,})')
+
+
+def make_columns(workout_type: str, size: int, seed: int = 0) -> dict:
+    """Сгенерировать столбцы корректных данных для тренировки."""
+    rnd = random.Random(seed)
+    columns = {
+        'action': [rnd.randint(100, 20000) for _ in range(size)],
+        'duration': [rnd.uniform(0.2, 3.0) for _ in range(size)],
+        'weight': [rnd.uniform(40, 120) for _ in range(size)],
+    }
+    if workout_type == 'WLK':
+        columns['height'] = [rnd.uniform(140, 210) for _ in range(size)]
+    if workout_type == 'SWM':
+        columns['length_pool'] = [rnd.choice((25, 50))
+                                  for _ in range(size)]
+        columns['count_pool'] = [rnd.randint(1, 80) for _ in range(size)]
+    return columns
+
+
+def rows(workout_type: str, columns: dict) -> list:
+    """Переложить столбцы в строки параметров для read_package."""
+    fields = [name for name in ('action', 'duration', 'weight', 'height',
+                                'length_pool', 'count_pool')
+              if name in columns]
+    return [list(row) for row in zip(*(columns[f] for f in fields))]
+
+
+def make_packages(size: int, seed: int = 0) -> list:
+    """Сгенерировать смешанный список корректных пакетов."""
+    packages = []
+    for workout_type in homework.WORKOUT_TYPES:
+        columns = make_columns(workout_type, size // 3 + 1, seed)
+        packages.extend((workout_type, data)
+                        for data in rows(workout_type, columns))
+    random.Random(seed).shuffle(packages)
+    return packages[:size]
+
+
+def make_mixed(size: int, seed: int = 0) -> list:
+    """Сгенерировать пакеты в пропорциях generator.MIX."""
+    mix = generator.MIX
+    pools = {workout_type: rows(workout_type,
+                                make_columns(workout_type, size, seed))
+             for workout_type in mix}
+    rnd = random.Random(seed)
+    codes = rnd.choices(list(mix), weights=list(mix.values()), k=size)
+    return [(workout_type, pools[workout_type][index])
+            for index, workout_type in enumerate(codes)]
+
+
+@benchmark
+def bench_core(size: int) -> None:
+    """Ядро трекера: создание, расчёт калорий, сообщения, проверка."""
+    packages = make_mixed(size)
+    for workout_type in homework.WORKOUT_TYPES:
+        group = [data for code, data in packages if code == workout_type]
+        trainings = [homework.read_package(workout_type, data)
+                     for data in group]
+
+        def construct():
+            for data in group:
+                homework.read_package(workout_type, data)
+
+        def calories():
+            # Сброс кэша, чтобы каждый вызов считал заново
+            for training in trainings:
+                training.clear_cache()
+                training.get_spent_calories()
+
+        report(f'{workout_type} read_package', len(group),
+               best_time(construct))
+        report(f'{workout_type} get_spent_calories', len(group),
+               best_time(calories))
+    messages = [homework.build_training(*package).show_training_info()
+                for package in packages]
+
+    def get_message():
+        # Сброс запомненной строки, чтобы каждый вызов форматировал
+        for info_message in messages:
+            info_message._message = None
+            info_message.get_message()
+
+    def validate():
+        for package in packages:
+            homework.validate_package(*package)
+
+    report('InfoMessage.get_message', size, best_time(get_message))
+    report('validate_package', size, best_time(validate))
+
+
+@benchmark
+def bench_end_to_end(size: int) -> None:
+    """Проверка, расчёт и форматирование смешанного потока пакетов.
+
+    Размеры из END_TO_END_SIZES не больше size; пакеты берутся по кругу
+    из пула, чтобы 10 млн пакетов не хранились в памяти.
+    """
+    pool = make_mixed(min(size, 100_000))
+    for count in END_TO_END_SIZES:
+        if count > size:
+            break
+
+        def run():
+            packages = islice(cycle(pool), count)
+            for info_message in pipeline.process_packages(packages):
+                info_message.get_message()
+
+        report(f'{count:,} пакетов', count,
+               best_time(run, repeat=1 if count > 1_000_000 else 3))
+
+
+@benchmark
+def bench_generator(size: int) -> None:
+    """Генерация синтетических пакетов и запись в форматы входа."""
+    def generate():
+        for _ in generator.generate(size, invalid_rate=0.05,
+                                    duplicate_rate=0.1):
+            pass
+
+    report('generate', size, best_time(generate))
+    with tempfile.TemporaryDirectory() as directory:
+        for fmt, write in generator.WRITERS.items():
+            path = os.path.join(directory, f'packages.{fmt}')
+
+            def write_file():
+                with open(path, 'w', encoding='utf-8') as stream:
+                    write(generator.generate(size), stream)
+
+            report(f'generate + {fmt}', size, best_time(write_file))
+        path = os.path.join(directory, 'packages.ftrk')
+        report('generate + archive', size, best_time(
+            lambda: generator.write_archive(generator.generate(size), path)))
+
+
+@benchmark
+def bench_messages(size: int) -> None:
+    """Числовые потребители против вывода текста сообщений."""
+    messages = [homework.build_training(*package).show_training_info()
+                for package in make_packages(size)]
+
+    def numeric():
+        sum(info_message.calories for info_message in messages)
+
+    def first_message():
+        for info_message in messages:
+            info_message._message = None
+            info_message.get_message()
+
+    def cached_message():
+        for info_message in messages:
+            info_message.get_message()
+
+    report('только числа: сумма калорий', size, best_time(numeric))
+    report('get_message, первый вызов', size, best_time(first_message))
+    report('get_message, повторный вызов', size, best_time(cached_message))
+    for workout_type, cls in homework.WORKOUT_TYPES.items():
+        columns = make_columns(workout_type, size // 3)
+        results = homework.compute_batch(workout_type, columns)
+
+        def objects():
+            for data in rows(workout_type, columns):
+                homework.build_training(
+                    workout_type, data).show_training_info().get_message()
+
+        def bulk():
+            homework.format_messages(cls.__name__, columns['duration'],
+                                     *results)
+
+        report(f'{workout_type} объекты и get_message', size // 3,
+               best_time(objects))
+        report(f'{workout_type} format_messages', size // 3, best_time(bulk))
+
+
+@benchmark
+def bench_session(size: int) -> None:
+    """Отсчёты тренировки: добавление, отрезки и скользящие окна."""
+    rnd = random.Random(0)
+    samples = [(float(second), rnd.randint(0, 3))
+               for second in range(1, size + 1)]
+
+    def build():
+        training_session = session.TrainingSession('RUN', 0.0, weight=75)
+        training_session.extend(samples)
+        return training_session
+
+    report('TrainingSession.add', size, best_time(build))
+    training_session = build()
+
+    def object_splits():
+        # Один проход по отсчётам и объект Running на каждый отрезок
+        minutes = [0] * (size // 60 + 1)
+        for second, count in samples:
+            minutes[int(second - 1) // 60] += count
+        for action in minutes:
+            homework.Running(action, 60 / 3600, 75).show_training_info()
+
+    splits = size // 60
+    report('отрезки по минуте: объекты Running', splits,
+           best_time(object_splits))
+    report('отрезки по минуте: накопленные суммы', splits,
+           best_time(lambda: training_session.splits(60)))
+    report('окна 5 мин с шагом 10 с', size // 10,
+           best_time(lambda: training_session.rolling(300, 10)))
+
+
+def store_rows(count: int, users: int, seed: int = 0) -> list:
+    """Результаты (пользователь, время, код, InfoMessage) за год."""
+    rnd = random.Random(seed)
+    packages = make_packages(min(count, 10_000), seed)
+    messages = [(workout_type,
+                 homework.build_training(workout_type, data)
+                 .show_training_info())
+                for workout_type, data in packages]
+    year = 365 * aggregation.SECONDS_IN_DAY
+    return [(rnd.randrange(users), rnd.uniform(0, year),
+             *messages[index % len(messages)])
+            for index in range(count)]
+
+
+@benchmark
+def bench_storage(size: int) -> None:
+    """SQLite: вставка пачками 1/100/10k и запросы за период.
+
+    Запросы идут к таблице из size строк; для таблицы в 50 млн строк
+    нужен --size 50000000 и около 5 ГБ на диске.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        for batch_size in (1, 100, 10_000):
+            count = min(size, 100_000)
+            rows = store_rows(count, 1000)
+            path = os.path.join(directory, f'insert_{batch_size}.sqlite')
+
+            def insert():
+                with storage.ResultStore(path, batch_size) as store:
+                    store.add_many(rows)
+
+            report(f'вставка пачками по {batch_size:,}', count,
+                   best_time(insert, repeat=1))
+        path = os.path.join(directory, 'results.sqlite')
+        users = max(1, size // 500)
+        with storage.ResultStore(path) as store:
+            for start in range(0, size, 100_000):
+                store.add_many(store_rows(min(100_000, size - start), users,
+                                          seed=start))
+        rnd = random.Random(1)
+        month = 30 * aggregation.SECONDS_IN_DAY
+        hour = 60 * 60
+        with storage.ReaderPool(path) as pool:
+            for name, query, key, period in (
+                    ('пользователь за 30 дней', pool.user_results,
+                     lambda: rnd.randrange(users), month),
+                    ('тип за час', pool.type_results,
+                     lambda: rnd.choice(list(homework.WORKOUT_TYPES)), hour)):
+                latencies = []
+                for _ in range(1000):
+                    since = rnd.uniform(0, 335 * aggregation.SECONDS_IN_DAY)
+                    started = time.perf_counter()
+                    query(key(), since, since + period)
+                    latencies.append(time.perf_counter() - started)
+                latencies.sort()
+                report(f'запрос: {name}', len(latencies), sum(latencies))
+                print(f'{"":<40} p50 '
+                      f'{server.percentile(latencies, 0.5) * 1000:.3f} мс, '
+                      f'p99 {server.percentile(latencies, 0.99) * 1000:.3f} '
+                      f'мс на {size:,} строк')
+
+
+def import_time(module: str) -> float:
+    """Накопленное время импорта модуля по -X importtime, в секундах."""
+    stderr = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True, text=True, check=True).stderr
+    line = stderr.splitlines()[-1]
+    return int(line.split('|')[1]) / 1e6
+
+
+def wait_socket(path: str, process: subprocess.Popen) -> None:
+    """Дождаться, пока тёплый процесс начнёт слушать сокет."""
+    while not os.path.exists(path):
+        if process.poll() is not None:
+            raise RuntimeError('Тёплый процесс завершился при запуске.')
+        time.sleep(0.01)
+
+
+@benchmark
+def bench_startup(size: int) -> None:
+    """Холодный запуск CLI и расчёт пакета в тёплом процессе.
+
+    Байт-код модулей компилируется заранее, как при установке: иначе
+    каждый запуск тратит время на компиляцию.
+    """
+    subprocess.run([sys.executable, '-m', 'compileall', '-q',
+                    os.path.dirname(os.path.abspath(__file__))], check=True)
+    runs = max(1, min(size // 10_000, 20))
+    package = ['RUN', '5000', '1', '30']
+    for name, command in (
+            ('python -c pass', ['-c', 'pass']),
+            ('cli.py calc', [cli.__file__, 'calc', *package]),
+            ('cli.py pipeline', [cli.__file__, 'pipeline'])):
+        report(f'запуск: {name}', runs, runs * best_time(
+            lambda: subprocess.run([sys.executable, *command],
+                                   input=b'["RUN", [5000, 1, 30]]\n',
+                                   stdout=subprocess.DEVNULL, check=True),
+            repeat=runs))
+    for module in ('homework', 'cli', 'pipeline', 'server'):
+        print(f'{"импорт " + module:<40} '
+              f'{import_time(module) * 1000:>10.1f} мс')
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'worker.sock')
+        process = subprocess.Popen([sys.executable, cli.__file__, 'worker',
+                                    '--unix', path])
+        try:
+            wait_socket(path, process)
+            requests = max(1, min(size, 10_000))
+            latencies = []
+            for _ in range(requests):
+                started = time.perf_counter()
+                cli.request(path, 'RUN', [5000.0, 1.0, 30.0])
+                latencies.append(time.perf_counter() - started)
+            latencies.sort()
+            report('тёплый процесс: запрос', requests, sum(latencies))
+            print(f'{"":<40} p50 '
+                  f'{server.percentile(latencies, 0.5) * 1000:.3f} мс, '
+                  f'p99 {server.percentile(latencies, 0.99) * 1000:.3f} мс')
+            report('тёплый процесс: cli.py call', runs, runs * best_time(
+                lambda: subprocess.run(
+                    [sys.executable, cli.__file__, 'call', *package,
+                     '--unix', path], stdout=subprocess.DEVNULL, check=True),
+                repeat=runs))
+        finally:
+            process.terminate()
+            process.wait()
+
+
+@benchmark
+def bench_anomaly(size: int) -> None:
+    """Скользящая статистика устройств: цена проверки пакета."""
+    devices = max(1, size // 100)
+    rnd = random.Random(0)
+    values = [(rnd.randrange(devices), workout_type,
+               info_message.speed, info_message.calories)
+              for workout_type, info_message in (
+                  (workout_type, homework.build_training(
+                      workout_type, data).show_training_info())
+                  for workout_type, data in make_packages(size))]
+    detector = anomaly.AnomalyDetector()
+    check = detector.check
+    for device, workout_type, speed, calories in values:
+        check(device, workout_type, speed, calories)
+
+    def empty():
+        for device, workout_type, speed, calories in values:
+            pass
+
+    def checks():
+        for device, workout_type, speed, calories in values:
+            check(device, workout_type, speed, calories)
+
+    seconds = best_time(checks)
+    report(f'check, устройств: {devices:,}', size, seconds)
+    print(f'{"":<40} {(seconds - best_time(empty)) / size * 1e9:.0f} нс '
+          f'на пакет сверх цикла')
+    events = [(device, 0, workout_type, data) for (device, *_), (
+        workout_type, data) in zip(values, make_packages(size))]
+
+    def plain():
+        for _, _, workout_type, data in events:
+            if homework.validate_package(workout_type, data) is None:
+                homework.build_training(workout_type,
+                                        data).show_training_info()
+
+    report('расчёт пакетов без проверки', size, best_time(plain))
+    report('расчёт пакетов с detect', size, best_time(
+        lambda: list(anomaly.detect(events, anomaly.AnomalyDetector()))))
+
+
+@benchmark
+def bench_batch(size: int) -> None:
+    """compute_batch против цикла по объектам Training."""
+    for workout_type in homework.WORKOUT_TYPES:
+        columns = make_columns(workout_type, size)
+        packages = rows(workout_type, columns)
+
+        def object_loop():
+            for data in packages:
+                homework.read_package(
+                    workout_type, data).show_training_info()
+
+        def batch():
+            homework.compute_batch(workout_type, columns)
+
+        report(f'{workout_type} объекты', size, best_time(object_loop))
+        report(f'{workout_type} compute_batch', size, best_time(batch))
+
+
+@benchmark
+def bench_pipeline(size: int) -> None:
+    """Потоковая обработка файла JSON Lines и пиковая память."""
+    fd, path = tempfile.mkstemp(suffix='.jsonl')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as stream:
+            for workout_type, data in make_packages(size):
+                stream.write(json.dumps([workout_type, data]) + '\n')
+
+        def run(limit=None):
+            with open(path, encoding='utf-8') as stream:
+                packages = pipeline.read_packages(stream)
+                for count, _ in enumerate(
+                        pipeline.process_packages(packages), 1):
+                    if count == limit:
+                        break
+
+        report('pipeline jsonl', size, best_time(run))
+        for limit in (size // 10, size):
+            tracemalloc.start()
+            run(limit)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f'пиковая память на {limit:,} пакетов: {peak / 1024:.0f} КБ')
+    finally:
+        os.remove(path)
+
+
+@benchmark
+def bench_parallel(size: int) -> None:
+    """Масштабирование параллельной обработки от 1 до N ядер."""
+    packages = make_packages(size)
+
+    def serial():
+        for _ in pipeline.process_packages(packages):
+            pass
+
+    report('последовательно', size, best_time(serial))
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        def run():
+            for _ in parallel.process_parallel(packages, workers):
+                pass
+
+        report(f'процессов: {workers}', size, best_time(run))
+        workers *= 2
+
+
+@benchmark
+def bench_show_info(size: int) -> None:
+    """show_training_info: первый и повторный вызов на объекте."""
+    packages = make_packages(size)
+
+    def first_call():
+        for package in packages:
+            homework.read_package(*package).show_training_info()
+
+    trainings = [homework.read_package(*package) for package in packages]
+
+    def repeated_call():
+        for training in trainings:
+            training.show_training_info()
+
+    report('создание и show_training_info', size, best_time(first_call))
+    report('повторный show_training_info', size, best_time(repeated_call))
+
+
+def spoil(packages: list, rate: float, seed: int = 0) -> list:
+    """Испортить вес в доле rate пакетов."""
+    rnd = random.Random(seed)
+    return [(workout_type, data[:2] + [rnd.choice((5, 500))] + data[3:])
+            if rnd.random() < rate else (workout_type, data)
+            for workout_type, data in packages]
+
+
+@benchmark
+def bench_validation(size: int) -> None:
+    """Проверка пакетов: почти все корректны и почти все отклонены."""
+    for name, rate in (('корректные', 0.01), ('отклонённые', 0.9)):
+        packages = spoil(make_packages(size), rate)
+
+        def search():
+            with contextlib.redirect_stdout(None):
+                for package in packages:
+                    homework.search_errors_in_values(*package)
+
+        def validate():
+            for package in packages:
+                homework.validate_package(*package)
+
+        report(f'{name}: search_errors_in_values', size, best_time(search))
+        report(f'{name}: validate_package', size, best_time(validate))
+        for workout_type in homework.WORKOUT_TYPES:
+            columns = make_columns(workout_type, size // 3)
+            spoiled = random.Random(1)
+            columns['weight'] = [spoiled.choice((5, 500))
+                                 if spoiled.random() < rate else weight
+                                 for weight in columns['weight']]
+
+            def batch():
+                homework.validate_batch(workout_type, columns)
+
+            report(f'{name}: validate_batch {workout_type}', size // 3,
+                   best_time(batch))
+
+
+@benchmark
+def bench_dead_letters(size: int) -> None:
+    """Отклонённые пакеты: сообщения в консоль против очереди на диске."""
+    with tempfile.TemporaryDirectory() as directory:
+        for rate in (0.0, 0.05, 0.5):
+            packages = spoil(make_packages(size), rate)
+
+            def console():
+                with open(os.devnull, 'w') as devnull, \
+                        contextlib.redirect_stderr(devnull):
+                    for _ in pipeline.process_packages(
+                            packages, pipeline.print_error):
+                        pass
+
+            def queue():
+                path = os.path.join(directory, 'dead.jsonl')
+                with deadletter.DeadLetters(path) as dead_letters:
+                    for _ in pipeline.process_packages(packages,
+                                                       dead_letters):
+                        pass
+                os.remove(path)
+
+            report(f'{rate:.0%} отклонено: в консоль', size,
+                   best_time(console))
+            report(f'{rate:.0%} отклонено: в очередь', size,
+                   best_time(queue))
+
+
+def resend(packages: list, rate: float, window: int = 1000,
+           seed: int = 0) -> list:
+    """Добавить повторы: доля rate пакетов - копии недавно присланных."""
+    rnd = random.Random(seed)
+    result = []
+    for package in packages:
+        if result and rnd.random() < rate:
+            result.append(result[rnd.randrange(max(0, len(result) - window),
+                                               len(result))])
+        else:
+            result.append(package)
+    return result
+
+
+def run_cached(packages: list, result_cache=None) -> None:
+    """Прогнать пакеты через process_packages с кэшем и без."""
+    for _ in pipeline.process_packages(packages, cache=result_cache):
+        pass
+
+
+@benchmark
+def bench_cache(size: int) -> None:
+    """Кэш результатов при повторной отправке пакетов."""
+    for rate in (0.05, 0.3, 0.7):
+        packages = resend(make_packages(size), rate)
+        report(f'повторов {rate:.0%}: без кэша', size,
+               best_time(lambda: run_cached(packages)))
+        report(f'повторов {rate:.0%}: кэш в памяти', size,
+               best_time(lambda: run_cached(packages, cache.ResultCache())))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'cache.sqlite')
+            with cache.ResultCache(path=path) as result_cache:
+                seconds = best_time(
+                    lambda: run_cached(packages, result_cache), repeat=1)
+                stats = result_cache.stats()
+            report(f'повторов {rate:.0%}: SQLite, холодный', size, seconds)
+
+            def warm():
+                with cache.ResultCache(path=path) as warm_cache:
+                    run_cached(packages, warm_cache)
+
+            report(f'повторов {rate:.0%}: SQLite после перезапуска', size,
+                   best_time(warm))
+        print(f'счётчики: {stats}')
+
+
+@benchmark
+def bench_metrics(size: int) -> None:
+    """Накладные расходы замеров этапов: выключены и включены."""
+    packages = make_packages(size)
+
+    def process():
+        for _ in pipeline.process_packages(packages):
+            pass
+
+    report('замеры выключены', size, best_time(process))
+    with metrics.Metrics() as stage_metrics:
+        report('замеры включены', size, best_time(process))
+    for stage, by_type in stage_metrics.as_dict().items():
+        for workout_type, stats in by_type.items():
+            print(f'{stage + " " + workout_type:<40} '
+                  f'{stats["seconds"] / stats["count"] * 1e6:>10.2f} мкс')
+
+
+@benchmark
+def bench_registry(size: int) -> None:
+    """read_package и build_training при 3 и 103 типах тренировок."""
+    packages = make_packages(size)
+
+    def read():
+        for workout_type, data in packages:
+            homework.read_package(workout_type, data)
+
+    def build():
+        for workout_type, data in packages:
+            homework.build_training(workout_type, data)
+
+    saved = {name: dict(getattr(homework, name))
+             for name in ('WORKOUT_TYPES', 'SCHEMAS', 'BUILDERS')}
+    for extra in (0, 100):
+        for number in range(extra):
+            homework.register_training(f'X{number:02}')(
+                type(f'Extra{number}', (homework.Running,),
+                     {'__slots__': ()}))
+        types = len(homework.WORKOUT_TYPES)
+        report(f'read_package, типов: {types}', size, best_time(read))
+        report(f'build_training, типов: {types}', size, best_time(build))
+    for name, registry in saved.items():
+        getattr(homework, name).clear()
+        getattr(homework, name).update(registry)
+
+
+@benchmark
+def bench_writers(size: int) -> None:
+    """Вывод сообщений: print в цикле main и MessageWriter."""
+    messages = [homework.build_training(*package).show_training_info()
+                for package in make_packages(size)]
+    with tempfile.TemporaryFile('w+', encoding='utf-8') as stream:
+        def print_loop():
+            for info_message in messages:
+                print(info_message.get_message(), file=stream)
+
+        report('print(get_message())', size, best_time(print_loop))
+        for fmt in writers.TEMPLATES:
+            def write():
+                with writers.MessageWriter(stream, fmt) as writer:
+                    writer.write_many(messages)
+
+            report(f'MessageWriter {fmt}', size, best_time(write))
+
+
+@benchmark
+def bench_server(size: int) -> None:
+    """asyncio-сервер: задержки и пропускная способность по соединениям."""
+    async def run(connections, packages):
+        srv = await server.start(port=0)
+        port = srv.sockets[0].getsockname()[1]
+        async with srv:
+            return await server.load_test(
+                server.connector('127.0.0.1', port), connections, packages)
+
+    for connections in (1, 4, 16, 64):
+        packages = make_packages(max(1, size // connections))
+        stats = asyncio.run(run(connections, packages))
+        print(f'соединений: {connections:<4} '
+              f'{stats["throughput"]:>10,.0f} пакетов/с  '
+              f'p50 {stats["p50_ms"]:6.2f} мс  p99 {stats["p99_ms"]:6.2f} мс')
+
+
+@benchmark
+def bench_aggregation(size: int) -> None:
+    """Aggregator: size событий по size // 100 пользователям.
+
+    Для замера из задачи: --size 10000000 (100 тысяч пользователей).
+    """
+    users = max(1, size // 100)
+    messages = [homework.build_training(*package).show_training_info()
+                for package in make_packages(1000)]
+    rnd = random.Random(0)
+    aggregator = aggregation.Aggregator()
+    chunk = 100_000
+    start_time = 1_700_000_000
+    # События равномерно распределены по одному году
+    step = 365 * aggregation.SECONDS_IN_DAY / size
+    elapsed = 0.0
+    for offset in range(0, size, chunk):
+        count = min(chunk, size - offset)
+        events = list(zip(rnd.choices(range(users), k=count),
+                          [start_time + (offset + i) * step
+                           for i in range(count)],
+                          rnd.choices(messages, k=count)))
+        started = time.perf_counter()
+        add = aggregator.add
+        for user_id, timestamp, info_message in events:
+            add(user_id, timestamp, info_message)
+        elapsed += time.perf_counter() - started
+    report(f'Aggregator.add, пользователей: {users:,}', size, elapsed)
+
+    def queries():
+        for user_id in range(users):
+            aggregator.user_totals(user_id)
+            aggregator.window(user_id, 'week', start_time + size * step)
+
+    report('запросы итогов и недели', users, best_time(queries))
+
+
+@benchmark
+def bench_columnar(size: int) -> None:
+    """Выгрузка результатов: текст и CSV против Parquet и Arrow."""
+    try:
+        columnar.load_pyarrow()
+    except ImportError as error:
+        print(f'замер пропущен: {error}')
+        return
+    packages = make_packages(size)
+    results = [(workout_type, data, homework.build_training(
+        workout_type, data).show_training_info())
+        for workout_type, data in packages]
+    messages = [message for _, _, message in results]
+    by_type = {workout_type: make_columns(workout_type, size // 3)
+               for workout_type in homework.WORKOUT_TYPES}
+    with tempfile.TemporaryDirectory() as directory:
+        def text(fmt):
+            def export():
+                with open(path, 'w', encoding='utf-8') as stream, \
+                        writers.MessageWriter(stream, fmt) as writer:
+                    writer.write_many(messages)
+            return export
+
+        def rows():
+            with columnar.ResultsWriter(path) as writer:
+                for result in results:
+                    writer.write(*result)
+
+        def columns():
+            with columnar.ResultsWriter(path) as writer:
+                for workout_type, type_columns in by_type.items():
+                    writer.write_columns(workout_type, type_columns)
+
+        for name, suffix, export in (
+                ('текст get_message', '.txt', text('text')),
+                ('CSV', '.csv', text('csv')),
+                ('Parquet по строкам', '.parquet', rows),
+                ('Arrow по строкам', '.arrow', rows),
+                ('Parquet compute_batch', '.parquet', columns),
+                ('Arrow compute_batch', '.arrow', columns)):
+            path = os.path.join(directory, 'results' + suffix)
+            report(f'выгрузка: {name}', size, best_time(export))
+            print(f'{"":<40} {os.path.getsize(path) / size:.1f} байт '
+                  f'на тренировку')
+
+
+@benchmark
+def bench_recompute(size: int) -> None:
+    """Пересчёт файла результатов по новой версии коэффициентов."""
+    try:
+        columnar.load_pyarrow()
+    except ImportError as error:
+        print(f'замер пропущен: {error}')
+        return
+    by_type = {workout_type: make_columns(workout_type, size // 3)
+               for workout_type in homework.WORKOUT_TYPES}
+    count = size // 3 * 3
+    calories = coefficients.make_version({
+        workout_type: {'COEFF_CALORIE_1': 1.05 * values['COEFF_CALORIE_1']}
+        for workout_type, values
+        in coefficients.base_version().items()})
+    steps = coefficients.make_version({
+        workout_type: {'LEN_STEP': 1.05 * values['LEN_STEP']}
+        for workout_type, values
+        in coefficients.base_version().items()})
+    packages = [(workout_type, row)
+                for workout_type, type_columns in by_type.items()
+                for row in rows(workout_type, type_columns)]
+
+    def objects():
+        for workout_type, data in packages:
+            coefficients.training_class(
+                workout_type, calories[workout_type])(
+                    *data).show_training_info()
+
+    report('по объектам training_class', count, best_time(objects))
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, 'results.arrow')
+        with columnar.ResultsWriter(source) as writer:
+            for workout_type, type_columns in by_type.items():
+                writer.write_columns(workout_type, type_columns)
+        for name, version in (('калории', calories),
+                              ('LEN_STEP', steps)):
+            for suffix in ('.arrow', '.parquet'):
+                output = os.path.join(directory, 'recomputed' + suffix)
+                seconds = best_time(lambda: coefficients.recompute(
+                    source, output, version))
+                report(f'пересчёт {suffix[1:]}, {name}', count, seconds)
+                print(f'{"":<40} 100 млн записей: '
+                      f'{seconds / count * 1e8 / 60:.1f} мин')
+            seconds = best_time(lambda: coefficients.recompute(
+                source, None, version))
+            report(f'пересчёт без записи, {name}', count, seconds)
+
+
+def while_writing(store, results: list, func) -> tuple:
+    """Замерить func, пока другой поток пишет results в store по кругу.
+
+    Возвращает время func, число записанных результатов и время записи.
+    """
+    stop = threading.Event()
+    written = []
+
+    def writer():
+        count = 0
+        started = time.perf_counter()
+        for offset in cycle(range(0, len(results), livestore.BATCH_SIZE)):
+            if stop.is_set():
+                break
+            batch = results[offset:offset + livestore.BATCH_SIZE]
+            store.add_many(batch)
+            count += len(batch)
+        written.append((count, time.perf_counter() - started))
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    try:
+        seconds = best_time(func)
+    finally:
+        stop.set()
+        thread.join()
+    return (seconds, *written[0])
+
+
+@benchmark
+def bench_livestore(size: int) -> None:
+    """LiveStore: чтение срезов и запись пачками, порознь и вместе."""
+    users = max(1, size // 10)
+    rnd = random.Random(0)
+    start_time = 1_700_000_000
+    results = [(rnd.randrange(users), start_time + index * 60,
+                workout_type, homework.build_training(
+                    workout_type, data).show_training_info())
+               for index, (workout_type, data)
+               in enumerate(make_packages(size))]
+    user_ids = [rnd.randrange(users) for _ in range(size)]
+    now = results[-1][1]
+
+    def write():
+        store = livestore.LiveStore()
+        store.add_many(results)
+        store.flush()
+        return store
+
+    report(f'LiveStore.add_many, пользователей: {users:,}', size,
+           best_time(write))
+    store = write()
+
+    def read():
+        for user_id in user_ids:
+            store.latest(user_id)
+            store.today(user_id, now)
+
+    report('latest + today в одном потоке', size, best_time(read))
+    with livestore.QueryPool(store) as pool:
+        def single():
+            futures = [pool.latest(user_id) for user_id in user_ids]
+            for future in futures:
+                future.result()
+
+        def dashboards():
+            futures = [pool.dashboard(user_ids[offset:offset + 50], now)
+                       for offset in range(0, size, 50)]
+            for future in futures:
+                future.result()
+
+        report('QueryPool.latest по одному', size, best_time(single))
+        report('QueryPool.dashboard по 50', size, best_time(dashboards))
+        seconds, written, writing = while_writing(store, results, dashboards)
+        report('dashboard по 50 во время записи', size, seconds)
+        report('запись во время чтения', written, writing)
+    # Запись в хранилище, где уже есть LIVE_USERS пользователей:
+    # цена публикации пачки не должна расти с их числом.
+    info_message = results[0][3]
+    store = livestore.LiveStore()
+    store.add_many((user_id, start_time, 'RUN', info_message)
+                   for user_id in range(LIVE_USERS))
+    store.flush()
+    spread = [(rnd.randrange(LIVE_USERS), *result[1:])
+              for result in results]
+
+    def write_many():
+        store.add_many(spread)
+        store.flush()
+
+    report(f'add_many, пользователей: {LIVE_USERS:,}', size,
+           best_time(write_many))
+
+
+def make_events(size: int, users: int, seed: int = 0) -> list:
+    """События (пользователь, время, код, параметры) за один год."""
+    rnd = random.Random(seed)
+    step = 365 * aggregation.SECONDS_IN_DAY / size
+    return [(rnd.randrange(users), 1_700_000_000 + index * step,
+             workout_type, data)
+            for index, (workout_type, data)
+            in enumerate(generator.generate(size, seed))]
+
+
+@benchmark
+def bench_cluster(size: int) -> None:
+    """Координатор и 1..N обработчиков на Unix-сокетах.
+
+    Время процессора координатора на событие ограничивает
+    масштабирование: пропускная способность не выше обратной ему
+    величины при любом числе ядер. Итоги, которые он принимает,
+    растут с числом пользователей и окон, а не событий, поэтому
+    события идут от size // 1000 пользователей, как при пересчёте
+    архива за год.
+    """
+    events = make_events(size, max(1, size // 1000))
+
+    def serial():
+        cluster.process_events(aggregation.Aggregator(), events)
+
+    report('последовательно', size, best_time(serial, repeat=1))
+    for workers in sorted({1, 2, 4, os.cpu_count() or 1}):
+        with tempfile.TemporaryDirectory() as directory:
+            processes, addresses = cluster.start_local(workers, directory)
+            with cluster.Coordinator(addresses) as coordinator:
+                started = time.process_time()
+                seconds = best_time(lambda: coordinator.run(events),
+                                    repeat=1)
+                used = time.process_time() - started
+                coordinator.close(stop=True)
+            for process in processes:
+                process.join()
+        report(f'обработчиков: {workers}', size, seconds)
+        print(f'{"":<40} процессор координатора: {used * 1e6 / size:.2f} '
+              f'мкс на событие, предел {size / used:,.0f} событий/с')
+
+
+def traced_bytes(build) -> int:
+    """Память в байтах, которую удерживает результат build()."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del result
+    return used
+
+
+@benchmark
+def bench_memory(size: int) -> None:
+    """Байты на тренировку: объекты, сообщения и TrainingStore."""
+    packages = make_packages(size)
+
+    def objects():
+        return [homework.read_package(*package) for package in packages]
+
+    def messages():
+        return [homework.read_package(*package).show_training_info()
+                for package in packages]
+
+    def store():
+        return homework.TrainingStore(packages)
+
+    for name, build in (('объекты Training', objects),
+                        ('объекты InfoMessage', messages),
+                        ('TrainingStore', store)):
+        print(f'{name:<40} {traced_bytes(build) / size:>10.1f} байт')
+
+
+def scan_jsonl(path: str) -> None:
+    """Прочитать все пакеты файла JSON Lines."""
+    with open(path, encoding='utf-8') as stream:
+        for _ in pipeline.read_jsonl(stream):
+            pass
+
+
+def scan_archive(path: str) -> None:
+    """Прочитать все пакеты двоичного архива."""
+    with archive.Archive(path) as packed:
+        for _ in packed:
+            pass
+
+
+def batch_jsonl(path: str) -> None:
+    """Пакетный расчёт по файлу JSON Lines."""
+    by_type = {}
+    with open(path, encoding='utf-8') as stream:
+        for workout_type, data in pipeline.read_jsonl(stream):
+            by_type.setdefault(workout_type, []).append(data)
+    for workout_type, group in by_type.items():
+        fields = homework.WORKOUT_TYPES[workout_type].FIELDS
+        homework.compute_batch(workout_type, dict(zip(fields, zip(*group))))
+
+
+def batch_archive(path: str) -> None:
+    """Пакетный расчёт по двоичному архиву."""
+    with archive.Archive(path) as packed:
+        for workout_type, columns in packed.iter_batches():
+            homework.compute_batch(workout_type, columns)
+
+
+def sum_archive_column(path: str) -> None:
+    """Сумма столбца архива без копирования записей."""
+    with archive.Archive(path) as packed:
+        column = packed.column(0)
+        sum(column)
+        column.release()
+
+
+@benchmark
+def bench_archive(size: int) -> None:
+    """Двоичный архив против JSON Lines: размер файла и скорость чтения."""
+    packages = make_packages(size)
+    with tempfile.TemporaryDirectory() as directory:
+        paths = {'jsonl': os.path.join(directory, 'packages.jsonl'),
+                 'archive': os.path.join(directory, 'packages.ftrk')}
+        with open(paths['jsonl'], 'w', encoding='utf-8') as stream:
+            for package in packages:
+                stream.write(json.dumps(package) + '\n')
+        with archive.ArchiveWriter(paths['archive']) as writer:
+            writer.write_many(packages)
+        for name, path in paths.items():
+            print(f'размер {name:<33} {os.path.getsize(path) / size:>10.1f} '
+                  f'байт/пакет')
+        for name, func, fmt in (
+                ('чтение jsonl', scan_jsonl, 'jsonl'),
+                ('чтение archive', scan_archive, 'archive'),
+                ('jsonl + compute_batch', batch_jsonl, 'jsonl'),
+                ('archive.iter_batches + compute_batch', batch_archive,
+                 'archive'),
+                ('archive.column(0) без копирования', sum_archive_column,
+                 'archive')):
+            report(name, size, best_time(lambda: func(paths[fmt])))
+
+
+def run(names: list, size: int) -> dict:
+    """Выполнить замеры и вернуть пропускную способность по названиям."""
+    results = {}
+    for name in names:
+        print(f'== {name}')
+        del RESULTS[:]
+        BENCHMARKS[name](size)
+        results.update((f'{name}: {case}', rate) for case, rate in RESULTS)
+    return results
+
+
+def compare(baseline: dict, results: dict, threshold: float) -> list:
+    """Замеры, ставшие медленнее базовых больше чем на долю threshold.
+
+    Возвращает список (название, было, стало); замеры, которых нет
+    в одном из наборов, не сравниваются.
+    """
+    return [(case, baseline[case], rate)
+            for case, rate in results.items()
+            if case in baseline and rate < baseline[case] * (1 - threshold)]
+
+
+def main(argv=None) -> None:
+    """Точка входа командной строки."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('names', nargs='*',
+                        help='замеры для запуска: ' + ', '.join(BENCHMARKS))
+    parser.add_argument('--size', type=int, default=100_000,
+                        help='число тренировок в замере')
+    parser.add_argument('--save', help='сохранить результаты в JSON')
+    parser.add_argument('--compare', help='сравнить с результатами из JSON')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='допустимая доля замедления для --compare')
+    args = parser.parse_args(argv)
+    unknown = set(args.names) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f'неизвестные замеры: {", ".join(sorted(unknown))}')
+    results = run(args.names or list(BENCHMARKS), args.size)
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as stream:
+            json.dump({'size': args.size,
+                       'python': platform.python_version(),
+                       'results': results},
+                      stream, ensure_ascii=False, indent=2)
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as stream:
+            baseline = json.load(stream)['results']
+        regressions = compare(baseline, results, args.threshold)
+        for case, before, after in regressions:
+            print(f'замедление {case}: {before:,.0f} -> {after:,.0f} оп/с '
+                  f'({after / before - 1:+.0%})', file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+"""Кэш результатов тренировок по содержимому пакета.
+
+Устройства после переподключения повторно отправляют те же пакеты.
+ResultCache хранит результаты по ключу (код, параметры, типы
+параметров): в памяти
+последние maxsize результатов с вытеснением давно не запрошенных
+и, по желанию, все результаты в файле SQLite, который переживает
+перезапуск процесса.
+"""
+import hashlib
+import sqlite3
+from collections import OrderedDict
+from typing import Optional
+
+from homework import SEQUENCE_TYPES, InfoMessage
+from writers import message_values
+
+# Столбцы значений без типа: SQLite хранит их как есть, и целая
+# длительность не превращается в дробную. Таблица results прежних
+# версий приводила значения к REAL и не различала типы в ключах.
+SCHEMA = ('CREATE TABLE IF NOT EXISTS results_v2 ('
+          'key BLOB PRIMARY KEY, training_type TEXT, duration, '
+          'distance, speed, calories)')
+SELECT = ('SELECT training_type, duration, distance, speed, calories '
+          'FROM results_v2 WHERE key = ?')
+INSERT = 'INSERT OR REPLACE INTO results_v2 VALUES (?, ?, ?, ?, ?, ?)'
+COMMIT_EVERY = 1000
+
+
+def package_key(workout_type: str, data) -> tuple:
+    """Ключ пакета для кэша в памяти: код, параметры и их типы.
+
+    Целые и дробные параметры с равными значениями дают разные
+    результаты (например, целую длительность), поэтому и разные ключи.
+    Для параметров не списком ключа нет: None, такой пакет
+    заведомо некорректен.
+    """
+    if type(data) not in SEQUENCE_TYPES:
+        return None
+    return (workout_type, *data, *map(type, data))
+
+
+def package_digest(key: tuple) -> bytes:
+    """Устойчивый между запусками хэш ключа пакета для кэша на диске.
+
+    repr различает 1 и 1.0, поэтому типы из ключа не нужны.
+    """
+    text = repr(key[:(len(key) + 1) // 2])
+    return hashlib.blake2b(text.encode(), digest_size=16).digest()
+
+
+class ResultCache:
+    """Кэш InfoMessage с вытеснением давно не запрошенных записей.
+
+    Если задан path, результаты дополнительно пишутся в SQLite
+    и ищутся там при промахе в памяти. Кэшируются только результаты
+    корректных пакетов, проверку выполняет вызывающий код.
+
+    В памяти лежат кортежи значений, а не InfoMessage: кортежи
+    из чисел и строк сборщик мусора не обходит, и большой кэш
+    не замедляет сборки.
+    """
+
+    key = staticmethod(package_key)
+
+    def __init__(self, maxsize: int = 65536,
+                 path: Optional[str] = None) -> None:
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_hits = 0
+        self.unsaved = 0
+        self.db = None
+        if path is not None:
+            self.db = sqlite3.connect(path)
+            self.db.execute(SCHEMA)
+
+    def get(self, key: Optional[tuple]) -> Optional[InfoMessage]:
+        """Результат пакета с ключом package_key или None при промахе."""
+        if key is None:
+            self.misses += 1
+            return None
+        try:
+            values = self.entries.get(key)
+        except TypeError:
+            # Нехэшируемые параметры: пакет заведомо некорректен
+            self.misses += 1
+            return None
+        if values is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return InfoMessage(*values)
+        if self.db is not None:
+            values = self.load(key)
+            if values is not None:
+                self.disk_hits += 1
+                self.remember(key, values)
+                return InfoMessage(*values)
+        self.misses += 1
+        return None
+
+    def load(self, key: tuple) -> Optional[tuple]:
+        """Значения результата пакета из SQLite или None."""
+        try:
+            digest = package_digest(key)
+        except (TypeError, ValueError):
+            return None
+        return self.db.execute(SELECT, (digest,)).fetchone()
+
+    def put(self, key: tuple, info_message: InfoMessage) -> None:
+        """Сохранить результат корректного пакета."""
+        values = message_values(info_message)
+        self.remember(key, values)
+        if self.db is not None:
+            self.db.execute(INSERT, (package_digest(key), *values))
+            self.unsaved += 1
+            if self.unsaved >= COMMIT_EVERY:
+                self.commit()
+
+    def remember(self, key: tuple, values: tuple) -> None:
+        """Положить результат в память, вытеснив самый старый."""
+        self.entries[key] = values
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def commit(self) -> None:
+        """Записать накопленные результаты в SQLite."""
+        if self.db is not None and self.unsaved:
+            self.db.commit()
+            self.unsaved = 0
+
+    def stats(self) -> dict:
+        """Счётчики попаданий, промахов и вытеснений."""
+        return {'hits': self.hits, 'disk_hits': self.disk_hits,
+                'misses': self.misses, 'evictions': self.evictions,
+                'size': len(self.entries)}
+
+    def close(self) -> None:
+        """Сохранить результаты и закрыть файл SQLite."""
+        self.commit()
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+    def __enter__(self) -> 'ResultCache':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
@@ -0,0 +1,124 @@
+"""Лёгкая точка входа фитнес трекера для частых коротких запусков.
+
+При запуске импортируется только homework; pipeline, server, storage
+и остальные модули загружаются, лишь когда вызвана их команда.
+
+    python cli.py calc КОД ЗНАЧЕНИЕ ...       расчёт одного пакета
+    python cli.py worker [--unix ПУТЬ]        тёплый процесс на сокете
+    python cli.py call КОД ЗНАЧЕНИЕ ... [--unix ПУТЬ]
+    python cli.py pipeline|server|archive|generator|deadletter|cluster
+                  |columnar|coefficients|anomaly|benchmark АРГУМЕНТЫ
+
+Тёплый процесс - это server.py на Unix-сокете: пакеты принимаются
+строками JSON, ответ - строка JSON в формате jsonl из writers.py.
+Шлюз может писать в сокет сам, например
+echo '["RUN", [5000, 1, 30]]' | socat - UNIX-CONNECT:/tmp/fitness.sock,
+и не запускать интерпретатор вовсе. Команда call делает то же
+из Python и считает пакет сама, если тёплый процесс не запущен.
+Для быстрого старта модули стоит заранее скомпилировать:
+python -m compileall.
+"""
+import sys
+
+from homework import InfoMessage, calculate_package
+
+SOCKET_PATH = '/tmp/fitness.sock'
+# Команды, которые передаются main() модуля с тем же именем
+MODULES = ('pipeline', 'server', 'archive', 'generator', 'deadletter',
+           'cluster', 'columnar', 'coefficients', 'anomaly', 'benchmark')
+USAGE = __doc__.split('\n\n')[2]
+
+
+def parse_package(args: list) -> tuple:
+    """Код и числовые параметры пакета из аргументов командной строки."""
+    return args[0], [float(value) for value in args[1:]]
+
+
+def calc(workout_type: str, data: list) -> int:
+    """Напечатать сообщение о тренировке, вернуть код завершения."""
+    info_message, error = calculate_package(workout_type, data)
+    if error is not None:
+        print(error.message, file=sys.stderr)
+        return 1
+    print(info_message.get_message())
+    return 0
+
+
+def split_socket(args: list) -> tuple:
+    """Отделить --unix ПУТЬ от остальных аргументов."""
+    if '--unix' in args:
+        index = args.index('--unix')
+        return args[:index] + args[index + 2:], args[index + 1]
+    return args, SOCKET_PATH
+
+
+def request(path: str, workout_type: str, data: list) -> bytes:
+    """Отправить пакет тёплому процессу и вернуть строку ответа."""
+    import socket
+
+    values = ', '.join(map(repr, data))
+    with socket.socket(socket.AF_UNIX) as connection:
+        connection.connect(path)
+        connection.sendall(f'["{workout_type}", [{values}]]\n'.encode())
+        connection.shutdown(socket.SHUT_WR)
+        return connection.makefile('rb').readline()
+
+
+def call(path: str, workout_type: str, data: list) -> int:
+    """Рассчитать пакет в тёплом процессе или, без него, на месте."""
+    try:
+        response = request(path, workout_type, data)
+    except OSError:
+        return calc(workout_type, data)
+    import json
+
+    fields = json.loads(response)
+    if 'error' in fields:
+        print(response.decode().strip(), file=sys.stderr)
+        return 1
+    print(InfoMessage(**fields).get_message())
+    return 0
+
+
+def worker(path: str) -> None:
+    """Работать тёплым процессом на Unix-сокете path."""
+    import asyncio
+    import os
+
+    import server
+
+    if os.path.exists(path):
+        os.remove(path)
+    asyncio.run(server.serve_forever(None, None, path))
+
+
+def main(argv=None) -> int:
+    """Точка входа командной строки, возвращает код завершения."""
+    args = sys.argv[1:] if argv is None else list(argv)
+    if not args or args[0] in ('-h', '--help'):
+        print(USAGE)
+        return 0 if args else 2
+    command, args = args[0], args[1:]
+    if command in MODULES:
+        import importlib
+        importlib.import_module(command).main(args)
+        return 0
+    args, path = split_socket(args)
+    if command == 'worker':
+        worker(path)
+        return 0
+    if command not in ('calc', 'call') or not args:
+        print(USAGE, file=sys.stderr)
+        return 2
+    try:
+        workout_type, data = parse_package(args)
+    except ValueError:
+        print('Параметры пакета должны быть числами.', file=sys.stderr)
+        return 2
+    if command == 'calc':
+        return calc(workout_type, data)
+    return call(path, workout_type, data)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
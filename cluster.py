@@ -0,0 +1,324 @@
+"""Распределённая обработка событий: координатор и обработчики.
+
+Событие - (пользователь, время, код, параметры пакета). Координатор
+делит пользователей на шарды по хэшу, а шарды - между обработчиками,
+поэтому все события пользователя попадают к одному обработчику.
+Обработчик считает тренировки через calculate_package и копит итоги
+в своём Aggregator. В конце прохода координатор забирает итоги каждого
+обработчика один раз и складывает через Aggregator.absorb.
+Пользователи у обработчиков разные, поэтому итоги переходят целиком,
+без пооконного сложения.
+
+Обработчики - отдельные процессы с multiprocessing.connection
+на Unix-сокете или TCP-порту, поэтому на одной машине несколько
+процессов заменяют несколько узлов.
+
+Доставка - не меньше одного раза, единица повтора - шард. Если
+обработчик упал, итоги его шардов за проход теряются целиком,
+а шарды отдаются живым обработчикам и считаются заново следующим
+проходом по источнику. Поэтому источник событий должен читаться
+повторно (список, EventFile), а повтор ничего не считает дважды.
+
+Запуск обработчика:  python cluster.py worker АДРЕС
+Обработка файла:     python cluster.py run ФАЙЛ (--connect АДРЕС ... |
+                                                 --local N)
+Адрес - путь к Unix-сокету или ХОСТ:ПОРТ. В файле по событию
+в строке: [пользователь, время, код, [параметры]]. Итоги печатаются
+строками JSON по пользователям и типам тренировок.
+"""
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+from multiprocessing.connection import Client, Listener
+from typing import Iterable, Iterator, Optional
+
+from aggregation import Aggregator
+from homework import calculate_package
+
+AUTHKEY = b'fitness-tracker'
+# Событий в одном сообщении обработчику
+CHUNK_SIZE = 5000
+# Шардов на обработчик: после падения его шарды делятся между живыми
+SHARDS_PER_WORKER = 4
+RETRIES = 3
+
+
+def parse_address(text: str):
+    """Адрес обработчика: путь к Unix-сокету или пара (хост, порт)."""
+    host, separator, port = text.rpartition(':')
+    if separator and port.isdigit():
+        return host, int(port)
+    return text
+
+
+def process_events(aggregator: Aggregator, events: list) -> int:
+    """Учесть события в итогах, вернуть число отклонённых событий.
+
+    Отклоняются пакеты с ошибкой calculate_package и события, которые
+    нельзя разобрать или учесть: не из четырёх частей, со временем
+    не числом, с нехэшируемым пользователем. Такое событие отклонится
+    при любом повторе, поэтому ронять из-за него обработчик нельзя:
+    повторы нужны только для упавших процессов.
+    """
+    rejected = 0
+    add = aggregator.add
+    for event in events:
+        try:
+            user_id, timestamp, workout_type, data = event
+            info_message, error = calculate_package(workout_type, data)
+            if error is None:
+                add(user_id, timestamp, info_message)
+            else:
+                rejected += 1
+        except (ValueError, TypeError, KeyError, OverflowError, OSError):
+            rejected += 1
+    return rejected
+
+
+def serve(address, authkey: bytes = AUTHKEY,
+          fail_after: Optional[int] = None) -> None:
+    """Работать обработчиком на address до команды stop.
+
+    Сообщения координатора: ('task', события), ('collect',) - ответить
+    ('partial', итоги, отклонено) и начать новые итоги, ('stop',).
+    fail_after - завершить процесс на этом блоке, чтобы проверить
+    повторы.
+    """
+    tasks = 0
+    with Listener(address, authkey=authkey) as listener:
+        while True:
+            with listener.accept() as connection:
+                aggregator, rejected = Aggregator(), 0
+                while True:
+                    try:
+                        message = connection.recv()
+                    except EOFError:
+                        break
+                    if message[0] == 'task':
+                        tasks += 1
+                        if tasks == fail_after:
+                            os._exit(1)
+                        rejected += process_events(aggregator, message[1])
+                    elif message[0] == 'collect':
+                        connection.send(('partial', aggregator, rejected))
+                        aggregator, rejected = Aggregator(), 0
+                    else:
+                        return
+
+
+class Link:
+    """Соединение координатора с обработчиком и его неотправленный блок."""
+    __slots__ = ('address', 'connection', 'events')
+
+    def __init__(self, address, authkey: bytes) -> None:
+        self.address = address
+        self.connection = Client(address, authkey=authkey)
+        self.events = []
+
+    def send(self, message: tuple) -> bool:
+        """Отправить сообщение, вернуть False, если обработчик упал."""
+        try:
+            self.connection.send(message)
+        except OSError:
+            return False
+        return True
+
+
+class Coordinator:
+    """Раздача шардов событий обработчикам и сбор их итогов."""
+
+    def __init__(self, addresses: Iterable, authkey: bytes = AUTHKEY,
+                 shards: Optional[int] = None, chunk_size: int = CHUNK_SIZE,
+                 retries: int = RETRIES) -> None:
+        self.links = [Link(address, authkey) for address in addresses]
+        self.shards = shards or SHARDS_PER_WORKER * len(self.links)
+        self.chunk_size = chunk_size
+        self.retries = retries
+        self.aggregator = Aggregator()
+        self.rejected = 0
+        self.retried = 0
+
+    def run(self, events: Iterable[tuple]) -> Aggregator:
+        """Обработать события и вернуть сложенные итоги.
+
+        events читается заново для шардов упавших обработчиков.
+        """
+        if iter(events) is events:
+            raise TypeError('Нужен повторно читаемый источник событий.')
+        pending = set(range(self.shards))
+        for _ in range(self.retries + 1):
+            if not self.links:
+                raise RuntimeError('Не осталось доступных обработчиков.')
+            owners = [None] * self.shards
+            for number, shard in enumerate(sorted(pending)):
+                owners[shard] = self.links[number % len(self.links)]
+            pending = self.send_pass(events, owners)
+            pending |= self.collect(owners)
+            if not pending:
+                return self.aggregator
+            self.retried += len(pending)
+        raise RuntimeError(f'Шарды {sorted(pending)} не обработаны '
+                           f'за {self.retries + 1} попыток.')
+
+    def send_pass(self, events: Iterable[tuple], owners: list) -> set:
+        """Разослать события шардов прохода, вернуть потерянные шарды."""
+        failed = set()
+        shards = self.shards
+        chunk_size = self.chunk_size
+        for event in events:
+            try:
+                shard = hash(event[0]) % shards
+            except (TypeError, LookupError):
+                # Событие без пользователя отклонит обработчик шарда 0
+                shard = 0
+            link = owners[shard]
+            if link is None:
+                continue
+            link.events.append(event)
+            if len(link.events) >= chunk_size:
+                if not link.send(('task', link.events)):
+                    failed |= self.drop(link, owners)
+                link.events = []
+        for link in set(owners) - {None}:
+            if link.events and not link.send(('task', link.events)):
+                failed |= self.drop(link, owners)
+            link.events = []
+        return failed
+
+    def collect(self, owners: list) -> set:
+        """Сложить итоги обработчиков прохода, вернуть потерянные шарды."""
+        failed = set()
+        links = [link for link in self.links if link in owners]
+        for link in links:
+            if not link.send(('collect',)):
+                failed |= self.drop(link, owners)
+        for link in links:
+            if link not in self.links:
+                continue
+            try:
+                _, partial, rejected = link.connection.recv()
+            except (EOFError, OSError):
+                failed |= self.drop(link, owners)
+                continue
+            self.aggregator.absorb(partial)
+            self.rejected += rejected
+        return failed
+
+    def drop(self, link: Link, owners: list) -> set:
+        """Убрать упавший обработчик, вернуть его шарды прохода."""
+        link.connection.close()
+        self.links.remove(link)
+        lost = {shard for shard, owner in enumerate(owners)
+                if owner is link}
+        for shard in lost:
+            owners[shard] = None
+        return lost
+
+    def close(self, stop: bool = False) -> None:
+        """Закрыть соединения, с stop - и остановить обработчики."""
+        for link in self.links:
+            if stop:
+                with contextlib.suppress(OSError):
+                    link.connection.send(('stop',))
+            link.connection.close()
+        self.links = []
+
+    def __enter__(self) -> 'Coordinator':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+def start_local(count: int, directory: str,
+                authkey: bytes = AUTHKEY) -> tuple:
+    """Запустить count обработчиков на Unix-сокетах в directory.
+
+    Возвращает процессы и адреса; координатор может подключаться сразу.
+    """
+    addresses = [os.path.join(directory, f'worker{index}.sock')
+                 for index in range(count)]
+    processes = [multiprocessing.Process(target=serve,
+                                         args=(address, authkey))
+                 for address in addresses]
+    for process in processes:
+        process.start()
+    for address, process in zip(addresses, processes):
+        wait_listening(address, process)
+    return processes, addresses
+
+
+def wait_listening(address: str, process: multiprocessing.Process) -> None:
+    """Дождаться, пока обработчик начнёт слушать Unix-сокет."""
+    while not os.path.exists(address):
+        if not process.is_alive():
+            raise RuntimeError(f'Обработчик {address} не запустился.')
+        process.join(0.01)
+
+
+class EventFile:
+    """Файл событий JSON Lines, который можно читать повторно."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def __iter__(self) -> Iterator[tuple]:
+        with open(self.path, encoding='utf-8') as stream:
+            for line in stream:
+                if line.strip():
+                    yield tuple(json.loads(line))
+
+
+def print_totals(aggregator: Aggregator) -> None:
+    """Напечатать итоги строками JSON по пользователям и типам."""
+    for user_id, by_type in aggregator.totals.items():
+        for training_type, totals in by_type.items():
+            print(json.dumps({'user_id': user_id,
+                              'training_type': training_type,
+                              **totals.as_dict()}, ensure_ascii=False))
+
+
+def run(path: str, addresses: list) -> None:
+    """Обработать файл событий на обработчиках addresses."""
+    with Coordinator(addresses) as coordinator:
+        print_totals(coordinator.run(EventFile(path)))
+    print(f'Событий: {coordinator.aggregator.events}, '
+          f'отклонено: {coordinator.rejected}, '
+          f'повторено шардов: {coordinator.retried}.', file=sys.stderr)
+
+
+def main(argv=None) -> None:
+    """Точка входа командной строки."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('mode', choices=('worker', 'run'))
+    parser.add_argument('target', help='адрес обработчика или файл событий')
+    parser.add_argument('--connect', nargs='+', default=[],
+                        help='адреса обработчиков')
+    parser.add_argument('--local', type=int, default=0,
+                        help='запустить N обработчиков на этой машине')
+    args = parser.parse_args(argv)
+    if args.mode == 'worker':
+        serve(parse_address(args.target))
+        return
+    if not args.connect and not args.local:
+        parser.error('нужны --connect или --local')
+    addresses = [parse_address(address) for address in args.connect]
+    if not args.local:
+        run(args.target, addresses)
+        return
+    with tempfile.TemporaryDirectory() as directory:
+        processes, local = start_local(args.local, directory)
+        try:
+            run(args.target, addresses + local)
+        finally:
+            for process in processes:
+                process.terminate()
+                process.join()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,226 @@
+"""Версии коэффициентов формул и пересчёт сохранённых результатов.
+
+Версия - словарь {код тренировки: {имя: значение}} с коэффициентами
+LEN_STEP, COEFF_CALORIE_1 и COEFF_CALORIE_2. Версия base - константы
+классов homework.py. Новые версии хранятся в файле JSON вида
+{"имя": {"RUN": {"COEFF_CALORIE_1": 18.5}}}, недостающие коэффициенты
+берутся из base. Версию можно передать в compute_batch по типу
+тренировки или получить класс тренировки с её коэффициентами
+через training_class.
+
+Пересчёт читает файл результатов columnar.py, где рядом с исходными
+параметрами лежат дистанция и скорость, а в метаданных - версия,
+по которой они посчитаны. Коэффициенты калорий на дистанцию
+и скорость не влияют, поэтому калории считаются заново по готовой
+скорости через compute_calories, а остальные столбцы переходят
+в новый файл без изменений. Дистанция и скорость пересчитываются
+только у типов, где версия меняет LEN_STEP, а типы без изменений
+не разбираются вовсе. Столбцы блоков читаются из буферов Arrow
+без копирования.
+
+Запуск: python coefficients.py show [--versions ФАЙЛ]
+        python coefficients.py recompute ВХОД [ВЫХОД] --version ИМЯ
+                                         [--versions ФАЙЛ]
+Без ВЫХОДА recompute только сравнивает калории по типам до и после.
+"""
+import argparse
+import json
+from array import array
+
+from homework import (NUMBER_TYPES, RESULT_FIELDS, WORKOUT_TYPES, Training,
+                      compute_batch, compute_calories)
+
+BASE = 'base'
+# Классы тренировок с коэффициентами версий: (код, коэффициенты) - класс
+CLASSES = {}
+
+
+def type_coefficients(version: dict, workout_type: str) -> dict:
+    """Коэффициенты типа из версии, для типа вне версии - из класса.
+
+    Тип мог быть зарегистрирован после того, как версия составлена.
+    """
+    coefficients = version.get(workout_type)
+    if coefficients is None:
+        coefficients = dict(zip(Training.COEFFICIENTS,
+                                WORKOUT_TYPES[workout_type].coefficients()))
+    return coefficients
+
+
+def base_version() -> dict:
+    """Коэффициенты классов тренировок по зарегистрированным типам."""
+    return {workout_type: type_coefficients({}, workout_type)
+            for workout_type in WORKOUT_TYPES}
+
+
+def make_version(overrides: dict) -> dict:
+    """Версия из замен {код: {имя: значение}} поверх base."""
+    version = base_version()
+    for workout_type, values in overrides.items():
+        if workout_type not in version:
+            raise ValueError(f'Неизвестный тип тренировки {workout_type}.')
+        for name, value in values.items():
+            if name not in Training.COEFFICIENTS:
+                raise ValueError(f'Неизвестный коэффициент {name}.')
+            if type(value) not in NUMBER_TYPES:
+                raise ValueError(f'Коэффициент {name} должен быть числом.')
+            version[workout_type][name] = value
+    return version
+
+
+def load_versions(path: str) -> dict:
+    """Версии из файла JSON вместе с base."""
+    with open(path, encoding='utf-8') as stream:
+        overrides = json.load(stream)
+    return {BASE: base_version(),
+            **{name: make_version(values)
+               for name, values in overrides.items()}}
+
+
+def training_class(workout_type: str, coefficients: dict) -> type:
+    """Класс тренировки с коэффициентами одного типа из версии.
+
+    Класс наследует класс тренировки и называется так же, поэтому
+    show_training_info и get_message работают без изменений.
+    """
+    key = (workout_type, *sorted(coefficients.items()))
+    cls = CLASSES.get(key)
+    if cls is None:
+        cls = CLASSES[key] = WORKOUT_TYPES[workout_type].with_coefficients(
+            coefficients)
+    return cls
+
+
+def doubles(column) -> memoryview:
+    """Значения столбца float64 Arrow без копирования."""
+    view = memoryview(column.buffers()[1]).cast('d')
+    return view[column.offset:column.offset + len(column)]
+
+
+class Recalculation:
+    """Пересчёт блоков файла результатов по новой версии.
+
+    totals - по типам: [записей, калорий было, калорий стало].
+    """
+
+    def __init__(self, version: dict, stored: dict) -> None:
+        from columnar import load_pyarrow
+
+        self.pyarrow = load_pyarrow()
+        import pyarrow.compute
+        self.compute = pyarrow.compute
+        self.version = version
+        self.stored = stored
+        self.totals = {}
+
+    def arrow(self, values: array):
+        """Столбец float64 Arrow поверх array('d') без копирования."""
+        return self.pyarrow.Array.from_buffers(
+            self.pyarrow.float64(), len(values),
+            [None, self.pyarrow.py_buffer(values)])
+
+    def __call__(self, batch):
+        """Пересчитать блок, вернуть блок с новыми показателями."""
+        compute = self.compute
+        codes = batch.column('workout_type')
+        results = {name: batch.column(name) for name in RESULT_FIELDS}
+        for workout_type in WORKOUT_TYPES:
+            mask = compute.equal(codes, workout_type)
+            part = batch.filter(mask)
+            if not part.num_rows:
+                continue
+            totals = self.totals.setdefault(workout_type, [0, 0.0, 0.0])
+            before = sum(doubles(part.column('calories')))
+            totals[0] += part.num_rows
+            totals[1] += before
+            new = type_coefficients(self.version, workout_type)
+            old = type_coefficients(self.stored, workout_type)
+            if new == old:
+                totals[2] += before
+                continue
+            fields = WORKOUT_TYPES[workout_type].FIELDS
+            columns = {name: doubles(part.column(name))
+                       for name in (*fields, 'speed')}
+            if new['LEN_STEP'] == old['LEN_STEP']:
+                updated = {'calories': compute_calories(
+                    workout_type, columns, columns['speed'], new)}
+            else:
+                updated = dict(zip(RESULT_FIELDS, compute_batch(
+                    workout_type, columns, new)))
+            totals[2] += sum(updated['calories'])
+            for name, values in updated.items():
+                results[name] = compute.replace_with_mask(
+                    results[name], mask, self.arrow(values))
+        return self.pyarrow.record_batch(
+            [batch.column(name) for name in batch.schema.names
+             if name not in results]
+            + [results[name] for name in RESULT_FIELDS],
+            schema=batch.schema)
+
+
+def recompute(source: str, output: str, version: dict,
+              batch_size: int = 65536) -> dict:
+    """Пересчитать файл результатов source по версии version.
+
+    Новые результаты пишутся в output той же схемы с version
+    в метаданных; без output только считаются итоги. Возвращает
+    Recalculation.totals.
+    """
+    from columnar import ResultsWriter, iter_batches, read_coefficients
+
+    recalculation = Recalculation(version, read_coefficients(source))
+    writer = None
+    if output is not None:
+        writer = ResultsWriter(output, batch_size, coefficients=version)
+    try:
+        for batch in iter_batches(source, batch_size):
+            batch = recalculation(batch)
+            if writer is not None:
+                writer.write_batch(batch)
+    finally:
+        if writer is not None:
+            writer.close()
+    return recalculation.totals
+
+
+def print_totals(totals: dict) -> None:
+    """Напечатать калории по типам до и после пересчёта."""
+    for workout_type, (count, before, after) in totals.items():
+        if not count:
+            continue
+        change = (after - before) / before * 100 if before else 0.0
+        print(f'{workout_type}: записей {count}, калории '
+              f'{before:.3f} -> {after:.3f} ({change:+.2f}%)')
+
+
+def main(argv=None) -> None:
+    """Точка входа командной строки."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--versions', help='файл JSON с версиями')
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('show', parents=[common],
+                        help='вывести коэффициенты версий')
+    run = commands.add_parser('recompute', parents=[common],
+                              help='пересчитать результаты')
+    run.add_argument('input', help='файл .parquet или .arrow')
+    run.add_argument('output', nargs='?', help='файл новых результатов')
+    run.add_argument('--version', required=True, help='имя версии')
+    args = parser.parse_args(argv)
+    if args.versions:
+        versions = load_versions(args.versions)
+    else:
+        versions = {BASE: base_version()}
+    if args.command == 'show':
+        for name, version in versions.items():
+            for workout_type, values in version.items():
+                print(name, workout_type, ' '.join(
+                    f'{key}={value}' for key, value in values.items()))
+        return
+    if args.version not in versions:
+        parser.error(f'нет версии {args.version}')
+    print_totals(recompute(args.input, args.output, versions[args.version]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,288 @@
+"""Столбцовый экспорт результатов тренировок в Parquet и Arrow.
+
+Аналитикам не нужно разбирать строки get_message: таблица хранит
+исходные параметры пакета и показатели тренировки как float64 с полной
+точностью. Столбцы: workout_type, training_type, action, duration,
+weight, height, length_pool, count_pool, distance, speed, calories;
+параметры, которых у типа тренировки нет, пусты (null).
+
+ResultsWriter копит строки и пишет их блоками (record batch)
+по batch_size, поэтому память не зависит от объёма выгрузки. Формат
+выбирается по расширению: .parquet или .arrow (файл Arrow IPC
+со сжатием zstd, его читает и pandas.read_feather).
+
+В метаданных схемы (ключ coefficients) записываются коэффициенты
+формул, по которым посчитаны результаты, - версия из coefficients.py.
+
+Нужен pyarrow (pip install pyarrow). Он импортируется только при
+записи и чтении, остальные модули трекера от него не зависят.
+
+Запуск: python columnar.py export ВХОД ФАЙЛ [--format jsonl|csv|archive]
+        python columnar.py show ФАЙЛ [--output-format text|csv|jsonl]
+"""
+import argparse
+import json
+import sys
+from itertools import repeat
+from typing import Iterable, Iterator
+
+from coefficients import base_version, training_class
+from homework import (RESULT_FIELDS, WORKOUT_TYPES, InfoMessage,
+                      calculate_package, compute_batch)
+
+INPUT_FIELDS = ('action', 'duration', 'weight', 'height', 'length_pool',
+                'count_pool')
+COLUMNS = ('workout_type', 'training_type', *INPUT_FIELDS, *RESULT_FIELDS)
+BATCH_SIZE = 65536
+# Раскладки параметров по классам тренировок, см. layout
+LAYOUTS = {}
+
+
+def layout(workout_type: str) -> tuple:
+    """Номера параметров пакета для столбцов INPUT_FIELDS (None - нет
+    столбца) и номера столбцов INPUT_FIELDS для параметров пакета.
+
+    Раскладка строится при первом обращении, поэтому работают и типы,
+    зарегистрированные после импорта модуля.
+    """
+    training_class = WORKOUT_TYPES[workout_type]
+    result = LAYOUTS.get(training_class)
+    if result is None:
+        fields = training_class.FIELDS
+        unknown = [field for field in fields if field not in INPUT_FIELDS]
+        if unknown:
+            raise ValueError(f'Для параметров {", ".join(unknown)} '
+                             f'{workout_type} нет столбцов.')
+        result = LAYOUTS[training_class] = (
+            tuple(fields.index(field) if field in fields else None
+                  for field in INPUT_FIELDS),
+            tuple(INPUT_FIELDS.index(field) for field in fields))
+    return result
+
+
+def load_pyarrow():
+    """Импортировать pyarrow или объяснить, как его установить."""
+    try:
+        import pyarrow
+        import pyarrow.parquet  # noqa: F401
+    except ImportError as error:
+        raise ImportError('Для столбцового экспорта нужен pyarrow: '
+                          'pip install pyarrow.') from error
+    return pyarrow
+
+
+def make_schema(pyarrow, coefficients: dict = None):
+    """Схема таблицы результатов с версией коэффициентов."""
+    return pyarrow.schema(
+        [(name, pyarrow.string()) for name in COLUMNS[:2]]
+        + [(name, pyarrow.float64()) for name in COLUMNS[2:]],
+        metadata={'coefficients': json.dumps(
+            coefficients or base_version())})
+
+
+def guess_format(path: str) -> str:
+    """Формат файла по расширению: parquet или arrow."""
+    return 'parquet' if path.endswith('.parquet') else 'arrow'
+
+
+class ResultsWriter:
+    """Запись результатов тренировок в Parquet или Arrow блоками."""
+
+    def __init__(self, path: str, batch_size: int = BATCH_SIZE,
+                 coefficients: dict = None) -> None:
+        self.pyarrow = load_pyarrow()
+        self.schema = make_schema(self.pyarrow, coefficients)
+        self.batch_size = batch_size
+        self.coefficients = coefficients
+        self.columns = {name: [] for name in COLUMNS}
+        self.inputs = [self.columns[name] for name in INPUT_FIELDS]
+        self.rows = 0
+        self.written = 0
+        if guess_format(path) == 'parquet':
+            self.writer = self.pyarrow.parquet.ParquetWriter(
+                path, self.schema, compression='zstd')
+        else:
+            self.writer = self.pyarrow.ipc.new_file(
+                path, self.schema, options=self.pyarrow.ipc.IpcWriteOptions(
+                    compression='zstd'))
+
+    def write(self, workout_type: str, data,
+              info_message: InfoMessage) -> None:
+        """Добавить пакет и посчитанное по нему сообщение."""
+        columns = self.columns
+        columns['workout_type'].append(workout_type)
+        columns['training_type'].append(info_message.training_type)
+        for column, index in zip(self.inputs, layout(workout_type)[0]):
+            column.append(None if index is None else data[index])
+        columns['distance'].append(info_message.distance)
+        columns['speed'].append(info_message.speed)
+        columns['calories'].append(info_message.calories)
+        self.rows += 1
+        if self.rows >= self.batch_size:
+            self.flush()
+
+    def write_packages(self, packages: Iterable[tuple]) -> int:
+        """Посчитать и добавить корректные пакеты, вернуть число отказов."""
+        rejected = 0
+        for workout_type, data in packages:
+            cls = None
+            if (self.coefficients and type(workout_type) is str
+                    and workout_type in WORKOUT_TYPES
+                    and workout_type in self.coefficients):
+                cls = training_class(workout_type,
+                                     self.coefficients[workout_type])
+            info_message, error = calculate_package(workout_type, data, cls)
+            if error is not None:
+                rejected += 1
+                continue
+            self.write(workout_type, data, info_message)
+        return rejected
+
+    def write_columns(self, workout_type: str, columns: dict) -> None:
+        """Посчитать через compute_batch и добавить столбцы пакетов.
+
+        columns - проверенные параметры пакетов одного типа, как
+        у compute_batch.
+        """
+        size = len(columns['action'])
+        coefficients = (self.coefficients or {}).get(workout_type)
+        results = dict(zip(RESULT_FIELDS, compute_batch(
+            workout_type, columns, coefficients)))
+        own = self.columns
+        own['workout_type'].extend(repeat(workout_type, size))
+        own['training_type'].extend(
+            repeat(WORKOUT_TYPES[workout_type].__name__, size))
+        for name in INPUT_FIELDS:
+            own[name].extend(columns[name] if name in columns
+                             else repeat(None, size))
+        for name in RESULT_FIELDS:
+            own[name].extend(results[name])
+        self.rows += size
+        if self.rows >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Записать накопленные строки одним блоком."""
+        if not self.rows:
+            return
+        batch = self.pyarrow.record_batch(
+            [self.pyarrow.array(self.columns[field.name], field.type)
+             for field in self.schema], schema=self.schema)
+        self.writer.write_batch(batch)
+        for column in self.columns.values():
+            column.clear()
+        self.written += self.rows
+        self.rows = 0
+
+    def write_batch(self, batch) -> None:
+        """Записать готовый блок pyarrow.RecordBatch с той же схемой."""
+        self.flush()
+        self.writer.write_batch(self.pyarrow.record_batch(
+            batch.columns, schema=self.schema))
+        self.written += batch.num_rows
+
+    def close(self) -> None:
+        """Записать остаток и закрыть файл."""
+        self.flush()
+        self.writer.close()
+
+    def __enter__(self) -> 'ResultsWriter':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+def iter_batches(path: str, batch_size: int = BATCH_SIZE) -> Iterator:
+    """Читать файл результатов блоками pyarrow.RecordBatch."""
+    pyarrow = load_pyarrow()
+    if guess_format(path) == 'parquet':
+        yield from pyarrow.parquet.ParquetFile(path).iter_batches(batch_size)
+        return
+    reader = pyarrow.ipc.open_file(pyarrow.memory_map(path))
+    for index in range(reader.num_record_batches):
+        yield reader.get_batch(index)
+
+
+def read_table(path: str):
+    """Прочитать файл результатов целиком как pyarrow.Table.
+
+    Для pandas: read_table(path).to_pandas().
+    """
+    pyarrow = load_pyarrow()
+    if guess_format(path) == 'parquet':
+        return pyarrow.parquet.read_table(path)
+    # Столбцы ссылаются на отображённый файл без копирования
+    return pyarrow.ipc.open_file(pyarrow.memory_map(path)).read_all()
+
+
+def read_coefficients(path: str) -> dict:
+    """Версия коэффициентов, по которой посчитан файл результатов.
+
+    В файлах без метаданных результаты посчитаны по base.
+    """
+    pyarrow = load_pyarrow()
+    if guess_format(path) == 'parquet':
+        schema = pyarrow.parquet.read_schema(path)
+    else:
+        schema = pyarrow.ipc.open_file(pyarrow.memory_map(path)).schema
+    metadata = schema.metadata or {}
+    if b'coefficients' not in metadata:
+        return base_version()
+    return json.loads(metadata[b'coefficients'])
+
+
+def iter_results(path: str) -> Iterator[tuple]:
+    """Результаты из файла: (код, параметры пакета, InfoMessage)."""
+    for batch in iter_batches(path):
+        columns = batch.to_pydict()
+        inputs = zip(*(columns[name] for name in INPUT_FIELDS))
+        for workout_type, values, message in zip(
+                columns['workout_type'], inputs,
+                zip(columns['training_type'], columns['duration'],
+                    *(columns[name] for name in RESULT_FIELDS))):
+            data = [values[index] for index in layout(workout_type)[1]]
+            yield workout_type, data, InfoMessage(*message)
+
+
+def main(argv=None) -> None:
+    """Точка входа командной строки."""
+    from pipeline import open_input, read_packages
+    from pipeline import guess_format as guess_input_format
+    from writers import TEMPLATES, MessageWriter
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+    export = commands.add_parser('export', help='посчитать и выгрузить')
+    export.add_argument('input', help="jsonl, csv или архив, '-' - stdin")
+    export.add_argument('output', help='файл .parquet или .arrow')
+    export.add_argument('--format', choices=('jsonl', 'csv', 'archive'))
+    show = commands.add_parser('show', help='вывести сообщения из файла')
+    show.add_argument('path')
+    show.add_argument('--output-format', choices=TEMPLATES, default='text')
+    args = parser.parse_args(argv)
+    if args.command == 'show':
+        with MessageWriter(sys.stdout, args.output_format) as writer:
+            writer.write_many(message for _, _, message
+                              in iter_results(args.path))
+        return
+    fmt = args.format or guess_input_format(args.input)
+    rejected = 0
+    with ResultsWriter(args.output) as writer:
+        if fmt == 'archive':
+            # В архиве только проверенные пакеты, считаем столбцами
+            from archive import Archive
+
+            with Archive(args.input) as archive:
+                for workout_type, columns in archive.iter_batches():
+                    writer.write_columns(workout_type, columns)
+        else:
+            with open_input(args.input) as stream:
+                rejected = writer.write_packages(
+                    read_packages(stream, fmt))
+    print(f'Выгружено: {writer.written}, отклонено: {rejected}.',
+          file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
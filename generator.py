@@ -0,0 +1,195 @@
+"""Генератор синтетических пакетов от датчиков для нагрузочных замеров.
+
+Пакеты (код, параметры) похожи на настоящие: скорость, длительность,
+вес и рост распределены около типичных значений и укладываются
+в допустимые границы validate_package. Доля invalid_rate пакетов
+нарушает одно из правил проверки, доля duplicate_rate повторяет
+недавно отправленный пакет, как при переподключении устройства.
+Один и тот же seed даёт один и тот же поток.
+
+Запуск: python generator.py ЧИСЛО [--seed N] [--format jsonl|csv|archive]
+                            [--output ФАЙЛ] [--invalid-rate R]
+                            [--duplicate-rate R]
+"""
+import argparse
+import random
+import sys
+from itertools import islice
+from typing import Iterator, Optional, TextIO
+
+from homework import (MAX_HEIGHT_CM, MAX_WEIGHT_PEOPLE_KG, MIN_HEIGHT_CM,
+                      NORMAL_WEIGHT_5_YERS_OLD_CHILDREN_KG, Swimming,
+                      Training)
+
+# Доли типов тренировок в потоке пакетов от устройств
+MIX = {'RUN': 0.5, 'WLK': 0.35, 'SWM': 0.15}
+# Сколько последних пакетов может повторить устройство
+RESEND_WINDOW = 1000
+CHUNK = 4096
+UNKNOWN_TYPE = 'BIK'
+JSONL_LINE = '["%s", [%s]]\n'
+CSV_LINE = '%s,%s\n'
+
+
+def bell(random, low: float, high: float) -> float:
+    """Случайное число от low до high, чаще около середины.
+
+    Сумма трёх равномерных величин (распределение Ирвина - Холла)
+    похожа на нормальное, но не выходит за границы и считается
+    в несколько раз быстрее random.gauss.
+    """
+    return low + (high - low) * (random() + random() + random()) / 3
+
+
+def common(random) -> tuple:
+    """Длительность в часах и вес в кг, общие для всех тренировок.
+
+    Округление через int: round с числом знаков в разы медленнее.
+    """
+    return (int(bell(random, 0.2, 1.6) * 100) / 100,
+            int(bell(random, 40, 110) * 10) / 10)
+
+
+def run_package(rnd: random.Random) -> list:
+    """Параметры бега: шаги, длительность, вес."""
+    hours, weight = common(rnd.random)
+    speed = bell(rnd.random, 6, 15)
+    return [round(speed * hours * 1000 / Training.LEN_STEP), hours, weight]
+
+
+def walk_package(rnd: random.Random) -> list:
+    """Параметры ходьбы: шаги, длительность, вес, рост."""
+    hours, weight = common(rnd.random)
+    speed = bell(rnd.random, 3.5, 8)
+    return [round(speed * hours * 1000 / Training.LEN_STEP), hours, weight,
+            int(bell(rnd.random, 145, 199))]
+
+
+def swim_package(rnd: random.Random) -> list:
+    """Параметры плавания: гребки, длительность, вес, бассейн."""
+    hours, weight = common(rnd.random)
+    speed = bell(rnd.random, 1.2, 3.9)
+    length_pool = 25 if rnd.random() < 0.8 else 50
+    return [round(speed * hours * 1000 / Swimming.LEN_STEP), hours, weight,
+            length_pool, max(1, round(speed * hours * 1000 / length_pool))]
+
+
+MAKERS = {'RUN': run_package,
+          'WLK': walk_package,
+          'SWM': swim_package}
+
+
+def spoil(rnd: random.Random, workout_type: str, data: list) -> tuple:
+    """Нарушить в пакете одно правило проверки."""
+    kind = rnd.randrange(5)
+    if kind == 0:
+        return UNKNOWN_TYPE, data
+    if kind == 1:
+        return workout_type, data[:-1]
+    if kind == 2:
+        data[rnd.randrange(len(data))] = rnd.choice((0, -1))
+        return workout_type, data
+    if kind == 3 and workout_type == 'WLK':
+        data[3] = rnd.choice((MIN_HEIGHT_CM - 10, MAX_HEIGHT_CM + 10))
+        return workout_type, data
+    data[2] = rnd.choice((NORMAL_WEIGHT_5_YERS_OLD_CHILDREN_KG - 9,
+                          MAX_WEIGHT_PEOPLE_KG + 40))
+    return workout_type, data
+
+
+def generate(count: int, seed: int = 0, mix: Optional[dict] = None,
+             invalid_rate: float = 0.0,
+             duplicate_rate: float = 0.0) -> Iterator[tuple]:
+    """Поток из count пакетов (код, параметры).
+
+    Повторы берутся из окна в RESEND_WINDOW недавних пакетов и являются
+    отдельными копиями списка параметров.
+    """
+    mix = mix or MIX
+    rnd = random.Random(seed)
+    recent = []
+    codes = list(mix)
+    weights = list(mix.values())
+    for start in range(0, count, CHUNK):
+        size = min(CHUNK, count - start)
+        for workout_type in rnd.choices(codes, weights, k=size):
+            if recent and rnd.random() < duplicate_rate:
+                workout_type, data = rnd.choice(recent)
+                yield workout_type, list(data)
+                continue
+            data = MAKERS[workout_type](rnd)
+            if rnd.random() < invalid_rate:
+                workout_type, data = spoil(rnd, workout_type, data)
+            if len(recent) >= RESEND_WINDOW:
+                recent[rnd.randrange(RESEND_WINDOW)] = (workout_type, data)
+            else:
+                recent.append((workout_type, data))
+            yield workout_type, list(data)
+
+
+def write_lines(packages: Iterator[tuple], stream: TextIO,
+                template: str) -> int:
+    """Записать пакеты строками по шаблону, вернуть их число."""
+    written = 0
+    while True:
+        lines = [template % (workout_type, ','.join(map(repr, data)))
+                 for workout_type, data in islice(packages, CHUNK)]
+        if not lines:
+            return written
+        stream.write(''.join(lines))
+        written += len(lines)
+
+
+def write_jsonl(packages: Iterator[tuple], stream: TextIO) -> int:
+    """Записать пакеты в формате JSON Lines для pipeline.py."""
+    return write_lines(packages, stream, JSONL_LINE)
+
+
+def write_csv(packages: Iterator[tuple], stream: TextIO) -> int:
+    """Записать пакеты в формате CSV для pipeline.py."""
+    return write_lines(packages, stream, CSV_LINE)
+
+
+def write_archive(packages: Iterator[tuple], path: str) -> int:
+    """Записать корректные пакеты в двоичный архив archive.py."""
+    from archive import ArchiveWriter
+
+    with ArchiveWriter(path) as writer:
+        writer.write_many(packages)
+    return writer.count
+
+
+WRITERS = {'jsonl': write_jsonl,
+           'csv': write_csv}
+
+
+def main(argv=None) -> None:
+    """Точка входа командной строки."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('count', type=int, help='число пакетов')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--format', choices=(*WRITERS, 'archive'),
+                        default='jsonl')
+    parser.add_argument('--output', help='файл вывода, по умолчанию stdout')
+    parser.add_argument('--invalid-rate', type=float, default=0.0,
+                        help='доля некорректных пакетов')
+    parser.add_argument('--duplicate-rate', type=float, default=0.0,
+                        help='доля повторно отправленных пакетов')
+    args = parser.parse_args(argv)
+    if args.format == 'archive' and (args.invalid_rate or not args.output):
+        parser.error('архив пишется только в файл и без некорректных '
+                     'пакетов')
+    packages = generate(args.count, args.seed, None, args.invalid_rate,
+                        args.duplicate_rate)
+    if args.format == 'archive':
+        write_archive(packages, args.output)
+        return
+    if args.output is None:
+        WRITERS[args.format](packages, sys.stdout)
+        return
+    with open(args.output, 'w', encoding='utf-8', newline='') as stream:
+        WRITERS[args.format](packages, stream)
+
+
+if __name__ == '__main__':
+    main()
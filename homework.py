@@ -1,8 +1,224 @@
 """Реализация фитнес трекера"""
+from array import array
+from itertools import repeat
+from math import isfinite
+from operator import attrgetter
+
+
+def parameter(name: str) -> property:
+    """Параметр тренировки, изменение которого сбрасывает кэш.
+
+    Значение хранится в слоте '_<name>', чтение идёт без вызова
+    Python-функции.
+    """
+    slot = '_' + name
+
+    def set_value(self, value) -> None:
+        setattr(self, slot, value)
+        self.clear_cache()
+    return property(attrgetter(slot), set_value,
+                    doc=f'Параметр тренировки {name}.')
+
+
+NORMAL_WEIGHT_5_YERS_OLD_CHILDREN_KG = 14
+MAX_WEIGHT_PEOPLE_KG = 160
+MIN_HEIGHT_CM = 50
+MAX_HEIGHT_CM = 250
+
+UNKNOWN_TYPE = 'unknown_type'
+WRONG_LENGTH = 'wrong_length'
+BAD_VALUE = 'bad_value'
+WEIGHT_RANGE = 'weight_range'
+HEIGHT_RANGE = 'height_range'
+CALCULATION_ERROR = 'calculation_error'
+
+ERROR_MESSAGES = {
+    UNKNOWN_TYPE: ('Неверное значение {workout_type} или неверное '
+                   'количество переданных параметров {value}.\n'
+                   'Повтороите попытку или перезагрузите устройство.'),
+    BAD_VALUE: ('Значение {field} не может быть строкой,'
+                ' а так же не должно быть меньше 1\n'
+                'Введите значения снова или перезагрузите устройство.'),
+    WEIGHT_RANGE: ('Получен weight {value} кг. '
+                   'Вес пользователя не должен быть '
+                   f'меньше {NORMAL_WEIGHT_5_YERS_OLD_CHILDREN_KG} кг,'
+                   f'а также больше {MAX_WEIGHT_PEOPLE_KG} кг. '
+                   'Повторите, пожалуйста, попытку.'),
+    HEIGHT_RANGE: ('Получен height {value} см. '
+                   'Рост пользователя не должен быть '
+                   f'меньше {MIN_HEIGHT_CM} см '
+                   f'и больше {MAX_HEIGHT_CM} см. '
+                   'Повторите, пожалуйста, попытку.'),
+}
+ERROR_MESSAGES[WRONG_LENGTH] = ERROR_MESSAGES[UNKNOWN_TYPE]
+ERROR_MESSAGES[CALCULATION_ERROR] = (
+    'Показатели тренировки {workout_type} не удалось посчитать: '
+    '{value}.\n'
+    'Проверьте параметры или перезагрузите устройство.')
+
+NUMBER_TYPES = (int, float)
+SEQUENCE_TYPES = (list, tuple)
+
+
+class ValidationError:
+    """Описание ошибки в пакете от датчиков.
+
+    code - код ошибки (UNKNOWN_TYPE, WRONG_LENGTH, BAD_VALUE,
+    WEIGHT_RANGE, HEIGHT_RANGE, CALCULATION_ERROR), field - имя
+    параметра или None, value - отклонённое значение (для ошибок
+    длины - число параметров, для ошибок расчёта - текст исключения
+    или бесконечный показатель с именем в field),
+    data - параметры пакета как есть; в сравнении не участвуют.
+    """
+    __slots__ = ('workout_type', 'code', 'field', 'value', 'data')
+
+    def __init__(self, workout_type: str, code: str,
+                 field: str = None, value=None, data=None) -> None:
+        self.workout_type = workout_type
+        self.code = code
+        self.field = field
+        self.value = value
+        self.data = data
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, ValidationError):
+            return NotImplemented
+        return ((self.workout_type, self.code, self.field, self.value)
+                == (other.workout_type, other.code, other.field,
+                    other.value))
+
+    def __repr__(self) -> str:
+        return (f'ValidationError({self.workout_type!r}, {self.code!r}, '
+                f'{self.field!r}, {self.value!r})')
+
+    @property
+    def message(self) -> str:
+        """Текст ошибки для пользователя."""
+        field = self.field.capitalize() if self.field else self.field
+        return ERROR_MESSAGES[self.code].format(
+            workout_type=self.workout_type, field=field, value=self.value)
+
+
+class PackageSchema:
+    """Правила проверки пакета одного типа тренировки.
+
+    Собирается один раз при импорте модуля. rules - кортеж правил
+    (номер параметра, имя, минимум, максимум, код ошибки),
+    bounds - те же правила без имени и кода для быстрой проверки.
+    """
+    __slots__ = ('workout_type', 'fields', 'length', 'rules', 'bounds')
+
+    def __init__(self, workout_type: str, fields: tuple,
+                 bounds: tuple) -> None:
+        self.workout_type = workout_type
+        self.fields = fields
+        self.length = len(fields)
+        self.rules = tuple((fields.index(field), field, low, high, code)
+                           for field, low, high, code in bounds)
+        self.bounds = tuple((index, low, high)
+                            for index, _, low, high, _ in self.rules)
+
+    def validate(self, data) -> 'ValidationError':
+        """Проверить пакет, вернуть ошибку или None."""
+        if type(data) not in SEQUENCE_TYPES:
+            return ValidationError(self.workout_type, WRONG_LENGTH,
+                                   data=data)
+        if len(data) != self.length:
+            return ValidationError(self.workout_type, WRONG_LENGTH,
+                                   value=len(data), data=data)
+        for value in data:
+            if not isinstance(value, NUMBER_TYPES) or not value > 0:
+                return self.find_error(data)
+        for index, low, high in self.bounds:
+            if not low <= data[index] <= high:
+                return self.find_error(data)
+        return None
+
+    def find_error(self, data) -> 'ValidationError':
+        """Найти первое нарушенное правило в отклонённом пакете."""
+        for field, value in zip(self.fields, data):
+            if not isinstance(value, NUMBER_TYPES) or not value > 0:
+                return ValidationError(self.workout_type, BAD_VALUE,
+                                       field, value, data)
+        for index, field, low, high, code in self.rules:
+            if not low <= data[index] <= high:
+                return ValidationError(self.workout_type, code,
+                                       field, data[index], data)
+        return None
+
+    def validate_columns(self, columns: dict) -> bytearray:
+        """Проверить столбцы параметров, вернуть маску отказов.
+
+        В маске 1 отмечает отклонённый пакет, 0 - корректный.
+        """
+        size = len(columns[self.fields[0]])
+        rejected = bytearray(size)
+        for field in self.fields:
+            column = columns[field]
+            if len(column) != size:
+                raise ValueError(f'Столбец {field} длиной {len(column)} '
+                                 f'вместо {size}.')
+            for index, value in enumerate(column):
+                if not isinstance(value, NUMBER_TYPES) or not value > 0:
+                    rejected[index] = 1
+        for _, field, low, high, _ in self.rules:
+            for index, value in enumerate(columns[field]):
+                if not rejected[index] and not low <= value <= high:
+                    rejected[index] = 1
+        return rejected
+
+
+WEIGHT_BOUNDS = ('weight', NORMAL_WEIGHT_5_YERS_OLD_CHILDREN_KG,
+                 MAX_WEIGHT_PEOPLE_KG, WEIGHT_RANGE)
+HEIGHT_BOUNDS = ('height', MIN_HEIGHT_CM, MAX_HEIGHT_CM, HEIGHT_RANGE)
+
+WORKOUT_TYPES = {}
+SCHEMAS = {}
+BUILDERS = {}
+
+
+def register_training(workout_type: str, bounds: tuple = (WEIGHT_BOUNDS,)):
+    """Зарегистрировать класс тренировки под кодом пакета.
+
+    Декоратор один раз записывает класс, его параметры FIELDS и правила
+    проверки bounds, после чего read_package, build_training
+    и validate_package находят тип одним обращением к словарю.
+    """
+    def decorator(training_class: type) -> type:
+        if workout_type in WORKOUT_TYPES:
+            raise ValueError(f'Код тренировки {workout_type} уже занят '
+                             f'классом {WORKOUT_TYPES[workout_type]}.')
+        training_class.WORKOUT_TYPE = workout_type
+        WORKOUT_TYPES[workout_type] = training_class
+        SCHEMAS[workout_type] = PackageSchema(
+            workout_type, training_class.FIELDS, bounds)
+        BUILDERS[workout_type] = training_class.from_package
+        return training_class
+    return decorator
+
+
+MESSAGE_TEMPLATE = ('Тип тренировки: %s; '
+                    'Длительность: %.3f ч.; '
+                    'Дистанция: %.3f км; '
+                    'Ср. скорость: %.3f км/ч; '
+                    'Потрачено ккал: %.3f.')
+# Значения сообщения в порядке полей, кортеж собирается без вызова
+# Python-функции
+# Показатели, которые считает тренировка
+RESULT_FIELDS = ('distance', 'speed', 'calories')
+message_values = attrgetter('training_type', 'duration', 'distance',
+                            'speed', 'calories')
 
 
 class InfoMessage:
-    """Информационное сообщение о тренировке."""
+    """Информационное сообщение о тренировке.
+
+    Хранит числа как есть, строка собирается только при вызове
+    get_message и запоминается вместе со значениями, из которых
+    собрана.
+    """
+    __slots__ = ('training_type', 'duration', 'distance', 'speed',
+                 'calories', '_message')
 
     def __init__(self, training_type: str,
                  duration: float,
@@ -14,38 +230,69 @@ class InfoMessage:
         self.distance = distance
         self.speed = speed
         self.calories = calories
+        self._message = None
 
     def get_message(self):
-        return (
-            f'Тип тренировки: {self.training_type}; '
-            f'Длительность: {self.duration:.3f} ч.; '
-            f'Дистанция: {self.distance:.3f} км; '
-            f'Ср. скорость: {self.speed:.3f} км/ч; '
-            f'Потрачено ккал: {self.calories:.3f}.')
+        # Сравнение значений дешевле форматирования и оставляет чтение
+        # полей прямым доступом к слотам, без свойств
+        values = message_values(self)
+        cached = self._message
+        if cached is None or cached[0] != values:
+            cached = self._message = (values, MESSAGE_TEMPLATE % values)
+        return cached[1]
 
 
 class Training:
     """Базовый класс тренировки."""
+    __slots__ = ('_action', '_duration', '_weight',
+                 '_distance', '_mean_speed', '_spent_calories')
+    FIELDS = ('action', 'duration', 'weight')
+    # Коэффициенты формул, которые заменяет версия из coefficients.py
+    COEFFICIENTS = ('LEN_STEP', 'COEFF_CALORIE_1', 'COEFF_CALORIE_2')
     LEN_STEP = 0.65
     M_IN_KM = 1000
     M_IN_HOUR = 60
 
+    action = parameter('action')
+    duration = parameter('duration')
+    weight = parameter('weight')
+
     def __init__(self,
                  action: int,
                  duration: float,
                  weight: float,
                  ) -> None:
-        self.action = action
-        self.duration = duration
-        self.weight = weight
+        self._action = action
+        self._duration = duration
+        self._weight = weight
+        self.clear_cache()
+
+    @classmethod
+    def from_package(cls, data) -> 'Training':
+        """Создать тренировку из списка параметров пакета.
+
+        Зарегистрированные наследники переопределяют метод и заполняют
+        слоты напрямую, без распаковки *data и вызова __init__.
+        """
+        return cls(*data)
+
+    def clear_cache(self) -> None:
+        """Сбросить запомненные дистанцию, скорость и калории."""
+        self._distance = None
+        self._mean_speed = None
+        self._spent_calories = None
 
     def get_distance(self) -> float:
         """Получить дистанцию в км."""
-        return (self.action * self.LEN_STEP) / self.M_IN_KM
+        if self._distance is None:
+            self._distance = (self.action * self.LEN_STEP) / self.M_IN_KM
+        return self._distance
 
     def get_mean_speed(self) -> float:
         """Получить среднюю скорость движения."""
-        return self.get_distance() / self.duration
+        if self._mean_speed is None:
+            self._mean_speed = self.get_distance() / self.duration
+        return self._mean_speed
 
     def get_spent_calories(self) -> float:
         """Получить количество затраченных килокалорий."""
@@ -61,150 +308,446 @@ class Training:
                            self.get_spent_calories())
         return info
 
-
+    @classmethod
+    def coefficients(cls, overrides: dict = None) -> tuple:
+        """Коэффициенты в порядке COEFFICIENTS с заменами из overrides."""
+        overrides = overrides or {}
+        return tuple(overrides.get(name, getattr(cls, name, None))
+                     for name in cls.COEFFICIENTS)
+
+    @classmethod
+    def compute_batch(cls, columns: dict, coefficients: dict = None) -> tuple:
+        """Посчитать дистанцию, скорость и калории для столбцов данных.
+
+        coefficients заменяет коэффициенты класса, например версией
+        из coefficients.py.
+        """
+        if (cls.get_distance is not Training.get_distance
+                or cls.get_mean_speed is not Training.get_mean_speed):
+            return cls.compute_rows(columns, coefficients)
+        len_step = cls.coefficients(coefficients)[0]
+        distance = [(a * len_step) / cls.M_IN_KM for a in columns['action']]
+        speed = [d / t for d, t in zip(distance, columns['duration'])]
+        return (array('d', distance), array('d', speed),
+                cls.compute_calories(columns, speed, coefficients))
+
+    @classmethod
+    def compute_calories(cls, columns: dict, speed,
+                         coefficients: dict = None) -> array:
+        """Посчитать калории по столбцам данных.
+
+        Запасной вариант для зарегистрированных типов без своей
+        формулы столбцами: калории считает get_spent_calories
+        тренировок по строкам, speed не используется.
+        """
+        training_class = cls.with_coefficients(coefficients)
+        return array('d', [
+            training_class(*row).get_spent_calories()
+            for row in zip(*(columns[field] for field in cls.FIELDS))])
+
+    @classmethod
+    def compute_rows(cls, columns: dict, coefficients: dict = None) -> tuple:
+        """Посчитать показатели столбцов по строкам через объекты."""
+        training_class = cls.with_coefficients(coefficients)
+        results = [training_class(*row).show_training_info()
+                   for row in zip(*(columns[field] for field in cls.FIELDS))]
+        return (array('d', [result.distance for result in results]),
+                array('d', [result.speed for result in results]),
+                array('d', [result.calories for result in results]))
+
+    @classmethod
+    def with_coefficients(cls, coefficients: dict = None) -> type:
+        """Класс с заменёнными коэффициентами или сам класс."""
+        overrides = {name: value
+                     for name, value in (coefficients or {}).items()
+                     if value is not None
+                     and value != getattr(cls, name, None)}
+        if not overrides:
+            return cls
+        return type(cls.__name__, (cls,), {'__slots__': (),
+                                           '__module__': cls.__module__,
+                                           **overrides})
+
+
+@register_training('RUN')
 class Running(Training):
     """Тренировка: бег."""
+    __slots__ = ()
     COEFF_CALORIE_1 = 18
     COEFF_CALORIE_2 = 20
 
     def __init__(self, action: int, duration: float, weight: float) -> None:
         super().__init__(action, duration, weight)
 
+    @classmethod
+    def from_package(cls, data) -> 'Running':
+        """Создать тренировку из списка параметров пакета."""
+        training = cls.__new__(cls)
+        training._action, training._duration, training._weight = data
+        training.clear_cache()
+        return training
+
     def get_spent_calories(self) -> float:
         """Получить количество затраченных калорий."""
-        spent_calories = ((self.COEFF_CALORIE_1
-                           * self.get_mean_speed()
-                           - self.COEFF_CALORIE_2) * self.weight
-                          / self.M_IN_KM * (self.duration
-                                            * self.M_IN_HOUR))
-        return spent_calories
-
-
+        if self._spent_calories is None:
+            self._spent_calories = ((self.COEFF_CALORIE_1
+                                     * self.get_mean_speed()
+                                     - self.COEFF_CALORIE_2) * self.weight
+                                    / self.M_IN_KM * (self.duration
+                                                      * self.M_IN_HOUR))
+        return self._spent_calories
+
+    @classmethod
+    def compute_calories(cls, columns: dict, speed,
+                         coefficients: dict = None) -> array:
+        """Посчитать калории по столбцам данных и готовой скорости."""
+        _, coeff_1, coeff_2 = cls.coefficients(coefficients)
+        return array('d', [((coeff_1 * v - coeff_2) * w
+                            / cls.M_IN_KM * (t * cls.M_IN_HOUR))
+                           for v, w, t in zip(speed, columns['weight'],
+                                              columns['duration'])])
+
+
+@register_training('WLK', (WEIGHT_BOUNDS, HEIGHT_BOUNDS))
 class SportsWalking(Training):
     """Тренировка: спортивная ходьба."""
+    __slots__ = ('_height',)
+    FIELDS = Training.FIELDS + ('height',)
     COEFF_CALORIE_1 = 0.035
     COEFF_CALORIE_2 = 0.029
 
+    height = parameter('height')
+
     def __init__(self, action: int,
                  duration: float,
                  weight: float,
                  height: float) -> None:
         super().__init__(action, duration, weight)
-        self.height = height
+        self._height = height
+
+    @classmethod
+    def from_package(cls, data) -> 'SportsWalking':
+        """Создать тренировку из списка параметров пакета."""
+        training = cls.__new__(cls)
+        (training._action, training._duration, training._weight,
+         training._height) = data
+        training.clear_cache()
+        return training
 
     def get_spent_calories(self) -> float:
         """Получить количество затраченных калорий."""
-        spent_calories = ((self.COEFF_CALORIE_1 * self.weight
-                           + (self.get_mean_speed() ** 2
-                              // self.height)
-                           * self.COEFF_CALORIE_2 * self.weight)
-                          * (self.duration * self.M_IN_HOUR))
-        return spent_calories
-
-
+        if self._spent_calories is None:
+            self._spent_calories = ((self.COEFF_CALORIE_1 * self.weight
+                                     + (self.get_mean_speed() ** 2
+                                        // self.height)
+                                     * self.COEFF_CALORIE_2 * self.weight)
+                                    * (self.duration * self.M_IN_HOUR))
+        return self._spent_calories
+
+    @classmethod
+    def compute_calories(cls, columns: dict, speed,
+                         coefficients: dict = None) -> array:
+        """Посчитать калории по столбцам данных и готовой скорости."""
+        _, coeff_1, coeff_2 = cls.coefficients(coefficients)
+        return array('d', [((coeff_1 * w + (v ** 2 // h) * coeff_2 * w)
+                            * (t * cls.M_IN_HOUR))
+                           for v, w, h, t in zip(speed, columns['weight'],
+                                                 columns['height'],
+                                                 columns['duration'])])
+
+
+@register_training('SWM')
 class Swimming(Training):
     """Тренировка: плавание."""
+    __slots__ = ('_length_pool', '_count_pool')
+    FIELDS = Training.FIELDS + ('length_pool', 'count_pool')
     LEN_STEP = 1.38
     COEFF_CALORIE_1 = 1.1
     COEFF_CALORIE_2 = 2.0
 
+    length_pool = parameter('length_pool')
+    count_pool = parameter('count_pool')
+
     def __init__(self, action: int,
                  duration: float,
                  weight: float,
                  length_pool: float,
                  count_pool: int) -> None:
         super().__init__(action, duration, weight)
-        self.length_pool = length_pool
-        self.count_pool = count_pool
+        self._length_pool = length_pool
+        self._count_pool = count_pool
+
+    @classmethod
+    def from_package(cls, data) -> 'Swimming':
+        """Создать тренировку из списка параметров пакета."""
+        training = cls.__new__(cls)
+        (training._action, training._duration, training._weight,
+         training._length_pool, training._count_pool) = data
+        training.clear_cache()
+        return training
 
     def get_distance(self) -> float:
         """Получить дистанцию в км."""
-        distance = (self.action * self.LEN_STEP) / self.M_IN_KM
-        return distance
+        if self._distance is None:
+            self._distance = (self.action * self.LEN_STEP) / self.M_IN_KM
+        return self._distance
 
     def get_mean_speed(self) -> float:
         """Получить среднюю скорость движения."""
-        mean_speed = (self.length_pool * self.count_pool
-                      / self.M_IN_KM / self.duration)
-        return mean_speed
+        if self._mean_speed is None:
+            self._mean_speed = (self.length_pool * self.count_pool
+                                / self.M_IN_KM / self.duration)
+        return self._mean_speed
 
     def get_spent_calories(self) -> float:
         """Получить количество затраченных калорий."""
-        spent_calories = ((self.get_mean_speed()
-                           + self.COEFF_CALORIE_1)
-                          * self.COEFF_CALORIE_2 * self.weight)
-        return spent_calories
+        if self._spent_calories is None:
+            self._spent_calories = ((self.get_mean_speed()
+                                     + self.COEFF_CALORIE_1)
+                                    * self.COEFF_CALORIE_2 * self.weight)
+        return self._spent_calories
+
+    @classmethod
+    def compute_batch(cls, columns: dict, coefficients: dict = None) -> tuple:
+        """Посчитать дистанцию, скорость и калории для столбцов данных.
+
+        Скорость плавания считается по бассейнам и от длины гребка
+        не зависит.
+        """
+        len_step = cls.coefficients(coefficients)[0]
+        distance = [(a * len_step) / cls.M_IN_KM for a in columns['action']]
+        speed = [lp * cp / cls.M_IN_KM / t
+                 for lp, cp, t in zip(columns['length_pool'],
+                                      columns['count_pool'],
+                                      columns['duration'])]
+        return (array('d', distance), array('d', speed),
+                cls.compute_calories(columns, speed, coefficients))
+
+    @classmethod
+    def compute_calories(cls, columns: dict, speed,
+                         coefficients: dict = None) -> array:
+        """Посчитать калории по столбцам данных и готовой скорости."""
+        _, coeff_1, coeff_2 = cls.coefficients(coefficients)
+        return array('d', [(v + coeff_1) * coeff_2 * w
+                           for v, w in zip(speed, columns['weight'])])
 
 
 def read_package(workout_type: str, data: list) -> Training:
     """Прочитать данные полученные от датчиков,
        проверить корректность, создать обьекты."""
-    possible_values = {'SWM': Swimming,
-                       'RUN': Running,
-                       'WLK': SportsWalking}
-    if workout_type in possible_values:
-        result_output = possible_values[workout_type](*data)
+    if workout_type in WORKOUT_TYPES:
+        result_output = WORKOUT_TYPES[workout_type](*data)
         return result_output
 
 
+def compute_batch(workout_type: str, columns: dict,
+                  coefficients: dict = None) -> tuple:
+    """Посчитать показатели сразу для множества тренировок одного типа.
+
+    columns - словарь столбцов с ключами по именам параметров
+    тренировки (action, duration, weight, height, length_pool,
+    count_pool). Подойдут списки, array или массивы NumPy.
+    Возвращает три array('d'): дистанцию, среднюю скорость и калории,
+    совпадающие с результатами объектов тренировок до последнего бита.
+    coefficients - словарь замен LEN_STEP, COEFF_CALORIE_1
+    и COEFF_CALORIE_2 для расчёта по другой версии коэффициентов.
+    """
+    return WORKOUT_TYPES[workout_type].compute_batch(columns, coefficients)
+
+
+def compute_calories(workout_type: str, columns: dict, speed,
+                     coefficients: dict = None) -> array:
+    """Пересчитать только калории по уже посчитанной скорости."""
+    return WORKOUT_TYPES[workout_type].compute_calories(
+        columns, speed, coefficients)
+
+
+def format_messages(training_type: str, durations, distances, speeds,
+                    calories) -> list:
+    """Собрать строки get_message сразу для столбцов показателей.
+
+    Подходит для результатов compute_batch:
+    format_messages('Running', columns['duration'], *compute_batch(...)).
+    """
+    return list(map(MESSAGE_TEMPLATE.__mod__,
+                    zip(repeat(training_type), durations, distances,
+                        speeds, calories)))
+
+
+def build_training(workout_type: str, data) -> Training:
+    """Быстро создать тренировку из проверенного пакета.
+
+    В отличие от read_package не проверяет код и не распаковывает data.
+    """
+    return BUILDERS[workout_type](data)
+
+
+def validate_package(workout_type: str, data) -> ValidationError:
+    """Проверить пакет от датчиков, вернуть ошибку или None."""
+    # Код не строкой (например, список из JSON) схемы не имеет
+    schema = SCHEMAS.get(workout_type) if type(workout_type) is str else None
+    if schema is None:
+        length = len(data) if type(data) in SEQUENCE_TYPES else None
+        return ValidationError(workout_type, UNKNOWN_TYPE, value=length,
+                               data=data)
+    return schema.validate(data)
+
+
+def calculate_package(workout_type: str, data,
+                      training_class: type = None) -> tuple:
+    """Проверить и посчитать пакет.
+
+    Возвращает пару (InfoMessage, None) или (None, ValidationError).
+    training_class заменяет класс типа, например классом
+    с коэффициентами версии из coefficients.py.
+    Пакет с допустимыми параметрами может не посчитаться: целое
+    на сотни цифр не переводится в float, а скорость в квадрате
+    переполняется. Такие пакеты и бесконечные показатели дают ошибку
+    CALCULATION_ERROR, а не исключение посреди обработки потока.
+    """
+    error = validate_package(workout_type, data)
+    if error is not None:
+        return None, error
+    try:
+        if training_class is None:
+            training = build_training(workout_type, data)
+        else:
+            training = training_class(*data)
+        info_message = training.show_training_info()
+    except ArithmeticError as exception:
+        return None, ValidationError(workout_type, CALCULATION_ERROR,
+                                     value=str(exception), data=data)
+    for field in RESULT_FIELDS:
+        value = getattr(info_message, field)
+        if not isfinite(value):
+            return None, ValidationError(workout_type, CALCULATION_ERROR,
+                                         field, value, data)
+    return info_message, None
+
+
+def validate_batch(workout_type: str, columns: dict) -> bytearray:
+    """Проверить столбцы пакетов одного типа, вернуть маску отказов."""
+    return SCHEMAS[workout_type].validate_columns(columns)
+
+
+class StoredField:
+    """Поле представления, читающее значение из столбца хранилища."""
+    __slots__ = ('column',)
+
+    def __init__(self, column: int) -> None:
+        self.column = column
+
+    def __get__(self, view, owner=None):
+        if view is None:
+            return self
+        return view._store._columns[self.column][view._index]
+
+
+def make_training_view(training_class: type) -> type:
+    """Создать класс представления тренировки из TrainingStore.
+
+    Представление наследует класс тренировки, а его параметры
+    читаются из столбцов хранилища, поэтому все методы расчёта
+    работают без изменений.
+    """
+    namespace = {name: StoredField(column)
+                 for column, name in enumerate(training_class.FIELDS)}
+    namespace.update(__slots__=('_store', '_index'),
+                     __module__=training_class.__module__)
+    return type(training_class.__name__, (training_class,), namespace)
+
+
+class TrainingStore:
+    """Хранилище множества тренировок в типизированных столбцах.
+
+    Параметры всех тренировок лежат в array('d'), код тренировки -
+    в array('B'). Элемент хранилища - лёгкое представление, у которого
+    работают get_distance, get_mean_speed и get_spent_calories
+    соответствующего класса тренировки.
+    """
+    COLUMNS = 5
+    CODES = {}
+    VIEWS = []
+
+    def __init__(self, packages=()) -> None:
+        self._codes = array('B')
+        self._columns = [array('d') for _ in range(self.COLUMNS)]
+        self.extend(packages)
+
+    @classmethod
+    def type_code(cls, workout_type: str) -> int:
+        """Номер типа тренировки в хранилище.
+
+        Представление для типа создаётся при первом обращении, поэтому
+        хранилище работает и с типами, зарегистрированными позже.
+        """
+        code = cls.CODES.get(workout_type)
+        if code is None:
+            training_class = WORKOUT_TYPES[workout_type]
+            if len(training_class.FIELDS) > cls.COLUMNS:
+                raise ValueError(f'У {workout_type} больше {cls.COLUMNS} '
+                                 'параметров.')
+            code = cls.CODES[workout_type] = len(cls.VIEWS)
+            cls.VIEWS.append(make_training_view(training_class))
+        return code
+
+    def append(self, workout_type: str, data: list) -> None:
+        """Добавить тренировку по коду и списку параметров."""
+        code = self.type_code(workout_type)
+        if len(data) != len(self.VIEWS[code].FIELDS):
+            raise ValueError(f'Неверное количество параметров '
+                             f'{len(data)} для {workout_type}.')
+        # Сначала преобразуем все значения: ошибка в одном из них
+        # не должна оставить столбцы разной длины
+        values = array('d', data)
+        self._codes.append(code)
+        for column, value in zip(self._columns, values):
+            column.append(value)
+        for column in self._columns[len(values):]:
+            column.append(0)
+
+    def extend(self, packages) -> None:
+        """Добавить тренировки из пар (код, параметры)."""
+        for workout_type, data in packages:
+            self.append(workout_type, data)
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    def __getitem__(self, index: int) -> Training:
+        if index < 0:
+            index += len(self._codes)
+        view_class = self.VIEWS[self._codes[index]]
+        view = view_class.__new__(view_class)
+        view._store = self
+        view._index = index
+        view.clear_cache()
+        return view
+
+    def __iter__(self):
+        for index in range(len(self._codes)):
+            yield self[index]
+
+
 def main(training: Training) -> None:
     """Главная функция."""
     info_message = training.show_training_info()
     print(info_message.get_message())
 
 
-def search_errors_in_values(name: str, list_with_var: list) -> bool:
-    """Функция поиска некорректных значений"""
-    NORMAL_WEIGHT_5_YERS_OLD_CHILDREN_KG = 14
-    MAX_WEIGHT_PEOPLE_KG = 160
-    MIN_HEIGHT_CM = 50
-    MAX_HEIGHT_CM = 250
-    available_values = {'SWM': ['Action', 'Duration',
-                                'Weight', 'Length_pool', 'Count_pool'],
-                        'RUN': ['Action', 'Duration', 'Weight'],
-                        'WLK': ['Action', 'Duration', 'Weight', 'Height']}
-
-    # Если ключ или количесто элементов ключа не совпадают
-    if (name not in available_values
-            or len(available_values[name])
-            != len(data)):
-        # Хотя это ошибки на уровне системы, не зависящие от пользователя
-        print(f'Неверное значение {name} или неверное '
-              f'количество переданных '
-              f'параметров {len(available_values[name])}.')
-        print('Повтороите попытку или перезагрузите устройство.')
-        return False
+def search_errors_in_values(name: str, list_with_var: list,
+                            on_error=None) -> bool:
+    """Функция поиска некорректных значений.
 
-    # Если имеется тип не int или float, а так же отрицательное значение
-    # Хотя и это тоже системный баг
-    for c, i in enumerate(list_with_var):
-        if not (isinstance(i, int) or isinstance(i, float)) or i <= 0:
-            buffer = available_values[name]
-            print(f'Значение {buffer[c]} не может быть строкой,'
-                  ' а так же не должно быть меньше 1')
-            print('Введите значения снова или перезагрузите устройство.')
-            return False
-    # Если имеется некорректная переменная по весу
-    weight = list_with_var[2]
-    if (weight < NORMAL_WEIGHT_5_YERS_OLD_CHILDREN_KG
-            or weight > MAX_WEIGHT_PEOPLE_KG):
-        print(f'Получен weight {weight} кг. '
-              'Вес пользователя не должен быть '
-              'меньше 14 кг,'
-              'а также больше 160 кг. '
-              'Повторите, пожалуйста, попытку.')
+    Ошибка передаётся в on_error, если он задан, иначе печатается.
+    """
+    error = validate_package(name, list_with_var)
+    if error is not None:
+        if on_error is None:
+            print(error.message)
+        else:
+            on_error(error)
         return False
-    # Если имеется некорректная переменная по росту
-    if name == 'WLK':
-        height = list_with_var[3]
-        if (height < MIN_HEIGHT_CM
-                or height > MAX_HEIGHT_CM):
-            print(f'Получен height {height} см. '
-                  'Рост пользователя не должен быть '
-                  'меньше 50 см '
-                  'и больше 250 см. '
-                  'Повторите, пожалуйста, попытку.')
-            return False
     return True
 
 
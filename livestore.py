@@ -0,0 +1,280 @@
+"""Результаты тренировок в памяти для запросов панели мониторинга.
+
+LiveStore отвечает на запросы «последняя тренировка» и «итоги
+за сегодня» по пользователю и коду тренировки, пока в него пишутся
+новые результаты. Читатели берут текущий срез Snapshot одним чтением
+атрибута и работают с ним без блокировок: срез после публикации
+не меняется. Писатель копит результаты, как ResultStore из storage.py,
+и пачкой строит новый срез с копированием при записи: пользователи
+разложены по словарям-шардам, и копируются только шарды
+с пользователями из пачки и их записи, а остальное берётся из старого
+среза. Шардов не меньше SHARDS, и их число удваивается, когда
+в среднем шарде становится больше SHARD_USERS пользователей, поэтому
+цена публикации растёт с размером пачки, а не с числом пользователей.
+Новый срез публикуется одним присваиванием, поэтому читатель видит
+последнюю завершённую пачку целиком или не видит её вовсе. Писатели
+между собой упорядочены блокировкой, читатели её не берут.
+
+Пачка публикуется, когда в ней batch_size результатов или когда
+с прошлой публикации прошло max_delay секунд: это проверяют и add,
+и запросы LiveStore и QueryPool. Поэтому результат виден запросам
+не позже чем через max_delay (MAX_DELAY по умолчанию) после add.
+Тот, кто читает store.snapshot напрямую, без записи и запросов может
+ждать дольше и при необходимости вызывает flush.
+
+QueryPool выполняет запросы в пуле потоков и возвращает Future;
+запрос по списку пользователей отвечает по одному срезу.
+"""
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from operator import itemgetter
+from typing import Hashable, Iterable, Optional
+
+from aggregation import SECONDS_IN_DAY, Totals
+from homework import InfoMessage
+
+SHARDS = 256
+SHARD_USERS = 16
+BATCH_SIZE = 1000
+# Наибольшая задержка публикации результата, в секундах
+MAX_DELAY = 1.0
+# Поля кортежа состояния пользователя по коду тренировки: последняя
+# тренировка, её день и суммы за этот день как у Totals. Один кортеж
+# вместо нескольких объектов - меньше работы сборщику мусора.
+ENTRY = ('time', 'info_message', 'day', 'count', 'duration', 'distance',
+         'speed', 'calories')
+
+
+def add_result(state: dict, timestamp: float, workout_type: str,
+               info_message: InfoMessage) -> None:
+    """Учесть результат в ещё не опубликованном состоянии пользователя.
+
+    Состояние - словарь по коду тренировки с кортежами ENTRY. Кортежи
+    не меняются, а заменяются, поэтому копии словаря достаточно, чтобы
+    не задеть опубликованный срез. Результат за день раньше хранимого
+    относится к итогам, которых уже нет, и пропускается.
+    """
+    day = int(timestamp // SECONDS_IN_DAY)
+    entry = state.get(workout_type)
+    if entry is None or day > entry[2]:
+        state[workout_type] = (timestamp, info_message, day, 1,
+                               info_message.duration, info_message.distance,
+                               info_message.speed, info_message.calories)
+    elif day == entry[2]:
+        (latest_time, latest, _, count, duration, distance, speed,
+         calories) = entry
+        if timestamp >= latest_time:
+            latest_time, latest = timestamp, info_message
+        state[workout_type] = (latest_time, latest, day, count + 1,
+                               duration + info_message.duration,
+                               distance + info_message.distance,
+                               speed + info_message.speed,
+                               calories + info_message.calories)
+
+
+def make_totals(entries: Iterable[tuple]) -> Totals:
+    """Сложить итоги дня из кортежей ENTRY."""
+    totals = Totals()
+    for _, _, _, count, duration, distance, speed, calories in entries:
+        totals.count += count
+        totals.duration += duration
+        totals.distance += distance
+        totals.speed += speed
+        totals.calories += calories
+    return totals
+
+
+def reshard(shards: list, count: int) -> list:
+    """Разложить пользователей по count новым шардам.
+
+    Состояния пользователей переходят без копирования: опубликованные
+    состояния не меняются. Число шардов удваивается, поэтому
+    перекладывание каждого пользователя в среднем окупается.
+    """
+    result = [{} for _ in range(count)]
+    for shard in shards:
+        for user_id, state in shard.items():
+            result[hash(user_id) % count][user_id] = state
+    return result
+
+
+class Snapshot:
+    """Неизменяемый срез результатов, читается без блокировок."""
+    __slots__ = ('shards', 'written', 'users')
+
+    def __init__(self, shards: tuple, written: int, users: int = 0) -> None:
+        self.shards = shards
+        self.written = written
+        self.users = users
+
+    def user(self, user_id: Hashable) -> Optional[dict]:
+        """Состояние пользователя или None."""
+        return self.shards[hash(user_id) % len(self.shards)].get(user_id)
+
+    def latest(self, user_id: Hashable,
+               workout_type: Optional[str] = None) -> Optional[tuple]:
+        """Последняя тренировка: (время, код, InfoMessage) или None."""
+        state = self.user(user_id)
+        if state is None:
+            return None
+        if workout_type is not None:
+            entry = state.get(workout_type)
+            if entry is None:
+                return None
+            return entry[0], workout_type, entry[1]
+        return max(((entry[0], code, entry[1])
+                    for code, entry in state.items()), key=itemgetter(0))
+
+    def today(self, user_id: Hashable, timestamp: Optional[float] = None,
+              workout_type: Optional[str] = None) -> Totals:
+        """Итоги пользователя за сутки UTC, содержащие timestamp."""
+        state = self.user(user_id)
+        if timestamp is None:
+            timestamp = time.time()
+        if state is None:
+            return Totals()
+        day = int(timestamp // SECONDS_IN_DAY)
+        return make_totals(entry for code, entry in state.items()
+                           if entry[2] == day and workout_type in (None, code))
+
+
+class LiveStore:
+    """Запись результатов пачками и публикация срезов для читателей."""
+
+    def __init__(self, batch_size: int = BATCH_SIZE,
+                 shards: int = SHARDS,
+                 max_delay: float = MAX_DELAY) -> None:
+        self.batch_size = batch_size
+        self.snapshot = Snapshot(tuple({} for _ in range(shards)), 0)
+        self.rows = []
+        self.max_delay = max_delay
+        # Время прошлой публикации по time.monotonic
+        self.published = time.monotonic()
+        self.lock = threading.Lock()
+
+    def add(self, user_id: Hashable, timestamp: float, workout_type: str,
+            info_message: InfoMessage) -> None:
+        """Добавить результат тренировки пользователя."""
+        with self.lock:
+            self.rows.append((user_id, timestamp, workout_type,
+                              info_message))
+            if (len(self.rows) >= self.batch_size
+                    or time.monotonic() - self.published >= self.max_delay):
+                self.publish()
+
+    def add_many(self, results: Iterable[tuple]) -> None:
+        """Добавить результаты (пользователь, время, код, InfoMessage)."""
+        with self.lock:
+            for result in results:
+                self.rows.append(result)
+                if len(self.rows) >= self.batch_size:
+                    self.publish()
+            if time.monotonic() - self.published >= self.max_delay:
+                self.publish()
+
+    def flush(self) -> None:
+        """Опубликовать накопленные результаты."""
+        with self.lock:
+            self.publish()
+
+    def fresh(self) -> Snapshot:
+        """Текущий срез, не старше max_delay относительно записи.
+
+        Результаты, ждущие публикации дольше max_delay, сначала
+        публикуются. Без таких результатов блокировка не берётся.
+        """
+        if (self.rows
+                and time.monotonic() - self.published >= self.max_delay):
+            self.flush()
+        return self.snapshot
+
+    def publish(self) -> None:
+        """Построить и опубликовать новый срез, вызывается под lock."""
+        self.published = time.monotonic()
+        if not self.rows:
+            return
+        old = self.snapshot
+        shards = list(old.shards)
+        count = len(shards)
+        users = old.users
+        # Словари и состояния, скопированные для нового среза
+        copied = set()
+        fresh = set()
+        for user_id, timestamp, workout_type, info_message in self.rows:
+            index = hash(user_id) % count
+            if index not in copied:
+                shards[index] = dict(shards[index])
+                copied.add(index)
+            shard = shards[index]
+            if user_id not in fresh:
+                state = shard.get(user_id)
+                if state is None:
+                    users += 1
+                    state = ()
+                shard[user_id] = dict(state)
+                fresh.add(user_id)
+            add_result(shard[user_id], timestamp, workout_type,
+                       info_message)
+        if users > count * SHARD_USERS:
+            shards = reshard(shards, count * 2)
+        self.snapshot = Snapshot(tuple(shards), old.written + len(self.rows),
+                                 users)
+        self.rows = []
+
+    def latest(self, user_id: Hashable,
+               workout_type: Optional[str] = None) -> Optional[tuple]:
+        """Последняя тренировка пользователя по текущему срезу."""
+        return self.fresh().latest(user_id, workout_type)
+
+    def today(self, user_id: Hashable, timestamp: Optional[float] = None,
+              workout_type: Optional[str] = None) -> Totals:
+        """Итоги пользователя за сутки по текущему срезу."""
+        return self.fresh().today(user_id, timestamp, workout_type)
+
+
+class QueryPool:
+    """Запросы к LiveStore в пуле потоков."""
+
+    def __init__(self, store: LiveStore, workers: int = 4) -> None:
+        self.store = store
+        self.executor = ThreadPoolExecutor(workers,
+                                           thread_name_prefix='query')
+
+    def latest(self, user_id: Hashable,
+               workout_type: Optional[str] = None) -> Future:
+        """Последняя тренировка пользователя."""
+        return self.executor.submit(self.store.latest, user_id,
+                                    workout_type)
+
+    def today(self, user_id: Hashable, timestamp: Optional[float] = None,
+              workout_type: Optional[str] = None) -> Future:
+        """Итоги пользователя за сутки."""
+        return self.executor.submit(self.store.today, user_id, timestamp,
+                                    workout_type)
+
+    def dashboard(self, user_ids: Iterable[Hashable],
+                  timestamp: Optional[float] = None) -> Future:
+        """Последние тренировки и итоги дня пользователей по одному срезу.
+
+        Результат - список пар (последняя тренировка, Totals).
+        """
+        return self.executor.submit(self.collect, list(user_ids), timestamp)
+
+    def collect(self, user_ids: list, timestamp: Optional[float]) -> list:
+        """Ответ dashboard, выполняется в потоке пула."""
+        snapshot = self.store.fresh()
+        if timestamp is None:
+            timestamp = time.time()
+        return [(snapshot.latest(user_id), snapshot.today(user_id, timestamp))
+                for user_id in user_ids]
+
+    def close(self) -> None:
+        """Дождаться запросов и остановить потоки."""
+        self.executor.shutdown()
+
+    def __enter__(self) -> 'QueryPool':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
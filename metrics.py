@@ -0,0 +1,220 @@
+"""Замеры этапов обработки пакетов.
+
+Пока замеры выключены, код трекера работает без изменений и без
+накладных расходов. enable подменяет функции и методы этапов
+обёртками, которые считают вызовы, суммарное время и гистограмму
+задержек по этапу и коду тренировки; disable возвращает исходные.
+
+    with METRICS:
+        pipeline.main(['packages.jsonl'])
+    print(METRICS.prometheus())
+
+Обёртки ставятся и в модули, импортировавшие функцию через
+from homework import ..., поэтому замеры видят вызовы из pipeline,
+parallel и server, если модули загружены до enable.
+"""
+import json
+import sys
+from bisect import bisect_left
+from time import perf_counter
+
+import homework
+
+# Верхние границы корзин гистограммы в секундах
+BUCKETS = (5e-7, 1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 1e-4, 1e-3, 1e-2,
+           float('inf'))
+METRIC = 'fitness_stage_seconds'
+
+
+def first_argument(args: tuple) -> str:
+    """Код тренировки - первый аргумент функции этапа."""
+    return args[0]
+
+
+def training_code(args: tuple) -> str:
+    """Код тренировки по объекту тренировки."""
+    return getattr(args[0], 'WORKOUT_TYPE', type(args[0]).__name__)
+
+
+def message_code(args: tuple) -> str:
+    """Код тренировки по сообщению о ней."""
+    training_type = args[0].training_type
+    for workout_type, cls in homework.WORKOUT_TYPES.items():
+        if cls.__name__ == training_type:
+            return workout_type
+    return training_type
+
+
+# Этап: (владелец, имя атрибута, функция определения кода тренировки)
+STAGES = {
+    'read_package': (homework, 'read_package', first_argument),
+    'search_errors_in_values': (homework, 'search_errors_in_values',
+                                first_argument),
+    'validate_package': (homework, 'validate_package', first_argument),
+    'build_training': (homework, 'build_training', first_argument),
+    'show_training_info': (homework.Training, 'show_training_info',
+                           training_code),
+    'get_message': (homework.InfoMessage, 'get_message', message_code),
+}
+
+
+class StageStats:
+    """Число вызовов, суммарное время и гистограмма задержек."""
+    __slots__ = ('count', 'seconds', 'buckets')
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.seconds = 0.0
+        self.buckets = [0] * len(BUCKETS)
+
+    def observe(self, seconds: float) -> None:
+        """Учесть один вызов."""
+        self.count += 1
+        self.seconds += seconds
+        self.buckets[bisect_left(BUCKETS, seconds)] += 1
+
+    def cumulative(self) -> list:
+        """Накопленные счётчики корзин, как в Prometheus."""
+        total = 0
+        result = []
+        for count in self.buckets:
+            total += count
+            result.append(total)
+        return result
+
+
+def escape_label(value: str) -> str:
+    """Значение метки в формате Prometheus."""
+    return (value.replace('\\', '\\\\').replace('"', '\\"')
+            .replace('\n', '\\n'))
+
+
+def format_bound(bound: float) -> str:
+    """Граница корзины в формате Prometheus."""
+    return '+Inf' if bound == float('inf') else repr(bound)
+
+
+def replace_imported(name: str, old, new) -> None:
+    """Заменить old на new во всех модулях, импортировавших его как name."""
+    for module in list(sys.modules.values()):
+        namespace = getattr(module, '__dict__', {})
+        if namespace.get(name) is old:
+            namespace[name] = new
+
+
+class Metrics:
+    """Набор замеров этапов, включается на время работы.
+
+    Повторное включение без выключения не ставит вторые обёртки.
+    """
+
+    def __init__(self, stages: dict = None) -> None:
+        self.stages = STAGES if stages is None else stages
+        self.stats = {}
+        self.originals = {}
+
+    @property
+    def enabled(self) -> bool:
+        """Стоят ли обёртки."""
+        return bool(self.originals)
+
+    def observe(self, stage: str, workout_type: str,
+                seconds: float) -> None:
+        """Учесть вызов этапа stage для кода workout_type."""
+        key = (stage, workout_type)
+        stats = self.stats.get(key)
+        if stats is None:
+            stats = self.stats[key] = StageStats()
+        stats.observe(seconds)
+
+    def wrap(self, stage: str, func, code):
+        """Обёртка func, замеряющая время вызова."""
+        observe = self.observe
+
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = perf_counter() - start
+                try:
+                    workout_type = code(args)
+                except (AttributeError, IndexError, TypeError):
+                    workout_type = ''
+                observe(stage, str(workout_type), elapsed)
+
+        timed.__wrapped__ = func
+        timed.__name__ = func.__name__
+        timed.__doc__ = func.__doc__
+        return timed
+
+    def enable(self) -> None:
+        """Поставить обёртки на все этапы."""
+        if self.enabled:
+            return
+        for stage, (owner, name, code) in self.stages.items():
+            original = getattr(owner, name)
+            timed = self.wrap(stage, original, code)
+            self.originals[stage] = original
+            setattr(owner, name, timed)
+            if isinstance(owner, type):
+                continue
+            replace_imported(name, original, timed)
+
+    def disable(self) -> None:
+        """Вернуть исходные функции, накопленные замеры сохраняются."""
+        for stage, original in self.originals.items():
+            owner, name, _ = self.stages[stage]
+            timed = getattr(owner, name)
+            setattr(owner, name, original)
+            if isinstance(owner, type):
+                continue
+            replace_imported(name, timed, original)
+        self.originals.clear()
+
+    def reset(self) -> None:
+        """Обнулить замеры."""
+        self.stats.clear()
+
+    def __enter__(self) -> 'Metrics':
+        self.enable()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.disable()
+
+    def as_dict(self) -> dict:
+        """Замеры по этапам и кодам тренировок для JSON."""
+        result = {}
+        for (stage, workout_type), stats in sorted(self.stats.items()):
+            result.setdefault(stage, {})[workout_type] = {
+                'count': stats.count,
+                'seconds': stats.seconds,
+                'buckets': dict(zip(map(format_bound, BUCKETS),
+                                    stats.cumulative())),
+            }
+        return result
+
+    def json(self) -> str:
+        """Замеры строкой JSON."""
+        return json.dumps(self.as_dict(), ensure_ascii=False, indent=2)
+
+    def prometheus(self) -> str:
+        """Замеры в текстовом формате Prometheus."""
+        lines = [f'# HELP {METRIC} Время этапов обработки пакетов.',
+                 f'# TYPE {METRIC} histogram']
+        for (stage, workout_type), stats in sorted(self.stats.items()):
+            labels = (f'stage="{stage}",'
+                      f'workout_type="{escape_label(workout_type)}"')
+            for bound, count in zip(BUCKETS, stats.cumulative()):
+                lines.append(f'{METRIC}_bucket{{{labels},'
+                             f'le="{format_bound(bound)}"}} {count}')
+            lines.append(f'{METRIC}_sum{{{labels}}} {stats.seconds!r}')
+            lines.append(f'{METRIC}_count{{{labels}}} {stats.count}')
+        return '\n'.join(lines) + '\n'
+
+
+EXPORTERS = {'json': Metrics.json,
+             'prometheus': Metrics.prometheus}
+
+METRICS = Metrics()
@@ -0,0 +1,68 @@
+"""Параллельная обработка пакетов на нескольких ядрах.
+
+Поток пакетов делится на блоки, блоки обрабатываются в пуле процессов,
+результаты возвращаются в порядке входа.
+"""
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Iterable, Iterator, Optional
+
+from homework import InfoMessage, ValidationError, calculate_package
+from pipeline import ErrorHandler
+
+CHUNK_SIZE = 1000
+
+
+def chunked(packages: Iterable[tuple], size: int) -> Iterator[list]:
+    """Разбить поток пакетов на списки длиной не больше size."""
+    iterator = iter(packages)
+    chunk = list(islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))
+
+
+def process_chunk(chunk: list) -> list:
+    """Обработать блок пакетов в процессе-обработчике.
+
+    Для каждого пакета возвращается InfoMessage или ValidationError.
+    """
+    results = []
+    for workout_type, data in chunk:
+        info_message, error = calculate_package(workout_type, data)
+        results.append(error or info_message)
+    return results
+
+
+def unpack(results: list, on_error: ErrorHandler) -> Iterator[InfoMessage]:
+    """Вернуть сообщения блока, передав ошибки в on_error."""
+    for result in results:
+        if not isinstance(result, ValidationError):
+            yield result
+        elif on_error is not None:
+            on_error(result)
+
+
+def process_parallel(packages: Iterable[tuple],
+                     workers: Optional[int] = None,
+                     chunk_size: int = CHUNK_SIZE,
+                     on_error: ErrorHandler = None) -> Iterator[InfoMessage]:
+    """Проверить пакеты и вернуть сообщения, используя пул процессов.
+
+    Результат совпадает с process_packages и идёт в том же порядке,
+    ошибки передаются в on_error в порядке входа.
+    В обработке одновременно находится не больше двух блоков
+    на процесс, поэтому память не растёт с размером входа.
+    """
+    workers = workers or os.cpu_count() or 1
+    limit = workers * 2
+    with ProcessPoolExecutor(workers) as executor:
+        pending = deque()
+        for chunk in chunked(packages, chunk_size):
+            pending.append(executor.submit(process_chunk, chunk))
+            if len(pending) >= limit:
+                yield from unpack(pending.popleft().result(), on_error)
+        while pending:
+            yield from unpack(pending.popleft().result(), on_error)
@@ -0,0 +1,207 @@
+"""Потоковая обработка пакетов от датчиков.
+
+Пакеты читаются из файла или stdin по одному, поэтому расход памяти
+не зависит от размера входных данных.
+
+Форматы входа:
+* jsonl - по одной записи в строке: {"workout_type": "RUN",
+  "data": [5000, 1, 30]} или ["RUN", [5000, 1, 30]];
+* csv - код тренировки и параметры: RUN,5000,1,30.
+
+Запуск: python pipeline.py [файл] [--format jsonl|csv] [--workers N]
+                          [--output-format text|csv|jsonl]
+                          [--cache-size N] [--cache-db ФАЙЛ]
+                          [--dead-letters ФАЙЛ]
+                          [--profile] [--metrics json|prometheus]
+"""
+import argparse
+import contextlib
+import csv
+import json
+import sys
+from typing import Callable, Iterable, Iterator, Optional, TextIO
+
+from homework import InfoMessage, ValidationError, calculate_package
+from writers import TEMPLATES, MessageWriter
+
+ErrorHandler = Optional[Callable[[ValidationError], None]]
+
+
+def parse_value(text: str):
+    """Привести значение из текста к int или float.
+
+    Нечисловое значение возвращается как есть и будет отклонено
+    при проверке пакета.
+    """
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+
+def parse_package(line) -> tuple:
+    """Разобрать запись JSON с пакетом в пару (код, параметры)."""
+    record = json.loads(line)
+    if isinstance(record, dict):
+        return record['workout_type'], record['data']
+    workout_type, data = record
+    return workout_type, data
+
+
+def read_jsonl(stream: TextIO) -> Iterator[tuple]:
+    """Читать пакеты из потока в формате JSON Lines."""
+    for line_number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            package = parse_package(line)
+        except ValueError as error:
+            raise ValueError(
+                f'Строка {line_number}: некорректный JSON ({error}).'
+            ) from error
+        except (KeyError, TypeError) as error:
+            raise ValueError(
+                f'Строка {line_number}: запись не является пакетом '
+                f'({error!r}).') from error
+        yield package
+
+
+def read_csv(stream: TextIO) -> Iterator[tuple]:
+    """Читать пакеты из потока в формате CSV."""
+    for row in csv.reader(stream):
+        if row:
+            yield row[0], [parse_value(value) for value in row[1:]]
+
+
+READERS = {'jsonl': read_jsonl,
+           'csv': read_csv}
+
+
+def read_packages(stream: TextIO, fmt: str = 'jsonl') -> Iterator[tuple]:
+    """Читать пакеты из потока в указанном формате."""
+    return READERS[fmt](stream)
+
+
+def process_packages(packages: Iterable[tuple],
+                     on_error: ErrorHandler = None,
+                     cache=None
+                     ) -> Iterator[InfoMessage]:
+    """Проверить пакеты и вернуть сообщения о корректных тренировках.
+
+    Ошибки некорректных пакетов передаются в on_error, если он задан.
+    С cache (cache.ResultCache) повторно присланные пакеты
+    не проверяются и не считаются заново.
+    """
+    for workout_type, data in packages:
+        if cache is not None:
+            key = cache.key(workout_type, data)
+            info_message = cache.get(key)
+            if info_message is not None:
+                yield info_message
+                continue
+        info_message, error = calculate_package(workout_type, data)
+        if error is None:
+            if cache is not None:
+                cache.put(key, info_message)
+            yield info_message
+        elif on_error is not None:
+            on_error(error)
+
+
+def print_error(error: ValidationError) -> None:
+    """Напечатать ошибку пакета в stderr."""
+    print(error.message, file=sys.stderr)
+
+
+def guess_format(path: str) -> str:
+    """Определить формат входа по расширению файла."""
+    return 'csv' if path.endswith('.csv') else 'jsonl'
+
+
+def open_input(path: str) -> TextIO:
+    """Открыть файл пакетов, '-' означает stdin."""
+    if path == '-':
+        return sys.stdin
+    return open(path, encoding='utf-8', newline='')
+
+
+def run(args: argparse.Namespace) -> None:
+    """Обработать файл пакетов с параметрами командной строки."""
+    fmt = args.format or guess_format(args.input)
+    cache = None
+    if args.cache_size or args.cache_db:
+        # sqlite3 и hashlib нужны только с кэшем
+        from cache import ResultCache
+        cache = ResultCache(args.cache_size or 65536, args.cache_db)
+    dead_letters = None
+    if args.dead_letters:
+        from deadletter import DeadLetters
+        dead_letters = DeadLetters(args.dead_letters)
+    on_error = dead_letters or print_error
+    with open_input(args.input) as stream, \
+            cache or contextlib.nullcontext(), \
+            dead_letters or contextlib.nullcontext():
+        packages = read_packages(stream, fmt)
+        if args.workers is None:
+            results = process_packages(packages, on_error, cache)
+        else:
+            from parallel import process_parallel
+            results = process_parallel(packages, args.workers or None,
+                                       args.chunk_size, on_error)
+        with MessageWriter(sys.stdout, args.output_format) as writer:
+            writer.write_many(results)
+    if dead_letters is not None:
+        sys.stderr.write(dead_letters.summary())
+
+
+def profile(args: argparse.Namespace, top: int = 25) -> None:
+    """Обработать файл под cProfile и напечатать самые горячие места."""
+    import cProfile
+    import pstats
+
+    profiler = cProfile.Profile()
+    profiler.runcall(run, args)
+    stats = pstats.Stats(profiler, stream=sys.stderr)
+    stats.sort_stats('tottime').print_stats(top)
+
+
+def main(argv=None) -> None:
+    """Точка входа командной строки."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('input', nargs='?', default='-',
+                        help="файл с пакетами, '-' - stdin")
+    parser.add_argument('--format', choices=READERS,
+                        help='формат входа, по умолчанию по расширению')
+    parser.add_argument('--workers', type=int,
+                        help='число процессов, 0 - по числу ядер')
+    parser.add_argument('--chunk-size', type=int, default=1000,
+                        help='размер блока для параллельной обработки')
+    parser.add_argument('--output-format', choices=TEMPLATES,
+                        default='text', help='формат вывода')
+    parser.add_argument('--cache-size', type=int, default=0,
+                        help='результатов в кэше повторных пакетов')
+    parser.add_argument('--cache-db', help='файл SQLite для кэша')
+    parser.add_argument('--dead-letters',
+                        help='файл очереди отклонённых пакетов вместо '
+                             'сообщений в stderr')
+    parser.add_argument('--profile', action='store_true',
+                        help='напечатать в stderr горячие места cProfile')
+    parser.add_argument('--metrics', choices=('json', 'prometheus'),
+                        help='напечатать в stderr замеры этапов')
+    args = parser.parse_args(argv)
+    handler = profile if args.profile else run
+    if args.metrics is None:
+        handler(args)
+        return
+    from metrics import EXPORTERS, METRICS
+    with METRICS:
+        handler(args)
+    sys.stderr.write(EXPORTERS[args.metrics](METRICS))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+"""asyncio-сервер приёма пакетов от устройств.
+
+Устройство открывает TCP или Unix-сокет и шлёт пакеты по одному
+в строке JSON, как во входе pipeline.py в формате jsonl. На каждый
+пакет сервер отвечает строкой JSON в том же порядке:
+* сообщение о тренировке в формате jsonl из writers.py;
+* {"error": код, "workout_type": ..., "field": ..., "value": ...}
+  для отклонённого пакета или пакета, показатели которого
+  не считаются (код calculation_error).
+
+Всё, что пришло за одно чтение из сокета, обрабатывается пачкой
+и уходит одной записью. Пока клиент не забирает ответы, сервер
+не читает новые пакеты.
+
+Запуск сервера: python server.py serve [--host H] [--port P] [--unix PATH]
+Нагрузка:       python server.py load [--connections N] [--packages M]
+"""
+import argparse
+import asyncio
+import json
+import time
+from functools import partial
+from itertools import cycle, islice
+
+from homework import calculate_package
+from pipeline import parse_package
+from writers import JSONL_TEMPLATE, message_values
+
+READ_SIZE = 64 * 1024
+MAX_FRAME = 64 * 1024
+BAD_FRAME = 'bad_frame'
+SAMPLE_PACKAGES = [('SWM', [1200, 2, 80, 50, 25]),
+                   ('RUN', [5000, 1, 30]),
+                   ('WLK', [9000, 1, 75, 180]),
+                   ('RUN', [5000, 1, 300])]
+
+
+def error_response(code: str, workout_type=None, field=None,
+                   value=None) -> str:
+    """Строка ответа об отклонённом пакете."""
+    return json.dumps({'error': code, 'workout_type': workout_type,
+                       'field': field, 'value': value},
+                      ensure_ascii=False, default=repr) + '\n'
+
+
+def handle_frame(line: bytes) -> str:
+    """Обработать один пакет и вернуть строку ответа."""
+    try:
+        workout_type, data = parse_package(line)
+        info_message, error = calculate_package(workout_type, data)
+    except (ValueError, KeyError, TypeError):
+        return error_response(BAD_FRAME)
+    if error is not None:
+        return error_response(error.code, error.workout_type,
+                              error.field, error.value)
+    return JSONL_TEMPLATE % message_values(info_message)
+
+
+async def handle_connection(reader: asyncio.StreamReader,
+                            writer: asyncio.StreamWriter) -> None:
+    """Обслужить соединение одного устройства."""
+    pending = b''
+    try:
+        while True:
+            chunk = await reader.read(READ_SIZE)
+            if not chunk:
+                break
+            lines = (pending + chunk).split(b'\n')
+            pending = lines.pop()
+            if len(pending) > MAX_FRAME:
+                writer.write(error_response(BAD_FRAME).encode())
+                break
+            responses = [handle_frame(line) for line in lines
+                         if line.strip()]
+            writer.write(''.join(responses).encode())
+            await writer.drain()
+        if pending.strip() and len(pending) <= MAX_FRAME:
+            writer.write(handle_frame(pending).encode())
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def start(host: str = '127.0.0.1', port: int = 8765,
+                path: str = None) -> asyncio.AbstractServer:
+    """Запустить сервер на TCP-порту или на Unix-сокете path."""
+    if path:
+        return await asyncio.start_unix_server(handle_connection, path)
+    return await asyncio.start_server(handle_connection, host, port)
+
+
+def percentile(values: list, share: float) -> float:
+    """Перцентиль share (от 0 до 1) отсортированного списка."""
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+
+async def run_client(connect, packages: list, batch: int) -> list:
+    """Отправить пакеты пачками по batch и вернуть задержки ответов."""
+    reader, writer = await connect()
+    latencies = []
+    try:
+        for start_index in range(0, len(packages), batch):
+            frames = packages[start_index:start_index + batch]
+            sent = time.perf_counter()
+            writer.write(''.join(json.dumps(package) + '\n'
+                                 for package in frames).encode())
+            await writer.drain()
+            for _ in frames:
+                if not await reader.readline():
+                    raise ConnectionError('Сервер закрыл соединение.')
+                latencies.append(time.perf_counter() - sent)
+    finally:
+        writer.close()
+    return latencies
+
+
+async def load_test(connect, connections: int, packages: list,
+                    batch: int = 16) -> dict:
+    """Нагрузить сервер из connections соединений одновременно.
+
+    Каждое соединение отправляет весь список packages. Возвращает
+    пропускную способность в пакетах в секунду и задержки p50 и p99
+    в миллисекундах.
+    """
+    started = time.perf_counter()
+    results = await asyncio.gather(*(run_client(connect, packages, batch)
+                                     for _ in range(connections)))
+    elapsed = time.perf_counter() - started
+    latencies = sorted(latency for result in results for latency in result)
+    return {'packages': len(latencies),
+            'throughput': len(latencies) / elapsed,
+            'p50_ms': percentile(latencies, 0.5) * 1000,
+            'p99_ms': percentile(latencies, 0.99) * 1000}
+
+
+def connector(host: str, port: int, path: str = None):
+    """Функция открытия соединения с сервером."""
+    if path:
+        return partial(asyncio.open_unix_connection, path)
+    return partial(asyncio.open_connection, host, port)
+
+
+async def serve_forever(host: str, port: int, path: str) -> None:
+    """Работать как сервер до остановки процесса."""
+    server = await start(host, port, path)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None) -> None:
+    """Точка входа командной строки."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('mode', choices=('serve', 'load'))
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', help='путь к Unix-сокету')
+    parser.add_argument('--connections', type=int, default=16,
+                        help='число соединений для нагрузки')
+    parser.add_argument('--packages', type=int, default=10000,
+                        help='пакетов на соединение для нагрузки')
+    parser.add_argument('--batch', type=int, default=16,
+                        help='пакетов в одной отправке для нагрузки')
+    args = parser.parse_args(argv)
+    if args.mode == 'serve':
+        asyncio.run(serve_forever(args.host, args.port, args.unix))
+        return
+    packages = list(islice(cycle(SAMPLE_PACKAGES), args.packages))
+    stats = asyncio.run(load_test(connector(args.host, args.port, args.unix),
+                                  args.connections, packages, args.batch))
+    print(f'{stats["throughput"]:,.0f} пакетов/с, '
+          f'p50 {stats["p50_ms"]:.2f} мс, p99 {stats["p99_ms"]:.2f} мс')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+"""Тренировка по отсчётам датчиков во времени.
+
+Новые устройства присылают отсчёты раз в секунду: время и число шагов
+или гребков с прошлого отсчёта, для плавания ещё число проплытых
+бассейнов. TrainingSession копит отсчёты в массивах накопленных сумм,
+поэтому итоги обновляются за O(1) на отсчёт, а показатели любого
+интервала считаются разностью двух сумм. Показатели интервалов
+считаются пачкой через compute_batch по тем же формулам, что и итоговая
+тренировка: интервал на всю тренировку даёт те же числа до бита.
+
+Время - секунды, длительность тренировки - часы, как в Training.
+"""
+from array import array
+from bisect import bisect_right
+from typing import Iterable
+
+from homework import WORKOUT_TYPES, InfoMessage, Training, compute_batch
+
+SECONDS_IN_HOUR = 60 * 60
+
+
+class TrainingSession:
+    """Отсчёты одной тренировки и её накопленные итоги.
+
+    params - постоянные параметры тренировки по именам из FIELDS
+    класса: weight, для ходьбы height, для плавания length_pool.
+    action, duration и count_pool считаются по отсчётам.
+    """
+    # Параметры, которые берутся из отсчётов, а не из params
+    MEASURED = ('action', 'duration', 'count_pool')
+
+    def __init__(self, workout_type: str, start: float, **params) -> None:
+        self.workout_type = workout_type
+        self.training_class = WORKOUT_TYPES[workout_type]
+        missing = [field for field in self.training_class.FIELDS
+                   if field not in self.MEASURED and field not in params]
+        if missing:
+            raise TypeError(f'Не заданы параметры: {", ".join(missing)}.')
+        self.params = params
+        self.start = start
+        self.times = array('d')
+        # Накопленные суммы: элемент i - сумма первых i отсчётов
+        self.actions = array('d', [0.0])
+        self.pools = array('d', [0.0])
+
+    @property
+    def last(self) -> float:
+        """Время последнего отсчёта или начала тренировки."""
+        return self.times[-1] if self.times else self.start
+
+    def add(self, timestamp: float, action: float, pools: float = 0) -> None:
+        """Добавить отсчёт: шаги и бассейны с прошлого отсчёта."""
+        if timestamp <= self.last:
+            raise ValueError('Время отсчётов должно возрастать.')
+        self.times.append(timestamp)
+        self.actions.append(self.actions[-1] + action)
+        self.pools.append(self.pools[-1] + pools)
+
+    def extend(self, samples: Iterable[tuple]) -> None:
+        """Добавить отсчёты (время, шаги[, бассейны])."""
+        for sample in samples:
+            self.add(*sample)
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def package(self) -> list:
+        """Параметры пакета всей тренировки на текущий момент."""
+        measured = {'action': self.actions[-1],
+                    'duration': (self.last - self.start) / SECONDS_IN_HOUR,
+                    'count_pool': self.pools[-1]}
+        return [measured[field] if field in measured else self.params[field]
+                for field in self.training_class.FIELDS]
+
+    def training(self) -> Training:
+        """Итоговая тренировка по всем отсчётам."""
+        if not self.times:
+            raise ValueError('В тренировке нет отсчётов.')
+        return self.training_class(*self.package())
+
+    def show_training_info(self) -> InfoMessage:
+        """Сообщение об итогах тренировки."""
+        return self.training().show_training_info()
+
+    def intervals(self, bounds: Iterable[tuple]) -> dict:
+        """Показатели интервалов (начало, конец) в секундах.
+
+        Интервал включает отсчёты со временем больше начала и не больше
+        конца. Возвращает столбцы begin, end, action, duration,
+        distance, speed, calories.
+        """
+        bounds = list(bounds)
+        for begin, end in bounds:
+            if end <= begin:
+                raise ValueError(f'Пустой интервал ({begin}, {end}): '
+                                 'конец должен быть позже начала.')
+        times = self.times
+        first = [bisect_right(times, begin) for begin, _ in bounds]
+        last = [bisect_right(times, end) for _, end in bounds]
+        columns = {'begin': array('d', (begin for begin, _ in bounds)),
+                   'end': array('d', (end for _, end in bounds))}
+        actions = self.actions
+        pools = self.pools
+        measured = {
+            'action': array('d', map(
+                float.__sub__, map(actions.__getitem__, last),
+                map(actions.__getitem__, first))),
+            'duration': array('d', ((end - begin) / SECONDS_IN_HOUR
+                                    for begin, end in bounds)),
+            'count_pool': array('d', map(
+                float.__sub__, map(pools.__getitem__, last),
+                map(pools.__getitem__, first))),
+        }
+        batch = {field: measured[field] if field in measured
+                 else [self.params[field]] * len(bounds)
+                 for field in self.training_class.FIELDS}
+        distance, speed, calories = compute_batch(self.workout_type, batch)
+        columns.update(action=measured['action'],
+                       duration=measured['duration'], distance=distance,
+                       speed=speed, calories=calories)
+        return columns
+
+    def splits(self, seconds: float) -> dict:
+        """Показатели подряд идущих отрезков по seconds секунд.
+
+        Последний отрезок заканчивается на последнем отсчёте.
+        """
+        if seconds <= 0:
+            raise ValueError('Длина отрезка должна быть больше нуля.')
+        bounds = []
+        index = 0
+        # Границы от начала, а не сложением, чтобы не копить погрешность
+        while self.start + index * seconds < self.last:
+            bounds.append((self.start + index * seconds,
+                           min(self.start + (index + 1) * seconds,
+                               self.last)))
+            index += 1
+        return self.intervals(bounds)
+
+    def rolling(self, window: float, step: float) -> dict:
+        """Скользящие окна по window секунд с шагом step.
+
+        Окна заканчиваются через каждые step секунд от начала
+        тренировки; первые окна короче window.
+        """
+        if window <= 0 or step <= 0:
+            raise ValueError('Окно и шаг должны быть больше нуля.')
+        ends = [self.start + index * step for index in
+                range(1, int((self.last - self.start) // step) + 1)]
+        return self.intervals((max(self.start, end - window), end)
+                              for end in ends)
@@ -0,0 +1,167 @@
+"""Хранение результатов тренировок в SQLite.
+
+ResultStore копит строки (пользователь, время, код, InfoMessage)
+и записывает их пачками через executemany в одной транзакции. База
+работает в режиме WAL: читатели из ReaderPool не ждут писателя
+и видят последнюю завершённую пачку. Индексы по (user_id, ts)
+и (workout_type, ts) отвечают на запросы за период по пользователю
+и по типу тренировки без просмотра всей таблицы.
+"""
+import queue
+import sqlite3
+from contextlib import contextmanager
+from typing import Hashable, Iterable, Iterator, Optional
+
+from homework import InfoMessage
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS results ('
+    'user_id, ts REAL, workout_type TEXT, training_type TEXT, '
+    'duration REAL, distance REAL, speed REAL, calories REAL)',
+    'CREATE INDEX IF NOT EXISTS results_user_ts ON results (user_id, ts)',
+    'CREATE INDEX IF NOT EXISTS results_type_ts '
+    'ON results (workout_type, ts)',
+)
+INSERT = 'INSERT INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?)'
+COLUMNS = ('user_id, ts, workout_type, training_type, duration, distance, '
+           'speed, calories')
+SELECT_USER = (f'SELECT {COLUMNS} FROM results '
+               'WHERE user_id = ? AND ts >= ? AND ts < ? ORDER BY ts')
+SELECT_TYPE = (f'SELECT {COLUMNS} FROM results '
+               'WHERE workout_type = ? AND ts >= ? AND ts < ? ORDER BY ts')
+TOTALS_USER = ('SELECT workout_type, COUNT(*), SUM(duration), '
+               'SUM(distance), SUM(calories) FROM results '
+               'WHERE user_id = ? AND ts >= ? AND ts < ? '
+               'GROUP BY workout_type')
+FOREVER = float('inf')
+
+
+def user_results(connection: sqlite3.Connection, user_id: Hashable,
+                 since: float = 0.0, until: float = FOREVER) -> list:
+    """Строки результатов пользователя за период [since, until)."""
+    return connection.execute(SELECT_USER, (user_id, since, until)).fetchall()
+
+
+def type_results(connection: sqlite3.Connection, workout_type: str,
+                 since: float = 0.0, until: float = FOREVER) -> list:
+    """Строки результатов по коду тренировки за период [since, until)."""
+    return connection.execute(
+        SELECT_TYPE, (workout_type, since, until)).fetchall()
+
+
+def user_totals(connection: sqlite3.Connection, user_id: Hashable,
+                since: float = 0.0, until: float = FOREVER) -> dict:
+    """Число тренировок и суммы пользователя по кодам за период."""
+    return {workout_type: {'count': count, 'duration': duration,
+                           'distance': distance, 'calories': calories}
+            for workout_type, count, duration, distance, calories
+            in connection.execute(TOTALS_USER, (user_id, since, until))}
+
+
+class ResultStore:
+    """Запись результатов тренировок пачками.
+
+    Строки копятся в памяти и уходят в базу одной транзакцией, когда их
+    набирается batch_size, а также при flush и выходе из блока with.
+    """
+
+    def __init__(self, path: str, batch_size: int = 10000) -> None:
+        self.path = path
+        self.batch_size = batch_size
+        self.connection = sqlite3.connect(path)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        # В WAL синхронизация на каждом коммите не нужна для целостности
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        for statement in SCHEMA:
+            self.connection.execute(statement)
+        self.connection.commit()
+        self.rows = []
+        self.written = 0
+
+    def add(self, user_id: Hashable, timestamp: float, workout_type: str,
+            info_message: InfoMessage) -> None:
+        """Добавить результат тренировки пользователя."""
+        self.rows.append((user_id, timestamp, workout_type,
+                          info_message.training_type, info_message.duration,
+                          info_message.distance, info_message.speed,
+                          info_message.calories))
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def add_many(self, results: Iterable[tuple]) -> None:
+        """Добавить результаты (пользователь, время, код, InfoMessage)."""
+        for result in results:
+            self.add(*result)
+
+    def flush(self) -> None:
+        """Записать накопленные строки одной транзакцией."""
+        if not self.rows:
+            return
+        with self.connection:
+            self.connection.executemany(INSERT, self.rows)
+        self.written += len(self.rows)
+        self.rows.clear()
+
+    def close(self) -> None:
+        """Записать остаток и закрыть соединение."""
+        self.flush()
+        self.connection.close()
+
+    def __enter__(self) -> 'ResultStore':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+class ReaderPool:
+    """Пул соединений только для чтения для параллельных запросов.
+
+    Соединение берётся из пула на время запроса, поэтому size потоков
+    читают одновременно, а остальные ждут свободного соединения.
+    """
+
+    def __init__(self, path: str, size: int = 4) -> None:
+        self.size = size
+        self.connections = queue.Queue()
+        for _ in range(size):
+            self.connections.put(sqlite3.connect(
+                f'file:{path}?mode=ro', uri=True, check_same_thread=False))
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Взять соединение из пула на время блока with."""
+        connection = self.connections.get()
+        try:
+            yield connection
+        finally:
+            self.connections.put(connection)
+
+    def user_results(self, user_id: Hashable, since: float = 0.0,
+                     until: float = FOREVER) -> list:
+        """Строки результатов пользователя за период."""
+        with self.connection() as connection:
+            return user_results(connection, user_id, since, until)
+
+    def type_results(self, workout_type: str, since: float = 0.0,
+                     until: float = FOREVER) -> list:
+        """Строки результатов по коду тренировки за период."""
+        with self.connection() as connection:
+            return type_results(connection, workout_type, since, until)
+
+    def user_totals(self, user_id: Hashable, since: float = 0.0,
+                    until: float = FOREVER) -> dict:
+        """Суммы пользователя по кодам тренировок за период."""
+        with self.connection() as connection:
+            return user_totals(connection, user_id, since, until)
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Закрыть все соединения, дождавшись их возврата в пул."""
+        for _ in range(self.size):
+            self.connections.get(timeout=timeout).close()
+
+    def __enter__(self) -> 'ReaderPool':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
@@ -2,6 +2,8 @@ import sys
 from pathlib import Path
 from io import StringIO
 
+import pytest
+
 BASE_DIR = Path(__file__).resolve(strict=True).parent.parent
 sys.path.append(str(BASE_DIR))
 
@@ -25,3 +27,41 @@ class Capturing(list):
         self.extend(self._stringio.getvalue().splitlines())
         del self._stringio  # free up some memory
         sys.stdout = self._stdout
+
+
+@pytest.fixture
+def cycling():
+    """Тип CYC, зарегистрированный после импорта модулей.
+
+    Реестры homework меняются на месте, как при регистрации
+    в программе, и восстанавливаются после теста.
+    """
+    import homework
+
+    saved = {name: dict(getattr(homework, name))
+             for name in ('WORKOUT_TYPES', 'SCHEMAS', 'BUILDERS')}
+
+    @homework.register_training('CYC')
+    class Cycling(homework.Training):
+        __slots__ = ()
+        COEFF_CALORIE = 7.5
+
+        def get_spent_calories(self):
+            return self.COEFF_CALORIE * self.weight * self.duration
+
+    yield Cycling
+    for name, registry in saved.items():
+        getattr(homework, name).clear()
+        getattr(homework, name).update(registry)
+
+
+@pytest.fixture
+def unsound_packages():
+    """Пакеты, которые проходят проверку, но не считаются.
+
+    Скорость в квадрате переполняется, целое не переводится в float,
+    скорость бесконечна.
+    """
+    return [('WLK', [1e205, 1, 75, 180]),
+            ('RUN', [10 ** 400, 1, 75]),
+            ('RUN', [1e308, 1e-300, 75])]
@@ -0,0 +1,103 @@
+import calendar
+import pickle
+
+import pytest
+
+import aggregation
+import homework
+
+DAY = aggregation.SECONDS_IN_DAY
+# Понедельник, 2 сентября 2024 года
+MONDAY = calendar.timegm((2024, 9, 2, 12, 0, 0))
+
+
+def message(training_type='Running', calories=100.0):
+    return homework.InfoMessage(training_type, 1.0, 5.0, 5.0, calories)
+
+
+def test_user_totals():
+    aggregator = aggregation.Aggregator()
+    aggregator.add('anna', MONDAY, message(calories=100))
+    aggregator.add('anna', MONDAY, message(calories=300))
+    aggregator.add('anna', MONDAY, message('Swimming', calories=50))
+    aggregator.add_training('boris', MONDAY,
+                            homework.read_package('RUN', [5000, 1, 30]))
+    running = aggregator.user_totals('anna', 'Running')
+    assert running.count == 2
+    assert running.calories == 400
+    assert running.mean_calories == 200
+    assert aggregator.user_totals('anna').count == 3
+    assert aggregator.user_totals('boris').calories == pytest.approx(69.3)
+    assert aggregator.user_totals('nobody').count == 0
+
+
+def test_windows():
+    aggregator = aggregation.Aggregator()
+    for day in range(10):
+        aggregator.add('anna', MONDAY + day * DAY, message())
+    assert aggregator.window('anna', 'day', MONDAY + 3 * DAY).count == 1
+    assert aggregator.window('anna', 'week', MONDAY + DAY).count == 7, (
+        'Неделя должна начинаться с понедельника.'
+    )
+    assert aggregator.window('anna', 'week', MONDAY + 8 * DAY).count == 3
+    assert aggregator.window('anna', 'month', MONDAY).count == 10
+    starts = [start for start, _, _ in aggregator.history('anna', 'week')]
+    assert starts == [MONDAY - 12 * 3600, MONDAY - 12 * 3600 + 7 * DAY]
+    month_start = aggregator.history('anna', 'month')[0][0]
+    assert month_start == calendar.timegm((2024, 9, 1, 0, 0, 0))
+
+
+def test_window_expiry():
+    aggregator = aggregation.Aggregator(keep={'day': 3})
+    for day in (0, 1, 2, 3):
+        aggregator.add('anna', MONDAY + day * DAY, message())
+    assert len(aggregator.history('anna', 'day')) == 3
+    assert aggregator.window('anna', 'day', MONDAY).count == 0, (
+        'Старые окна должны удаляться.'
+    )
+    aggregator.add('anna', MONDAY, message())
+    assert aggregator.dropped == 1
+    assert aggregator.user_totals('anna').count == 5
+    aggregator.add('anna', MONDAY + 10 * DAY, message())
+    aggregator.add('anna', MONDAY + 9 * DAY, message())
+    days = [start for start, _, _ in aggregator.history('anna', 'day')]
+    assert days == sorted(days)
+
+
+def test_merge():
+    first, second, total = (aggregation.Aggregator() for _ in range(3))
+    for number in range(20):
+        part = first if number % 2 else second
+        for aggregator in (part, total):
+            aggregator.add(number % 3, MONDAY + number * DAY,
+                           message(calories=number))
+    first.merge(second)
+    for user_id in range(3):
+        assert (first.user_totals(user_id).as_dict()
+                == total.user_totals(user_id).as_dict())
+        assert ([(start, totals.count) for start, _, totals
+                 in sorted(first.history(user_id, 'week'))]
+                == [(start, totals.count) for start, _, totals
+                    in sorted(total.history(user_id, 'week'))])
+
+
+def test_absorb_after_pickle():
+    first, second, total = (aggregation.Aggregator() for _ in range(3))
+    for number in range(30):
+        # Пользователь 0 есть в обеих частях, остальные - только в одной
+        user_id = number % 5
+        part = first if user_id in (0, 1, 2) else second
+        if user_id == 0 and number % 2:
+            part = second
+        for aggregator in (part, total):
+            aggregator.add(user_id, MONDAY + number * DAY,
+                           message(calories=number))
+    first.absorb(pickle.loads(pickle.dumps(second)))
+    assert first.events == total.events
+    for user_id in range(5):
+        assert (first.user_totals(user_id).as_dict()
+                == total.user_totals(user_id).as_dict())
+        assert (sorted((start, totals.count) for start, _, totals
+                       in first.history(user_id, 'day'))
+                == sorted((start, totals.count) for start, _, totals
+                          in total.history(user_id, 'day')))
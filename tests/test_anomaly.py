@@ -0,0 +1,121 @@
+import json
+import random
+
+import anomaly
+
+
+def steady_events(device, count: int, seed: int = 0) -> list:
+    rnd = random.Random(seed)
+    return [(device, index, 'RUN',
+             [rnd.randint(9000, 10000), rnd.uniform(0.9, 1.1), 75])
+            for index in range(count)]
+
+
+def test_faulty_sensor_flagged_and_not_absorbed():
+    detector = anomaly.AnomalyDetector()
+    assert list(anomaly.detect(steady_events('a', 50), detector)) == [], (
+        'Обычные пакеты устройства не должны отмечаться.'
+    )
+    state = detector.states['RUN']['a'][:5]
+    faulty = ('a', 50, 'RUN', [20000, 0.05, 75])
+    [(event, info_message, field)] = anomaly.detect([faulty], detector)
+    assert (event, field) == (faulty, anomaly.SPEED)
+    assert info_message.speed > 200
+    assert detector.states['RUN']['a'][:5] == state, (
+        'Выброс не должен попадать в статистику устройства.'
+    )
+    assert detector.flagged == 1
+
+
+def test_sustained_shift_recovers():
+    rnd = random.Random(1)
+    detector = anomaly.AnomalyDetector()
+    for _ in range(100):
+        detector.check('a', 'RUN', rnd.gauss(10, 0.1), rnd.gauss(500, 5))
+    flags = [detector.check('a', 'RUN', rnd.gauss(11.5, 0.1),
+                            rnd.gauss(575, 5)) for _ in range(300)]
+    assert flags[:detector.recovery] == [anomaly.SPEED] * detector.recovery
+    assert not any(flags[100:]), (
+        'Устойчивый сдвиг уровня должен перестать отмечаться.'
+    )
+    assert detector.states['RUN']['a'][5] == 0
+
+
+def test_infinite_values_flagged_and_not_absorbed():
+    detector = anomaly.AnomalyDetector()
+    detector.check('a', 'RUN', 3.25, 69.3)
+    detector.check('a', 'RUN', 3.25, 69.3)
+    assert detector.check('a', 'RUN', float('inf'), 1.0) == anomaly.SPEED
+    assert detector.check('a', 'RUN', 3.25, float('nan')) == (
+        anomaly.CALORIES)
+    assert detector.check('a', 'RUN', 1e200, 69.3) == anomaly.SPEED
+    assert detector.check('b', 'RUN', float('inf'), 1.0) == anomaly.SPEED
+    assert detector.states['RUN'] == {'a': [2, 3.25, 0.0, 69.3, 0.0, 0]}, (
+        'Бесконечные показатели не должны портить статистику, '
+        'даже до warmup.'
+    )
+    events = [('a', 3, 'RUN', [1e308, 1e-300, 75])] + [
+        ('a', 4 + index, 'RUN', [5000 + index, 1, 75])
+        for index in range(12)] + [
+        ('a', 20 + index, 'RUN', [5000000, 0.01, 75]) for index in range(3)]
+    assert [event[1] for event, _, _ in anomaly.detect(events, detector)
+            ] == [20, 21, 22], 'Сбойный датчик после inf должен отмечаться.'
+
+
+def test_devices_and_types_are_separate():
+    detector = anomaly.AnomalyDetector(warmup=5)
+    events = steady_events('slow', 30) + [
+        ('fast', index, 'RUN', [3 * action, duration, weight])
+        for _, index, _, (action, duration, weight)
+        in steady_events('fast', 30, seed=1)]
+    events.append(('slow', 30, 'SWM', [720, 1, 80, 25, 40]))
+    assert list(anomaly.detect(events, detector)) == [], (
+        'Статистика должна вестись по устройству и типу тренировки.'
+    )
+    assert detector.devices() == {'slow', 'fast'}
+    detector.forget('slow')
+    assert detector.devices() == {'fast'}
+
+
+def test_warmup_and_invalid_packages():
+    detector = anomaly.AnomalyDetector(warmup=10)
+    events = steady_events('a', 5) + [('a', 5, 'RUN', [20000, 0.05, 75]),
+                                      ('a', 6, 'RUN', [5000, 1, 600]),
+                                      ('a', 7, 'XXX', [1, 2])]
+    assert list(anomaly.detect(events, detector)) == [], (
+        'До warmup пакетов устройство не проверяется.'
+    )
+    assert detector.states['RUN']['a'][0] == 6
+
+
+def test_registered_type(cycling):
+    detector = anomaly.AnomalyDetector(warmup=5)
+    events = [('a', index, 'CYC', [1000, 1 + index % 2 / 10, 70])
+              for index in range(10)] + [('a', 10, 'CYC', [1000, 0.01, 70])]
+    [(event, _, field)] = anomaly.detect(events, detector)
+    assert (event[1], field) == (10, anomaly.SPEED)
+    assert detector.states['CYC']['a'][0] == 10
+
+
+def test_unsound_packages_skipped(unsound_packages):
+    detector = anomaly.AnomalyDetector(warmup=5)
+    events = steady_events('a', 20) + [
+        ('a', 20 + index, workout_type, data)
+        for index, (workout_type, data) in enumerate(unsound_packages)]
+    assert list(anomaly.detect(events, detector)) == [], (
+        'Пакеты, которые не посчитались, не проверяются на выбросы.'
+    )
+    assert detector.states['RUN']['a'][0] == 20
+
+
+def test_main_prints_flagged(tmp_path, capsys):
+    path = tmp_path / 'events.jsonl'
+    events = steady_events(7, 20) + [(7, 20, 'RUN', [20000, 0.05, 75])]
+    path.write_text(''.join(json.dumps(event) + '\n' for event in events),
+                    encoding='utf-8')
+    anomaly.main([str(path)])
+    captured = capsys.readouterr()
+    [line] = captured.out.splitlines()
+    record = json.loads(line)
+    assert (record['device'], record['anomaly']) == (7, 'speed')
+    assert 'отмечено: 1' in captured.err
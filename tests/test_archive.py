@@ -0,0 +1,100 @@
+import json
+
+import pytest
+from conftest import Capturing
+
+import archive
+import homework
+
+PACKAGES = [('SWM', [720, 1, 80, 25, 40]),
+            ('RUN', [15000, 1, 75]),
+            ('WLK', [9000, 1, 75, 180]),
+            ('RUN', [5000, 1.5, 30.25])]
+
+
+def write_archive(path, packages=PACKAGES):
+    with archive.ArchiveWriter(str(path)) as writer:
+        writer.write_many(packages)
+    return str(path)
+
+
+def test_roundtrip(tmp_path):
+    path = write_archive(tmp_path / 'packages.ftrk')
+    with archive.Archive(path) as packed:
+        assert len(packed) == len(PACKAGES)
+        assert list(packed) == PACKAGES, (
+            'Архив должен возвращать записанные пакеты без изменений.'
+        )
+
+
+def test_columns_without_copy(tmp_path):
+    path = write_archive(tmp_path / 'packages.ftrk')
+    with archive.Archive(path) as packed:
+        codes = [packed.workout_types[code] for code in packed.codes]
+        assert codes == [workout_type for workout_type, _ in PACKAGES]
+        column = packed.column(1)
+        assert column.tolist() == [1.0, 1.0, 1.0, 1.5], (
+            'Столбец должен содержать параметр каждой записи.'
+        )
+        column.release()
+
+
+def test_close_with_live_views(tmp_path):
+    path = write_archive(tmp_path / 'packages.ftrk', PACKAGES * 3000)
+    packed = archive.Archive(path)
+    codes = packed.codes
+    packages = iter(packed)
+    assert next(packages) == PACKAGES[0]
+    batches = packed.iter_batches(size=5)
+    assert next(batches)[0] in homework.WORKOUT_TYPES
+    for _ in packed:
+        break
+    packed.close()
+    assert packed.workout_types[codes[-1]] == 'RUN', (
+        'Представление должно оставаться рабочим после close.'
+    )
+    assert next(packages) == PACKAGES[1], (
+        'Прерванный обход не должен мешать close.'
+    )
+
+
+def test_iter_batches_matches_read_package(tmp_path):
+    path = write_archive(tmp_path / 'packages.ftrk', PACKAGES * 3)
+    calories = {}
+    with archive.Archive(path) as packed:
+        for workout_type, columns in packed.iter_batches(size=5):
+            result = homework.compute_batch(workout_type, columns)
+            calories.setdefault(workout_type, []).extend(result[2])
+    for workout_type, data in PACKAGES:
+        expected = homework.read_package(
+            workout_type, data).get_spent_calories()
+        assert expected in calories[workout_type], (
+            'Пакетный расчёт по архиву должен совпадать с `read_package`.'
+        )
+
+
+def test_bad_archive(tmp_path):
+    path = tmp_path / 'packages.ftrk'
+    path.write_bytes(b'NOPE' + bytes(12))
+    with pytest.raises(ValueError):
+        archive.Archive(str(path))
+    write_archive(path)
+    with open(path, 'ab') as stream:
+        stream.write(b'\0')
+    with pytest.raises(ValueError):
+        archive.Archive(str(path))
+
+
+def test_main_pack_unpack(tmp_path):
+    source = tmp_path / 'packages.jsonl'
+    source.write_text(
+        '\n'.join(json.dumps(package)
+                  for package in PACKAGES + [('RUN', [5000, 1, 5])]),
+        encoding='utf-8')
+    path = str(tmp_path / 'packages.ftrk')
+    archive.main(['pack', str(source), path])
+    with Capturing() as output:
+        archive.main(['unpack', path])
+    assert [tuple(json.loads(line)) for line in output] == PACKAGES, (
+        'В архив должны попадать только корректные пакеты.'
+    )
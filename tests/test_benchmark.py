@@ -0,0 +1,42 @@
+import json
+
+import pytest
+
+import benchmark
+import generator
+
+
+def test_compare_threshold():
+    baseline = {'a': 100.0, 'b': 100.0, 'c': 100.0}
+    results = {'a': 85.0, 'b': 79.0, 'd': 1.0}
+    assert benchmark.compare(baseline, results, 0.2) == [('b', 100.0, 79.0)], (
+        'Регрессией считается замедление больше порога, '
+        'новые замеры не сравниваются.'
+    )
+
+
+def test_make_mixed_proportions():
+    packages = benchmark.make_mixed(3000)
+    shares = {workout_type: sum(code == workout_type for code, _ in packages)
+              / len(packages) for workout_type in generator.MIX}
+    for workout_type, share in generator.MIX.items():
+        assert abs(shares[workout_type] - share) < 0.05
+
+
+def test_main_save_and_compare(tmp_path, monkeypatch, capsys):
+    rates = iter([1000.0, 1000.0, 500.0])
+
+    def bench_fake(size):
+        benchmark.report('fake', size, size / next(rates))
+
+    monkeypatch.setattr(benchmark, 'BENCHMARKS', {'fake': bench_fake})
+    path = tmp_path / 'baseline.json'
+    benchmark.main(['--size', '10', '--save', str(path)])
+    saved = json.loads(path.read_text(encoding='utf-8'))
+    assert saved['size'] == 10
+    assert saved['results'] == {'fake: fake': pytest.approx(1000.0)}
+    benchmark.main(['--size', '10', '--compare', str(path)])
+    with pytest.raises(SystemExit) as error:
+        benchmark.main(['--size', '10', '--compare', str(path)])
+    assert error.value.code == 1, 'Замедление вдвое должно завершать с ошибкой.'
+    assert 'замедление fake: fake' in capsys.readouterr().err
@@ -0,0 +1,100 @@
+import cache
+import homework
+import pipeline
+from writers import message_values
+
+PACKAGES = [('SWM', [720, 1, 80, 25, 40]),
+            ('RUN', [15000, 1, 75]),
+            ('WLK', [9000, 1, 75, 180])]
+
+
+def expected(workout_type, data):
+    return homework.build_training(workout_type, data).show_training_info()
+
+
+def test_hits_and_misses():
+    result_cache = cache.ResultCache()
+    for workout_type, data in PACKAGES * 2:
+        key = cache.package_key(workout_type, data)
+        if result_cache.get(key) is None:
+            result_cache.put(key, expected(workout_type, data))
+    assert result_cache.stats() == {'hits': 3, 'disk_hits': 0, 'misses': 3,
+                                    'evictions': 0, 'size': 3}
+    assert result_cache.get(cache.package_key(
+        'RUN', [15000.0, 1.0, 75.0])) is None, (
+        'Равные целые и дробные параметры дают разные результаты '
+        'и не должны делить запись кэша.'
+    )
+
+
+def test_lru_eviction():
+    result_cache = cache.ResultCache(maxsize=2)
+    keys = [cache.package_key(*package) for package in PACKAGES]
+    result_cache.put(keys[0], expected(*PACKAGES[0]))
+    result_cache.put(keys[1], expected(*PACKAGES[1]))
+    result_cache.get(keys[0])
+    result_cache.put(keys[2], expected(*PACKAGES[2]))
+    assert result_cache.get(keys[1]) is None, (
+        'Вытесняться должна давно не запрошенная запись.'
+    )
+    assert result_cache.get(keys[0]) is not None
+    assert result_cache.evictions == 1
+
+
+def test_unhashable_package_is_miss():
+    result_cache = cache.ResultCache()
+    assert result_cache.get(cache.package_key('RUN', [[1], 1, 75])) is None
+    assert result_cache.misses == 1
+
+
+def value_types(info_message):
+    return [(value, type(value)) for value in message_values(info_message)]
+
+
+def test_non_sequence_data_is_miss(tmp_path):
+    packages = [('RUN', None), ('RUN', 5), ('RUN', [15000, 1, 75])]
+    errors = []
+    with cache.ResultCache(path=str(tmp_path / 'cache.sqlite')) as cached:
+        messages = list(pipeline.process_packages(packages, errors.append,
+                                                  cached))
+        assert cached.stats()['misses'] == 3
+    assert len(messages) == 1
+    assert [error.code for error in errors] == [homework.WRONG_LENGTH] * 2, (
+        'С кэшем пакет не списком должен отклоняться, как и без него.'
+    )
+
+
+def test_sqlite_survives_restart(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    key = cache.package_key(*PACKAGES[0])
+    other = cache.package_key('SWM', [720, 1.0, 80, 25, 40])
+    with cache.ResultCache(path=path) as result_cache:
+        result_cache.put(key, expected(*PACKAGES[0]))
+    with cache.ResultCache(path=path) as result_cache:
+        assert result_cache.load(other) is None
+        assert value_types(result_cache.get(key)) == value_types(
+            expected(*PACKAGES[0])), (
+            'С диска должны читаться значения тех же типов.'
+        )
+        result_cache.get(key)
+        assert result_cache.stats()['disk_hits'] == 1, (
+            'После чтения с диска результат должен попасть в память.'
+        )
+        assert result_cache.hits == 1
+
+
+def test_process_packages_with_cache():
+    packages = PACKAGES * 3 + [('RUN', [15000, 1, 5])] * 2
+    errors = []
+    result_cache = cache.ResultCache()
+    messages = list(pipeline.process_packages(packages, errors.append,
+                                              result_cache))
+    assert [message_values(info_message) for info_message in messages] == [
+        message_values(expected(*package)) for package in PACKAGES * 3
+    ], 'Кэш не должен менять результаты обработки.'
+    assert len(errors) == 2, 'Некорректные пакеты не должны кэшироваться.'
+    assert result_cache.hits == 6
+    packages = PACKAGES + [('RUN', [15000, 1.0, 75])]
+    assert [value_types(info_message) for info_message
+            in pipeline.process_packages(packages * 2, cache=result_cache)
+            ] == [value_types(expected(*package)) for package in packages * 2]
@@ -0,0 +1,58 @@
+import subprocess
+import sys
+import time
+
+import cli
+from conftest import BASE_DIR
+
+RUN_MESSAGE = ('Тип тренировки: Running; Длительность: 1.000 ч.; '
+               'Дистанция: 3.250 км; Ср. скорость: 3.250 км/ч; '
+               'Потрачено ккал: 69.300.')
+
+
+def test_import_is_light():
+    code = ('import sys, cli; print(sorted(set(sys.modules) & {'
+            '"argparse", "json", "sqlite3", "asyncio", "pipeline", '
+            '"server", "cache"}))')
+    output = subprocess.run([sys.executable, '-c', code], cwd=BASE_DIR,
+                            capture_output=True, text=True, check=True)
+    assert output.stdout.strip() == '[]', (
+        'cli.py не должен загружать тяжёлые модули при запуске.'
+    )
+
+
+def test_calc(capsys):
+    assert cli.main(['calc', 'RUN', '5000', '1', '30']) == 0
+    assert capsys.readouterr().out.strip() == RUN_MESSAGE
+    assert cli.main(['calc', 'RUN', '5000', '1']) == 1
+    assert 'RUN' in capsys.readouterr().err
+    assert cli.main(['calc', 'RUN', 'много']) == 2
+    assert cli.main(['fly']) == 2
+
+
+def test_call_without_worker_falls_back(tmp_path, capsys):
+    path = str(tmp_path / 'missing.sock')
+    assert cli.main(['call', 'RUN', '5000', '1', '30', '--unix', path]) == 0
+    assert capsys.readouterr().out.strip() == RUN_MESSAGE, (
+        'Без тёплого процесса call должен считать пакет сам.'
+    )
+
+
+def test_call_worker(tmp_path, capsys):
+    path = str(tmp_path / 'worker.sock')
+    process = subprocess.Popen(
+        [sys.executable, str(BASE_DIR / 'cli.py'), 'worker', '--unix', path])
+    try:
+        deadline = time.monotonic() + 10
+        while not (tmp_path / 'worker.sock').exists():
+            assert process.poll() is None and time.monotonic() < deadline
+            time.sleep(0.01)
+        assert cli.main(['call', 'RUN', '5000', '1', '30',
+                         '--unix', path]) == 0
+        assert capsys.readouterr().out.strip() == RUN_MESSAGE
+        assert cli.main(['call', 'RUN', '5000', '1', '300',
+                         '--unix', path]) == 1
+        assert 'weight_range' in capsys.readouterr().err
+    finally:
+        process.terminate()
+        process.wait()
@@ -0,0 +1,129 @@
+import math
+import multiprocessing
+import random
+
+import pytest
+
+import aggregation
+import cluster
+import generator
+
+
+def make_events(count: int, users: int = 40) -> list:
+    rnd = random.Random(3)
+    return [(rnd.randrange(users), 1_700_000_000 + index * 600,
+             workout_type, data)
+            for index, (workout_type, data) in enumerate(
+                generator.generate(count, seed=3, invalid_rate=0.05))]
+
+
+def start_failing(address: str, fail_after: int):
+    process = multiprocessing.Process(
+        target=cluster.serve, args=(address, cluster.AUTHKEY, fail_after))
+    process.start()
+    cluster.wait_listening(address, process)
+    return process
+
+
+def assert_same_totals(result, expected):
+    assert result.events == expected.events
+    for user_id, by_type in expected.totals.items():
+        for training_type, totals in by_type.items():
+            got = result.totals[user_id][training_type].as_dict()
+            for name, value in totals.as_dict().items():
+                assert math.isclose(got[name], value, rel_tol=1e-9), (
+                    'Сложенные частичные итоги должны совпадать '
+                    'с последовательным расчётом.'
+                )
+
+
+@pytest.fixture
+def expected():
+    aggregator = aggregation.Aggregator()
+    rejected = cluster.process_events(aggregator, make_events(2000))
+    return aggregator, rejected
+
+
+def test_coordinator_matches_serial(tmp_path, expected):
+    processes, addresses = cluster.start_local(3, str(tmp_path))
+    with cluster.Coordinator(addresses, chunk_size=50,
+                             shards=6) as coordinator:
+        result = coordinator.run(make_events(2000))
+        coordinator.close(stop=True)
+    for process in processes:
+        process.join()
+    assert_same_totals(result, expected[0])
+    assert coordinator.rejected == expected[1]
+    assert coordinator.retried == 0
+
+
+def test_failed_worker_retried(tmp_path, expected):
+    failing = start_failing(str(tmp_path / 'failing.sock'), 4)
+    processes, addresses = cluster.start_local(2, str(tmp_path))
+    with cluster.Coordinator([str(tmp_path / 'failing.sock'), *addresses],
+                             chunk_size=50) as coordinator:
+        result = coordinator.run(make_events(2000))
+        coordinator.close(stop=True)
+    for process in (failing, *processes):
+        process.join()
+    assert coordinator.retried > 0, 'Шарды упавшего обработчика повторяются.'
+    assert_same_totals(result, expected[0])
+    assert coordinator.rejected == expected[1]
+
+
+def test_unsound_packages_rejected(tmp_path, expected, unsound_packages):
+    poison = [(user_id, 1_700_000_000, workout_type, data)
+              for user_id, (workout_type, data)
+              in enumerate(unsound_packages)]
+    assert cluster.process_events(aggregation.Aggregator(), poison) == 3
+    processes, addresses = cluster.start_local(2, str(tmp_path))
+    with cluster.Coordinator(addresses, chunk_size=50) as coordinator:
+        result = coordinator.run(poison + make_events(2000))
+        coordinator.close(stop=True)
+    for process in processes:
+        process.join()
+    assert coordinator.retried == 0, (
+        'Пакет с непосчитанными показателями не должен ронять обработчик.'
+    )
+    assert_same_totals(result, expected[0])
+    assert coordinator.rejected == expected[1] + len(poison)
+
+
+def test_malformed_events_rejected(tmp_path, expected):
+    malformed = [(2, '2024-01-01', 'RUN', [5000, 1, 30]),
+                 ([2], 1_700_000_000, 'RUN', [5000, 1, 30]),
+                 (2, float('nan'), 'RUN', [5000, 1, 30]),
+                 (2, 10 ** 400, 'RUN', [5000, 1, 30]),
+                 (2, 1_700_000_000, ['RUN'], [5000, 1, 30]),
+                 (2, 1_700_000_000, 'RUN'),
+                 None]
+    aggregator = aggregation.Aggregator()
+    assert cluster.process_events(aggregator, malformed) == len(malformed)
+    assert aggregator.events == 0 and aggregator.totals == {}, (
+        'Отклонённое событие не должно менять итоги.'
+    )
+    processes, addresses = cluster.start_local(2, str(tmp_path))
+    with cluster.Coordinator(addresses, chunk_size=50) as coordinator:
+        result = coordinator.run(malformed + make_events(2000))
+        coordinator.close(stop=True)
+    for process in processes:
+        process.join()
+    assert coordinator.retried == 0, (
+        'Некорректное событие не должно ронять обработчик.'
+    )
+    assert_same_totals(result, expected[0])
+    assert coordinator.rejected == expected[1] + len(malformed)
+
+
+def test_no_workers_left(tmp_path):
+    failing = start_failing(str(tmp_path / 'failing.sock'), 1)
+    with cluster.Coordinator([str(tmp_path / 'failing.sock')],
+                             chunk_size=50) as coordinator:
+        with pytest.raises(RuntimeError):
+            coordinator.run(make_events(500))
+    failing.join()
+
+
+def test_parse_address():
+    assert cluster.parse_address('127.0.0.1:7000') == ('127.0.0.1', 7000)
+    assert cluster.parse_address('/tmp/worker.sock') == '/tmp/worker.sock'
@@ -0,0 +1,99 @@
+import json
+
+import pytest
+
+import coefficients
+import columnar
+import generator
+import homework
+
+PACKAGES = [package for package in generator.generate(3000, 3)
+            if homework.validate_package(*package) is None]
+
+
+def expected(version: dict) -> list:
+    return [(workout_type, data, homework.message_values(
+        coefficients.training_class(workout_type, version[workout_type])(
+            *data).show_training_info()))
+        for workout_type, data in PACKAGES]
+
+
+def test_base_version_matches_classes():
+    for workout_type, values in coefficients.base_version().items():
+        columns = {name: [value] for name, value in zip(
+            homework.WORKOUT_TYPES[workout_type].FIELDS,
+            dict(PACKAGES)[workout_type])}
+        assert homework.compute_batch(workout_type, columns, values) == (
+            homework.compute_batch(workout_type, columns)
+        ), 'Версия base должна давать те же числа, что и классы.'
+
+
+def test_training_class_overrides_coefficients():
+    version = coefficients.make_version({'RUN': {'COEFF_CALORIE_1': 20}})
+    running = coefficients.training_class('RUN', version['RUN'])
+    assert running is coefficients.training_class('RUN', version['RUN'])
+    assert running.__name__ == 'Running'
+    assert running(15000, 1, 75).get_spent_calories() > (
+        homework.Running(15000, 1, 75).get_spent_calories())
+    assert homework.Running.COEFF_CALORIE_1 == 18
+    with pytest.raises(ValueError, match='LEN'):
+        coefficients.make_version({'RUN': {'LEN': 1}})
+
+
+@pytest.mark.parametrize('overrides', [
+    {'RUN': {'COEFF_CALORIE_1': 18.5}, 'SWM': {'COEFF_CALORIE_2': 2.5}},
+    {'WLK': {'LEN_STEP': 0.7, 'COEFF_CALORIE_2': 0.03},
+     'SWM': {'LEN_STEP': 1.5}},
+])
+def test_recompute_matches_objects(tmp_path, overrides):
+    pytest.importorskip('pyarrow')
+    source = str(tmp_path / 'results.arrow')
+    output = str(tmp_path / 'recomputed.parquet')
+    with columnar.ResultsWriter(source, batch_size=500) as writer:
+        writer.write_packages(PACKAGES)
+    version = coefficients.make_version(overrides)
+    totals = coefficients.recompute(source, output, version, 700)
+    assert [(workout_type, data, homework.message_values(message))
+            for workout_type, data, message
+            in columnar.iter_results(output)] == expected(version), (
+        'Пересчёт должен совпадать с расчётом объектов до последнего бита.'
+    )
+    assert columnar.read_coefficients(output) == version
+    assert sum(count for count, _, _ in totals.values()) == len(PACKAGES)
+    back = str(tmp_path / 'back.arrow')
+    coefficients.recompute(output, back, coefficients.base_version())
+    assert [homework.message_values(message) for _, _, message
+            in columnar.iter_results(back)] == [
+        values for _, _, values in expected(coefficients.base_version())]
+
+
+def test_main_recompute(tmp_path, capsys):
+    pytest.importorskip('pyarrow')
+    source = str(tmp_path / 'results.arrow')
+    versions = tmp_path / 'versions.json'
+    versions.write_text(json.dumps({'v2': {'RUN': {'COEFF_CALORIE_1': 36}}}))
+    with columnar.ResultsWriter(source) as writer:
+        writer.write_packages(PACKAGES)
+    coefficients.main(['recompute', source, '--version', 'v2',
+                       '--versions', str(versions)])
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0].startswith('RUN:') and lines[0].endswith('%)')
+    assert lines[1].endswith('(+0.00%)'), (
+        'Типы без новых коэффициентов не должны меняться.'
+    )
+
+
+def test_version_without_registered_type(tmp_path, cycling):
+    pytest.importorskip('pyarrow')
+    source = str(tmp_path / 'results.arrow')
+    with columnar.ResultsWriter(source) as writer:
+        writer.write_packages(PACKAGES + [('CYC', [1000, 2, 70])])
+    version = coefficients.make_version({'RUN': {'COEFF_CALORIE_1': 20}})
+    assert version['CYC'] == dict(zip(homework.Training.COEFFICIENTS,
+                                      cycling.coefficients()))
+    del version['CYC']
+    totals = coefficients.recompute(source, None, version)
+    assert totals['CYC'][0] == 1
+    assert totals['CYC'][1] == totals['CYC'][2] == 1050, (
+        'Тип вне версии пересчитывается с коэффициентами класса.'
+    )
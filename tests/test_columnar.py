@@ -0,0 +1,79 @@
+import sys
+
+import pytest
+
+import columnar
+import homework
+
+PACKAGES = [('SWM', [720, 1, 80, 25, 40]),
+            ('RUN', [15000, 1, 75]),
+            ('WLK', [9000, 1, 75, 180]),
+            ('RUN', [15000, 1, 5]),
+            ('RUN', [5000, 1.3, 31.7]),
+            (['RUN'], [5000, 1, 30])]
+VALID = [package for package in PACKAGES
+         if homework.validate_package(*package) is None]
+
+
+def expected_results() -> list:
+    return [(workout_type, data, homework.message_values(
+        homework.read_package(workout_type, data).show_training_info()))
+        for workout_type, data in VALID]
+
+
+@pytest.mark.parametrize('name', ['results.parquet', 'results.arrow'])
+def test_round_trip_full_precision(tmp_path, name):
+    pyarrow = pytest.importorskip('pyarrow')
+    pytest.importorskip('pyarrow.parquet')
+    path = str(tmp_path / name)
+    with columnar.ResultsWriter(path, batch_size=2) as writer:
+        assert writer.write_packages(PACKAGES) == 2
+    assert writer.written == len(VALID)
+    result = [(workout_type, data, homework.message_values(message))
+              for workout_type, data, message
+              in columnar.iter_results(path)]
+    assert result == expected_results(), (
+        'Из файла должны читаться те же числа до последнего бита.'
+    )
+    if name.endswith('.parquet'):
+        blocks = pyarrow.parquet.ParquetFile(path).num_row_groups
+    else:
+        blocks = len(list(columnar.iter_batches(path)))
+    assert blocks == 2, 'Строки должны записываться блоками по batch_size.'
+
+
+def test_write_columns_matches_rows(tmp_path):
+    pytest.importorskip('pyarrow')
+    path = str(tmp_path / 'results.arrow')
+    with columnar.ResultsWriter(path) as writer:
+        for workout_type, data in VALID:
+            fields = homework.WORKOUT_TYPES[workout_type].FIELDS
+            writer.write_columns(workout_type, {
+                field: [value] for field, value in zip(fields, data)})
+    table = columnar.read_table(path)
+    assert table.column_names == list(columnar.COLUMNS)
+    assert table.column('height').to_pylist() == [None, None, 180, None]
+    assert [homework.message_values(message) for _, _, message
+            in columnar.iter_results(path)] == [
+        values for _, _, values in expected_results()]
+
+
+def test_registered_type_round_trip(tmp_path, cycling):
+    pytest.importorskip('pyarrow')
+    path = str(tmp_path / 'results.arrow')
+    packages = VALID + [('CYC', [1000, 2, 70])]
+    with columnar.ResultsWriter(path) as writer:
+        writer.write_packages(packages)
+    assert [(workout_type, data, homework.message_values(message))
+            for workout_type, data, message
+            in columnar.iter_results(path)] == expected_results() + [
+        ('CYC', [1000, 2, 70], homework.message_values(
+            cycling(1000, 2, 70).show_training_info()))], (
+        'Тип, зарегистрированный после импорта, должен записываться.'
+    )
+
+
+def test_missing_pyarrow(monkeypatch, tmp_path):
+    monkeypatch.setitem(sys.modules, 'pyarrow', None)
+    with pytest.raises(ImportError, match='pip install pyarrow'):
+        columnar.ResultsWriter(str(tmp_path / 'results.parquet'))
@@ -0,0 +1,111 @@
+import io
+import json
+
+from conftest import Capturing
+
+import deadletter
+import homework
+import pipeline
+from parallel import process_parallel
+
+PACKAGES = [('RUN', [5000, 1, 30]),
+            ('RUN', [1206, 12, 600]),
+            ('XXX', [1, 2, 3]),
+            ('WLK', [9000, 1, 75, 'abc']),
+            ('SWM', [720, 1, 80, 25, 40])]
+
+
+def read_records(path) -> list:
+    return [json.loads(line) for line in path.read_text(
+        encoding='utf-8').splitlines()]
+
+
+def test_rejected_packages_recorded(tmp_path):
+    path = tmp_path / 'dead.jsonl'
+    with deadletter.DeadLetters(str(path), batch_size=2) as dead_letters:
+        messages = list(pipeline.process_packages(PACKAGES, dead_letters))
+    assert [message.training_type for message in messages] == [
+        'Running', 'Swimming'
+    ], 'Отклонённые пакеты не должны мешать корректным.'
+    records = read_records(path)
+    assert [(record['error'], record['field'], record['value'],
+             record['data']) for record in records] == [
+        ('weight_range', 'weight', 600, [1206, 12, 600]),
+        ('unknown_type', None, 3, [1, 2, 3]),
+        ('bad_value', 'height', 'abc', [9000, 1, 75, 'abc']),
+    ], 'В очереди должны быть код ошибки, параметр и исходный пакет.'
+    assert dead_letters.counts == {'weight_range': 1, 'unknown_type': 1,
+                                   'bad_value': 1}
+
+
+def test_calculation_errors_recorded(tmp_path, unsound_packages):
+    path = tmp_path / 'dead.jsonl'
+    with deadletter.DeadLetters(str(path)) as dead_letters:
+        list(pipeline.process_packages(unsound_packages, dead_letters))
+    records = read_records(path)
+    assert [(record['error'], record['data']) for record in records] == [
+        (homework.CALCULATION_ERROR, data) for _, data in unsound_packages
+    ], 'Пакеты, которые не посчитались, должны попадать в очередь.'
+    assert records[2]['field'] == 'speed'
+
+
+def test_unhashable_code_recorded(tmp_path, capsys, monkeypatch):
+    path = tmp_path / 'dead.jsonl'
+    monkeypatch.setattr('sys.stdin', io.StringIO(
+        '{"workout_type": ["RUN"], "data": [5000, 1, 30]}\n'))
+    pipeline.main(['-', '--dead-letters', str(path)])
+    [record] = read_records(path)
+    assert (record['error'], record['workout_type']) == (
+        homework.UNKNOWN_TYPE, ['RUN']), (
+        'Код не строкой должен попадать в очередь как неизвестный.'
+    )
+
+
+def test_parallel_keeps_raw_data(tmp_path):
+    path = tmp_path / 'dead.jsonl'
+    with deadletter.DeadLetters(str(path)) as dead_letters:
+        list(process_parallel(PACKAGES, 2, 2, dead_letters))
+    assert [record['data'] for record in read_records(path)] == [
+        data for workout_type, data in PACKAGES[1:4]]
+
+
+def test_rotation_bounds_files(tmp_path):
+    path = tmp_path / 'dead.jsonl'
+    error = homework.validate_package('RUN', [1206, 12, 600])
+    with deadletter.DeadLetters(str(path), batch_size=10, max_bytes=1000,
+                                backups=2) as dead_letters:
+        for _ in range(200):
+            dead_letters(error)
+    assert sorted(file.name for file in tmp_path.iterdir()) == [
+        'dead.jsonl', 'dead.jsonl.1', 'dead.jsonl.2'
+    ], 'Очередь должна занимать не больше backups + 1 файлов.'
+    assert dead_letters.counts['weight_range'] == 200
+    assert 0 < len(list(deadletter.read_dead_letters(str(path), 2))) < 200
+
+
+def test_replay_and_stats(tmp_path, capsys):
+    path = tmp_path / 'dead.jsonl'
+    replayed = tmp_path / 'replayed.jsonl'
+    with deadletter.DeadLetters(str(path)) as dead_letters:
+        list(pipeline.process_packages(PACKAGES, dead_letters))
+    with path.open('a', encoding='utf-8') as stream:
+        stream.write('{"error": "weight_range", "workout_type": "RUN", '
+                     '"data": [5000, 1, 30]}\n')
+    deadletter.main(['replay', str(path), '--dead-letters', str(replayed)])
+    captured = capsys.readouterr()
+    assert len(captured.out.splitlines()) == 1, (
+        'Исправленный пакет из очереди должен обработаться заново.'
+    )
+    assert [record['data'] for record in read_records(replayed)] == [
+        data for workout_type, data in PACKAGES[1:4]]
+    deadletter.main(['stats', str(path)])
+    assert capsys.readouterr().out.splitlines()[0] == 'weight_range: 2'
+
+
+def test_search_errors_in_values_on_error():
+    errors = []
+    with Capturing() as output:
+        assert not homework.search_errors_in_values(
+            'RUN', [1206, 12, 600], errors.append)
+    assert output == [], 'С on_error сообщение печататься не должно.'
+    assert errors[0].data == [1206, 12, 600]
@@ -0,0 +1,67 @@
+import io
+
+import pytest
+
+import archive
+import generator
+import homework
+import pipeline
+
+
+def test_seeded_stream():
+    assert list(generator.generate(500, seed=7)) == list(
+        generator.generate(500, seed=7)), (
+        'Один seed должен давать один и тот же поток пакетов.'
+    )
+    assert list(generator.generate(500, seed=7)) != list(
+        generator.generate(500, seed=8))
+
+
+def test_valid_packages_respect_bounds():
+    packages = list(generator.generate(20000))
+    assert all(homework.validate_package(*package) is None
+               for package in packages), (
+        'Без invalid_rate все пакеты должны проходить проверку.'
+    )
+    codes = [workout_type for workout_type, _ in packages]
+    for workout_type, share in generator.MIX.items():
+        assert abs(codes.count(workout_type) / len(codes) - share) < 0.02
+
+
+@pytest.mark.parametrize('rate', [0.1, 1.0])
+def test_invalid_rate(rate):
+    packages = list(generator.generate(20000, invalid_rate=rate))
+    rejected = sum(homework.validate_package(*package) is not None
+                   for package in packages)
+    assert rejected / len(packages) == pytest.approx(rate, abs=0.02), (
+        'Доля отклонённых пакетов должна соответствовать invalid_rate.'
+    )
+
+
+def test_duplicate_rate():
+    seen = set()
+    repeated = 0
+    for workout_type, data in generator.generate(20000, duplicate_rate=0.3):
+        key = (workout_type, *data)
+        repeated += key in seen
+        seen.add(key)
+    assert repeated / 20000 == pytest.approx(0.3, abs=0.02)
+
+
+@pytest.mark.parametrize('fmt', ['jsonl', 'csv'])
+def test_text_formats_roundtrip(fmt):
+    packages = list(generator.generate(300, invalid_rate=0.2))
+    stream = io.StringIO()
+    assert generator.WRITERS[fmt](iter(packages), stream) == len(packages)
+    stream.seek(0)
+    assert list(pipeline.read_packages(stream, fmt)) == packages
+
+
+def test_archive_roundtrip(tmp_path):
+    path = str(tmp_path / 'packages.ftrk')
+    generator.main(['300', '--format', 'archive', '--output', path])
+    with archive.Archive(path) as packed:
+        assert list(packed) == list(generator.generate(300))
+    with pytest.raises(SystemExit):
+        generator.main(['300', '--format', 'archive', '--invalid-rate',
+                        '0.1', '--output', path])
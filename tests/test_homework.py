@@ -191,10 +191,11 @@ def test_Training_show_training_info(monkeypatch):
         'Создайте метод `show_training_info` в классе `Training`.'
     )
 
-    def mock_get_spent_calories():
+    def mock_get_spent_calories(self):
         return 100
+    # У экземпляров с __slots__ нет __dict__, подменяем метод класса
     monkeypatch.setattr(
-        training,
+        homework.Training,
         'get_spent_calories',
         mock_get_spent_calories
     )
@@ -384,3 +385,246 @@ def test_main_output(input_data, expected):
     assert get_message_output == expected, (
         'Метод `main` должен печатать результат в консоль.\n'
     )
+
+
+@pytest.mark.parametrize('workout_type, packages', [
+    ('SWM', [[720, 1, 80, 25, 40], [420, 4, 20, 42, 4],
+             [1206, 12, 6, 12, 6], [1200, 2, 80, 50, 25]]),
+    ('RUN', [[9000, 1, 75], [420, 4, 20], [1206, 12, 6], [5000, 1, 30]]),
+    ('WLK', [[9000, 1, 75, 180], [420, 4, 20, 42], [1206, 12, 6, 12],
+             [7531, 1.37, 81.2, 173.5]]),
+])
+def test_compute_batch(workout_type, packages):
+    fields = list(inspect.signature(
+        homework.WORKOUT_TYPES[workout_type]).parameters)
+    columns = {name: [data[i] for data in packages]
+               for i, name in enumerate(fields)}
+    distance, speed, calories = homework.compute_batch(workout_type, columns)
+    for i, data in enumerate(packages):
+        training = homework.read_package(workout_type, data)
+        assert distance[i] == training.get_distance(), (
+            'Дистанция из `compute_batch` должна совпадать с `get_distance`.'
+        )
+        assert speed[i] == training.get_mean_speed(), (
+            'Скорость из `compute_batch` должна совпадать '
+            'с `get_mean_speed`.'
+        )
+        assert calories[i] == training.get_spent_calories(), (
+            'Калории из `compute_batch` должны совпадать '
+            'с `get_spent_calories`.'
+        )
+
+
+def test_InfoMessage_get_message_cached():
+    info_message = homework.InfoMessage('Running', 1, 2, 3, 4)
+    message = info_message.get_message()
+    assert info_message.get_message() is message, (
+        'Повторный `get_message` должен возвращать запомненную строку.'
+    )
+    info_message.calories = 5
+    assert info_message.get_message().endswith('Потрачено ккал: 5.000.'), (
+        'После изменения полей строка должна собираться заново.'
+    )
+
+
+def test_compute_batch_registered_type(cycling):
+    packages = [[1000, 2, 70], [2500, 0.5, 81.5]]
+    columns = dict(zip(cycling.FIELDS, zip(*packages)))
+    results = [cycling(*data).show_training_info() for data in packages]
+    assert list(zip(*homework.compute_batch('CYC', columns))) == [
+        (info.distance, info.speed, info.calories) for info in results
+    ], 'Зарегистрированный тип должен считаться столбцами как объекты.'
+    assert list(homework.compute_calories(
+        'CYC', columns, None, {'COEFF_CALORIE': 1})) == [140, 40.75]
+    assert cycling.COEFF_CALORIE == 7.5
+
+
+@pytest.mark.parametrize('workout_type', ['SWM', 'RUN', 'WLK'])
+def test_format_messages(workout_type):
+    packages = {'SWM': [[720, 1, 80, 25, 40], [1200, 2, 80, 50, 25]],
+                'RUN': [[9000, 1, 75], [5000, 1.37, 30]],
+                'WLK': [[9000, 1, 75, 180], [7531, 1.37, 81.2, 173.5]]}
+    cls = homework.WORKOUT_TYPES[workout_type]
+    columns = dict(zip(cls.FIELDS, zip(*packages[workout_type])))
+    lines = homework.format_messages(
+        cls.__name__, columns['duration'],
+        *homework.compute_batch(workout_type, columns))
+    assert lines == [
+        homework.read_package(workout_type, data).show_training_info()
+        .get_message() for data in packages[workout_type]
+    ], '`format_messages` должен совпадать с `get_message`.'
+
+
+@pytest.mark.parametrize('cls', [
+    'InfoMessage', 'Training', 'Running', 'SportsWalking', 'Swimming'
+])
+def test_slots(cls):
+    assert '__dict__' not in dir(getattr(homework, cls)), (
+        f'Экземпляры `{cls}` не должны иметь `__dict__`.'
+    )
+
+
+def test_TrainingStore():
+    packages = [('SWM', [720, 1, 80, 25, 40]),
+                ('RUN', [15000, 1, 75]),
+                ('WLK', [9000, 1, 75, 180])]
+    store = homework.TrainingStore(packages)
+    assert len(store) == 3
+    for view, (workout_type, data) in zip(store, packages):
+        training = homework.read_package(workout_type, data)
+        assert isinstance(view, type(training)), (
+            'Представление из `TrainingStore` должно быть экземпляром '
+            'класса тренировки.'
+        )
+        assert (view.show_training_info().get_message()
+                == training.show_training_info().get_message())
+        assert view.get_spent_calories() == training.get_spent_calories()
+    assert store[-1].height == 180
+    with pytest.raises(ValueError):
+        store.append('RUN', [1, 2])
+    with pytest.raises(IndexError):
+        store[3]
+
+
+def test_TrainingStore_bad_value_keeps_columns_aligned():
+    store = homework.TrainingStore([('RUN', [15000, 1, 75])])
+    with pytest.raises(TypeError):
+        store.append('RUN', [1, 2, 'x'])
+    assert len(store) == 1
+    assert {len(column) for column in store._columns} == {1}, (
+        'Ошибка в значении не должна оставлять столбцы разной длины.'
+    )
+    store.append('WLK', [9000, 1, 75, 180])
+    assert store[1].height == 180
+
+
+@pytest.mark.parametrize('workout_type, data, field, value', [
+    ('RUN', [9000, 1, 75], 'duration', 2),
+    ('RUN', [9000, 1, 75], 'weight', 80),
+    ('WLK', [9000, 1, 75, 180], 'height', 120),
+    ('SWM', [720, 1, 80, 25, 40], 'count_pool', 20),
+    ('SWM', [720, 1, 80, 25, 40], 'action', 1000),
+])
+def test_metrics_cache_reset(workout_type, data, field, value):
+    training = homework.read_package(workout_type, data)
+    first = training.show_training_info()
+    assert training.get_spent_calories() == first.calories
+    setattr(training, field, value)
+    assert getattr(training, field) == value
+    changed = list(data)
+    changed[homework.WORKOUT_TYPES[workout_type].FIELDS.index(field)] = value
+    expected = homework.read_package(workout_type, changed)
+    for method in ('get_distance', 'get_mean_speed', 'get_spent_calories'):
+        assert (getattr(training, method)()
+                == getattr(expected, method)()), (
+            f'После изменения `{field}` метод `{method}` должен '
+            'возвращать пересчитанное значение.'
+        )
+
+
+@pytest.mark.parametrize('input_data, expected', [
+    (('SWM', [720, 1, 80, 25, 40]), None),
+    (('XXX', [720, 1, 80]),
+     homework.ValidationError('XXX', homework.UNKNOWN_TYPE, None, 3)),
+    (('RUN', [720, 1]),
+     homework.ValidationError('RUN', homework.WRONG_LENGTH, None, 2)),
+    (('RUN', None),
+     homework.ValidationError('RUN', homework.WRONG_LENGTH, None, None)),
+    (('RUN', 'abc'),
+     homework.ValidationError('RUN', homework.WRONG_LENGTH, None, None)),
+    (('XXX', 5),
+     homework.ValidationError('XXX', homework.UNKNOWN_TYPE, None, None)),
+    ((['RUN'], [5000, 1, 30]),
+     homework.ValidationError(['RUN'], homework.UNKNOWN_TYPE, None, 3)),
+    ((None, [5000, 1, 30]),
+     homework.ValidationError(None, homework.UNKNOWN_TYPE, None, 3)),
+    (('RUN', [720, 'abc', 80]),
+     homework.ValidationError('RUN', homework.BAD_VALUE, 'duration', 'abc')),
+    (('RUN', [720, 1, -5]),
+     homework.ValidationError('RUN', homework.BAD_VALUE, 'weight', -5)),
+    (('SWM', [720, 1, 200, 25, 40]),
+     homework.ValidationError('SWM', homework.WEIGHT_RANGE, 'weight', 200)),
+    (('WLK', [9000, 1, 75, 300]),
+     homework.ValidationError('WLK', homework.HEIGHT_RANGE, 'height', 300)),
+])
+def test_validate_package(input_data, expected):
+    assert homework.validate_package(*input_data) == expected, (
+        '`validate_package` должна возвращать описание первой ошибки '
+        'пакета или None.'
+    )
+    with Capturing() as output:
+        result = homework.search_errors_in_values(*input_data)
+    assert result is (expected is None)
+    assert output == ([] if expected is None
+                      else expected.message.splitlines())
+
+
+def test_validate_batch():
+    columns = {'action': [9000, 9000, 9000, 9000, 9000],
+               'duration': [1, 'abc', 1, 1, 1],
+               'weight': [75, 75, 5, 75, 75],
+               'height': [180, 180, 180, 20, 180]}
+    mask = homework.validate_batch('WLK', columns)
+    assert list(mask) == [0, 1, 1, 1, 0], (
+        '`validate_batch` должна отмечать отклонённые пакеты единицей.'
+    )
+    columns['height'].pop()
+    with pytest.raises(ValueError):
+        homework.validate_batch('WLK', columns)
+
+
+def test_calculate_package(unsound_packages):
+    info_message, error = homework.calculate_package('RUN', [15000, 1, 75])
+    assert error is None
+    assert info_message.get_message() == homework.read_package(
+        'RUN', [15000, 1, 75]).show_training_info().get_message()
+    assert homework.calculate_package('RUN', [15000, 1, 5]) == (
+        None, homework.ValidationError('RUN', homework.WEIGHT_RANGE,
+                                       'weight', 5))
+    for workout_type, data in unsound_packages:
+        info_message, error = homework.calculate_package(workout_type, data)
+        assert info_message is None
+        assert (error.code, error.data) == (
+            homework.CALCULATION_ERROR, data), (
+            'Ошибка расчёта должна возвращаться, а не выбрасываться.'
+        )
+        assert 'не удалось посчитать' in error.message
+
+
+@pytest.mark.parametrize('input_data', [
+    ('SWM', [720, 1, 80, 25, 40]),
+    ('RUN', [15000, 1, 75]),
+    ('WLK', [9000, 1, 75, 180]),
+])
+def test_build_training(input_data):
+    expected = homework.read_package(*input_data)
+    result = homework.build_training(*input_data)
+    assert type(result) is type(expected)
+    assert (result.show_training_info().get_message()
+            == expected.show_training_info().get_message()), (
+        '`build_training` должна создавать такую же тренировку, '
+        'как `read_package`.'
+    )
+
+
+def test_register_training(monkeypatch):
+    for name in ('WORKOUT_TYPES', 'SCHEMAS', 'BUILDERS'):
+        monkeypatch.setattr(homework, name, dict(getattr(homework, name)))
+
+    @homework.register_training('CYC')
+    class Cycling(homework.Training):
+        __slots__ = ()
+        COEFF_CALORIE = 7.5
+
+        def get_spent_calories(self):
+            return self.COEFF_CALORIE * self.weight * self.duration
+
+    training = homework.read_package('CYC', [1000, 2, 70])
+    assert isinstance(training, Cycling)
+    assert homework.build_training('CYC', [1000, 2, 70]).weight == 70
+    assert homework.validate_package('CYC', [1000, 2, 70]) is None
+    assert homework.validate_package('CYC', [1000, 2, 7]).code == (
+        homework.WEIGHT_RANGE)
+    assert training.get_spent_calories() == 1050
+    with pytest.raises(ValueError):
+        homework.register_training('RUN')(Cycling)
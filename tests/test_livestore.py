@@ -0,0 +1,126 @@
+import threading
+import time
+
+import homework
+import livestore
+from aggregation import SECONDS_IN_DAY
+
+DAY = 19_700 * SECONDS_IN_DAY
+RUN = homework.build_training('RUN', [5000, 1, 75]).show_training_info()
+WLK = homework.build_training('WLK', [9000, 1, 75, 180]).show_training_info()
+
+
+def test_latest_and_today():
+    store = livestore.LiveStore(max_delay=60)
+    store.add_many([('u', DAY + 100, 'RUN', RUN),
+                    ('u', DAY + 300, 'WLK', WLK),
+                    ('u', DAY + 200, 'RUN', RUN),
+                    ('u', DAY - 100, 'RUN', RUN),
+                    ('v', DAY - 100, 'RUN', RUN)])
+    assert store.latest('u') is None, (
+        'Результаты видны только после публикации пачки.'
+    )
+    store.flush()
+    assert store.latest('u') == (DAY + 300, 'WLK', WLK)
+    assert store.latest('u', 'RUN') == (DAY + 200, 'RUN', RUN)
+    assert store.latest('u', 'SWM') is None
+    assert store.latest('nobody') is None
+    today = store.today('u', DAY + 500)
+    assert today.count == 3, 'Результат прошлого дня не входит в сегодня.'
+    assert today.calories == RUN.calories * 2 + WLK.calories
+    assert store.today('u', DAY + 500, 'WLK').count == 1
+    assert store.today('v', DAY + 500).count == 0
+    assert store.today('v', DAY - 1).count == 1
+
+
+def test_snapshot_does_not_change():
+    store = livestore.LiveStore(batch_size=2, max_delay=60)
+    store.add('u', DAY, 'RUN', RUN)
+    store.add('u', DAY + 1, 'RUN', RUN)
+    snapshot = store.snapshot
+    store.add('u', DAY + 2, 'WLK', WLK)
+    store.add('w', DAY + 3, 'RUN', RUN)
+    assert snapshot.today('u', DAY).count == 2, (
+        'Опубликованный срез не должен меняться при записи.'
+    )
+    assert snapshot.latest('w') is None
+    assert store.today('u', DAY).count == 3
+    assert store.snapshot.written == 4
+
+
+def test_readers_see_whole_batches():
+    store = livestore.LiveStore(batch_size=2, shards=4)
+    errors = []
+    done = threading.Event()
+
+    def reader():
+        while not done.is_set():
+            snapshot = store.snapshot
+            first = snapshot.today('a', DAY).count
+            second = snapshot.today('b', DAY).count
+            if first != second:
+                errors.append((first, second))
+
+    threads = [threading.Thread(target=reader) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for index in range(2000):
+        store.add_many([('a', DAY + index, 'RUN', RUN),
+                        ('b', DAY + index, 'RUN', RUN)])
+    done.set()
+    for thread in threads:
+        thread.join()
+    assert errors == [], 'Читатель не должен видеть половину пачки.'
+    assert store.today('a', DAY).count == 2000
+
+
+def test_query_pool():
+    store = livestore.LiveStore()
+    store.add_many([(user_id, DAY + user_id, 'RUN', RUN)
+                    for user_id in range(10)])
+    store.flush()
+    with livestore.QueryPool(store, workers=2) as pool:
+        assert pool.latest(3).result() == (DAY + 3, 'RUN', RUN)
+        assert pool.today(3, DAY).result().count == 1
+        board = pool.dashboard([1, 2, 42], DAY).result()
+    assert [latest for latest, _ in board] == [
+        (DAY + 1, 'RUN', RUN), (DAY + 2, 'RUN', RUN), None]
+    assert [totals.count for _, totals in board] == [1, 1, 0]
+
+
+def test_shards_grow_with_users():
+    store = livestore.LiveStore(batch_size=10, shards=2)
+    store.add_many([(user_id, DAY, 'RUN', RUN) for user_id in range(100)])
+    snapshot = store.snapshot
+    assert snapshot.users == 100
+    assert len(snapshot.shards) * livestore.SHARD_USERS >= 100, (
+        'Шардов должно становиться больше вместе с пользователями.'
+    )
+    store.add_many([(user_id, DAY + 1, 'RUN', RUN) for user_id in range(10)])
+    assert store.snapshot.users == 100, 'Повторный пользователь не новый.'
+    assert all(store.today(user_id, DAY).count == 2 for user_id in range(10))
+    assert all(store.latest(user_id) == (DAY, 'RUN', RUN)
+               for user_id in range(10, 100))
+    assert snapshot.today(0, DAY).count == 1, (
+        'Перекладывание по шардам не должно менять старый срез.'
+    )
+
+
+def test_results_published_after_max_delay():
+    store = livestore.LiveStore(max_delay=0.05)
+    store.add('u', DAY, 'RUN', RUN)
+    snapshot = store.snapshot
+    time.sleep(0.06)
+    assert store.latest('u') == (DAY, 'RUN', RUN), (
+        'Запрос должен видеть результат не позже чем через max_delay.'
+    )
+    assert snapshot.latest('u') is None
+    store.add('v', DAY, 'RUN', RUN)
+    time.sleep(0.06)
+    with livestore.QueryPool(store, workers=1) as pool:
+        assert pool.dashboard(['v'], DAY).result()[0][1].count == 1
+    time.sleep(0.06)
+    store.add_many([('w', DAY, 'RUN', RUN)])
+    assert store.snapshot.latest('w') == (DAY, 'RUN', RUN), (
+        'Запись после max_delay без публикации публикует пачку.'
+    )
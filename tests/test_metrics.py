@@ -0,0 +1,81 @@
+import json
+
+from conftest import Capturing
+
+import archive
+import homework
+import metrics
+import pipeline
+
+PACKAGES = [('SWM', [720, 1, 80, 25, 40]),
+            ('RUN', [15000, 1, 75]),
+            ('WLK', [9000, 1, 75, 180]),
+            ('RUN', [15000, 1, 5])]
+
+
+def test_disabled_leaves_originals():
+    original = homework.read_package
+    validate = homework.validate_package
+    stage_metrics = metrics.Metrics()
+    with stage_metrics:
+        assert homework.read_package.__wrapped__ is original
+        assert archive.validate_package is homework.validate_package, (
+            'Обёртка должна ставиться и в модули, импортировавшие функцию.'
+        )
+        assert archive.validate_package is not validate
+    assert homework.read_package is original, (
+        'После выключения замеров должны вернуться исходные функции.'
+    )
+    assert archive.validate_package is homework.validate_package
+    assert 'show_training_info' in vars(homework.Training)
+    assert not stage_metrics.enabled
+
+
+def test_counts_by_stage_and_type():
+    stage_metrics = metrics.Metrics()
+    with stage_metrics, Capturing():
+        for workout_type, data in PACKAGES:
+            if homework.search_errors_in_values(workout_type, data):
+                training = homework.read_package(workout_type, data)
+                training.show_training_info().get_message()
+        list(pipeline.process_packages(PACKAGES))
+    counts = {stage: {workout_type: stats['count']
+                      for workout_type, stats in by_type.items()}
+              for stage, by_type in stage_metrics.as_dict().items()}
+    assert counts == {
+        'search_errors_in_values': {'RUN': 2, 'SWM': 1, 'WLK': 1},
+        'validate_package': {'RUN': 4, 'SWM': 2, 'WLK': 2},
+        'read_package': {'RUN': 1, 'SWM': 1, 'WLK': 1},
+        'build_training': {'RUN': 1, 'SWM': 1, 'WLK': 1},
+        'show_training_info': {'RUN': 2, 'SWM': 2, 'WLK': 2},
+        'get_message': {'RUN': 1, 'SWM': 1, 'WLK': 1},
+    }, 'Замеры должны учитывать каждый вызов этапа по коду тренировки.'
+
+
+def test_prometheus_snapshot():
+    stage_metrics = metrics.Metrics()
+    stage_metrics.observe('read_package', 'RUN', 3e-6)
+    stage_metrics.observe('read_package', 'a"b', 1.0)
+    text = stage_metrics.prometheus()
+    labels = 'stage="read_package",workout_type="RUN"'
+    assert f'fitness_stage_seconds_bucket{{{labels},le="2.5e-06"}} 0' in text
+    assert f'fitness_stage_seconds_bucket{{{labels},le="5e-06"}} 1' in text
+    assert f'fitness_stage_seconds_bucket{{{labels},le="+Inf"}} 1' in text
+    assert f'fitness_stage_seconds_count{{{labels}}} 1' in text
+    assert 'workout_type="a\\"b"' in text, (
+        'Кавычки в метках Prometheus должны экранироваться.'
+    )
+    snapshot = json.loads(stage_metrics.json())
+    assert snapshot['read_package']['RUN']['buckets']['+Inf'] == 1
+
+
+def test_main_profile_and_metrics(tmp_path, capsys):
+    path = tmp_path / 'packages.jsonl'
+    path.write_text('\n'.join(json.dumps(package) for package in PACKAGES),
+                    encoding='utf-8')
+    pipeline.main([str(path), '--profile', '--metrics', 'prometheus'])
+    captured = capsys.readouterr()
+    assert len(captured.out.splitlines()) == 3
+    assert 'tottime' in captured.err, 'Ожидался отчёт cProfile в stderr.'
+    assert 'fitness_stage_seconds_count' in captured.err
+    assert archive.validate_package is homework.validate_package
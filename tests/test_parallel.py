@@ -0,0 +1,34 @@
+import pytest
+
+import parallel
+import pipeline
+
+PACKAGES = [('SWM', [720, 1, 80, 25, 40]),
+            ('RUN', [5000, 1, 30]),
+            ('WLK', [9000, 1, 75, 180]),
+            ('RUN', [15000, 1, 75]),
+            ('SWM', [1200, 2, 80, 50, 25]),
+            ('RUN', [5000, 1, 300])] * 7
+
+
+def test_chunked():
+    chunks = list(parallel.chunked(range(7), 3))
+    assert chunks == [[0, 1, 2], [3, 4, 5], [6]]
+
+
+@pytest.mark.parametrize('workers, chunk_size', [(1, 100), (2, 3)])
+def test_process_parallel_matches_serial(workers, chunk_size,
+                                         unsound_packages):
+    packages = PACKAGES + unsound_packages
+    expected_errors, errors = [], []
+    expected = [info_message.get_message()
+                for info_message in pipeline.process_packages(
+                    packages, expected_errors.append)]
+    result = [info_message.get_message()
+              for info_message in parallel.process_parallel(
+                  iter(packages), workers, chunk_size, errors.append)]
+    assert result == expected, (
+        'Параллельная обработка должна давать те же сообщения '
+        'в том же порядке, что и последовательная.'
+    )
+    assert errors == expected_errors
@@ -0,0 +1,84 @@
+import io
+
+import pytest
+from conftest import Capturing
+
+import homework
+import pipeline
+
+
+@pytest.mark.parametrize('text, fmt', [
+    ('{"workout_type": "SWM", "data": [720, 1, 80, 25, 40]}\n'
+     '\n'
+     '["RUN", [5000, 1, 30]]\n', 'jsonl'),
+    ('SWM,720,1,80,25,40\n'
+     'RUN,5000,1,30\n', 'csv'),
+])
+def test_read_packages(text, fmt):
+    packages = list(pipeline.read_packages(io.StringIO(text), fmt))
+    assert packages == [('SWM', [720, 1, 80, 25, 40]),
+                        ('RUN', [5000, 1, 30])], (
+        'Пакеты должны читаться в виде пар (код тренировки, параметры).'
+    )
+
+
+@pytest.mark.parametrize('line', ['{', '{"workout_type": "RUN"}', '5'])
+def test_read_jsonl_bad_line(line):
+    with pytest.raises(ValueError, match='Строка 2'):
+        list(pipeline.read_jsonl(io.StringIO(f'["RUN", [1, 1, 20]]\n{line}\n')))
+
+
+def test_process_packages_matches_main():
+    packages = [('SWM', [720, 1, 80, 25, 40]),
+                ('RUN', [5000, 1, 30]),
+                ('WLK', [9000, 1, 75, 180])]
+    with Capturing() as expected:
+        for workout_type, data in packages:
+            homework.main(homework.read_package(workout_type, data))
+    result = [info_message.get_message()
+              for info_message in pipeline.process_packages(iter(packages))]
+    assert result == expected, (
+        'Потоковая обработка должна давать те же сообщения, что и `main`.'
+    )
+
+
+def test_process_packages_reports_calculation_errors(unsound_packages):
+    errors = []
+    result = list(pipeline.process_packages(
+        [('RUN', [5000, 1, 30]), *unsound_packages], errors.append))
+    assert len(result) == 1
+    assert [error.code for error in errors] == [
+        homework.CALCULATION_ERROR] * len(unsound_packages), (
+        'Пакет, который не посчитался, должен уходить в `on_error`.'
+    )
+    assert [error.data for error in errors] == [
+        data for _, data in unsound_packages]
+
+
+def test_process_packages_skips_invalid():
+    packages = [('RUN', [5000, 1, 30]),
+                ('RUN', [1206, 12, 600]),
+                ('XXX', [1, 2, 3]),
+                ('WLK', [9000, 1, 75, 'abc']),
+                ('RUN', None)]
+    errors = []
+    with Capturing() as output:
+        result = list(pipeline.process_packages(packages, errors.append))
+    assert len(result) == 1, 'Некорректные пакеты должны пропускаться.'
+    assert [error.code for error in errors] == [
+        homework.WEIGHT_RANGE, homework.UNKNOWN_TYPE, homework.BAD_VALUE,
+        homework.WRONG_LENGTH
+    ], 'Ошибки пакетов должны передаваться в `on_error` по порядку.'
+    assert output == [], 'Потоковая обработка не должна печатать ошибки.'
+
+
+def test_main_csv(tmp_path):
+    path = tmp_path / 'packages.csv'
+    path.write_text('WLK,9000,1,75,180\n', encoding='utf-8')
+    with Capturing() as output:
+        pipeline.main([str(path)])
+    assert output == ['Тип тренировки: SportsWalking; '
+                      'Длительность: 1.000 ч.; '
+                      'Дистанция: 5.850 км; '
+                      'Ср. скорость: 5.850 км/ч; '
+                      'Потрачено ккал: 157.500.']
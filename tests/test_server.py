@@ -0,0 +1,60 @@
+import asyncio
+import json
+
+import homework
+import server
+
+
+async def exchange(payload: bytes) -> list:
+    srv = await server.start(port=0)
+    port = srv.sockets[0].getsockname()[1]
+    async with srv:
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(payload)
+        writer.write_eof()
+        lines = [json.loads(line) async for line in reader]
+        writer.close()
+    return lines
+
+
+def test_responses_in_order():
+    payload = (b'["RUN", [5000, 1, 30]]\n'
+               b'{"workout_type": "WLK", "data": [9000, 1, 75, 300]}\n'
+               b'not json\n'
+               b'\n'
+               b'["SWM", [720, 1, 80, 25, 40]]')
+    responses = asyncio.run(exchange(payload))
+    assert [response.get('training_type', response.get('error'))
+            for response in responses] == [
+        'Running', 'height_range', server.BAD_FRAME, 'Swimming'
+    ], 'Сервер должен отвечать на каждый пакет в порядке получения.'
+    assert responses[0]['calories'] == 69.3
+    assert responses[1]['field'] == 'height'
+    assert responses[1]['value'] == 300
+
+
+def test_calculation_errors_do_not_drop_connection(unsound_packages):
+    packages = [('RUN', [5000, 1, 30]), *unsound_packages,
+                ('SWM', [720, 1, 80, 25, 40])]
+    payload = ''.join(json.dumps(package) + '\n' for package in packages)
+    responses = asyncio.run(exchange(payload.encode()))
+    assert [response.get('training_type', response.get('error'))
+            for response in responses] == [
+        'Running', *[homework.CALCULATION_ERROR] * 3, 'Swimming'
+    ], 'Пакет с непосчитанными показателями не должен рвать соединение.'
+    assert responses[1]['workout_type'] == 'WLK'
+    assert responses[3]['field'] == 'speed'
+
+
+def test_load_test():
+    async def run():
+        srv = await server.start(port=0)
+        port = srv.sockets[0].getsockname()[1]
+        async with srv:
+            return await server.load_test(
+                server.connector('127.0.0.1', port), 3,
+                server.SAMPLE_PACKAGES * 5, batch=4)
+
+    stats = asyncio.run(run())
+    assert stats['packages'] == 3 * len(server.SAMPLE_PACKAGES) * 5
+    assert 0 < stats['p50_ms'] <= stats['p99_ms']
@@ -0,0 +1,92 @@
+import random
+
+import pytest
+
+import homework
+import session
+
+PARAMS = {'RUN': {'weight': 75},
+          'WLK': {'weight': 75, 'height': 180},
+          'SWM': {'weight': 80, 'length_pool': 25}}
+
+
+def make_session(workout_type, seconds=1800, start=1000.0):
+    rnd = random.Random(0)
+    training_session = session.TrainingSession(workout_type, start,
+                                               **PARAMS[workout_type])
+    training_session.extend(
+        (start + second, rnd.randint(0, 3), second % 30 == 0)
+        for second in range(1, seconds + 1))
+    return training_session
+
+
+@pytest.mark.parametrize('workout_type', ['RUN', 'WLK', 'SWM'])
+def test_single_interval_matches_summary(workout_type):
+    training_session = make_session(workout_type)
+    columns = training_session.intervals(
+        [(training_session.start, training_session.last)])
+    info_message = training_session.show_training_info()
+    assert (columns['distance'][0], columns['speed'][0],
+            columns['calories'][0]) == (
+        info_message.distance, info_message.speed, info_message.calories
+    ), 'Интервал на всю тренировку должен совпадать с итогами до бита.'
+    assert info_message.duration == 0.5
+
+
+@pytest.mark.parametrize('workout_type', ['RUN', 'WLK', 'SWM'])
+def test_splits_match_trainings(workout_type):
+    training_session = make_session(workout_type, seconds=1000)
+    splits = training_session.splits(300)
+    assert list(splits['duration']) == [300 / 3600] * 3 + [100 / 3600]
+    assert sum(splits['action']) == training_session.package()[0]
+    cls = homework.WORKOUT_TYPES[workout_type]
+    pools = [10, 10, 10, 3]
+    for index, count_pool in enumerate(pools):
+        values = dict(PARAMS[workout_type], count_pool=count_pool,
+                      action=splits['action'][index],
+                      duration=splits['duration'][index])
+        training = cls(*[values[field] for field in cls.FIELDS])
+        assert splits['calories'][index] == training.get_spent_calories(), (
+            'Показатели отрезка должны считаться по формулам тренировки.'
+        )
+
+
+def test_totals_are_incremental():
+    training_session = session.TrainingSession('RUN', 0.0, weight=75)
+    training_session.add(1.0, 2)
+    assert training_session.package() == [2.0, 1 / 3600, 75]
+    training_session.add(3.0, 4)
+    assert training_session.package() == [6.0, 3 / 3600, 75]
+    with pytest.raises(ValueError):
+        training_session.add(3.0, 1)
+    assert len(training_session) == 2
+
+
+def test_rolling_windows():
+    training_session = session.TrainingSession('RUN', 0.0, weight=75)
+    training_session.extend((float(second), 1) for second in range(1, 61))
+    windows = training_session.rolling(20, 10)
+    assert list(windows['end']) == [10.0, 20.0, 30.0, 40.0, 50.0, 60.0]
+    assert list(windows['begin']) == [0.0, 0.0, 10.0, 20.0, 30.0, 40.0]
+    assert list(windows['action']) == [10.0, 20.0, 20.0, 20.0, 20.0, 20.0]
+
+
+def test_missing_params():
+    with pytest.raises(TypeError):
+        session.TrainingSession('WLK', 0.0, weight=75)
+
+
+def test_empty_session_and_intervals():
+    training_session = session.TrainingSession('RUN', 0.0, weight=75)
+    with pytest.raises(ValueError, match='нет отсчётов'):
+        training_session.show_training_info()
+    assert list(training_session.splits(10)['calories']) == [], (
+        'Отрезков тренировки без отсчётов нет.'
+    )
+    training_session.extend((float(second), 1) for second in range(1, 31))
+    with pytest.raises(ValueError, match='Пустой интервал'):
+        training_session.intervals([(0.0, 10.0), (10.0, 10.0)])
+    with pytest.raises(ValueError):
+        training_session.rolling(0, 10)
+    with pytest.raises(ValueError):
+        training_session.splits(0)
@@ -0,0 +1,79 @@
+import sqlite3
+import threading
+
+import pytest
+
+import homework
+import storage
+
+PACKAGES = [('SWM', [720, 1, 80, 25, 40]),
+            ('RUN', [15000, 1, 75]),
+            ('WLK', [9000, 1, 75, 180])]
+
+
+def make_results():
+    return [(user_id, float(timestamp), workout_type,
+             homework.build_training(workout_type, data).show_training_info())
+            for user_id in (1, 2)
+            for timestamp, (workout_type, data) in enumerate(PACKAGES * 2)]
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = str(tmp_path / 'results.sqlite')
+    with storage.ResultStore(path, batch_size=4) as store:
+        store.add_many(make_results())
+        assert store.written == 12, 'Строки должны записываться пачками.'
+    return path
+
+
+def test_wal_and_indexes(path):
+    connection = sqlite3.connect(path)
+    assert connection.execute('PRAGMA journal_mode').fetchone() == ('wal',)
+    plan = ' '.join(row[-1] for row in connection.execute(
+        'EXPLAIN QUERY PLAN ' + storage.SELECT_USER, (1, 0.0, 10.0)))
+    assert 'results_user_ts' in plan, 'Запрос должен идти по индексу.'
+    plan = ' '.join(row[-1] for row in connection.execute(
+        'EXPLAIN QUERY PLAN ' + storage.SELECT_TYPE, ('RUN', 0.0, 10.0)))
+    assert 'results_type_ts' in plan
+    connection.close()
+
+
+def test_queries(path):
+    with storage.ReaderPool(path, size=2) as pool:
+        rows = pool.user_results(2, 1.0, 4.0)
+        assert [(row[1], row[2]) for row in rows] == [
+            (1.0, 'RUN'), (2.0, 'WLK'), (3.0, 'SWM')
+        ], 'Запрос должен вернуть строки пользователя за период по времени.'
+        info_message = homework.build_training(*PACKAGES[1]) \
+            .show_training_info()
+        assert rows[0][3:] == (info_message.training_type,
+                               info_message.duration, info_message.distance,
+                               info_message.speed, info_message.calories)
+        assert len(pool.type_results('SWM')) == 4
+        totals = pool.user_totals(1)
+        assert totals['RUN']['count'] == 2
+        assert totals['RUN']['calories'] == pytest.approx(
+            info_message.calories * 2)
+
+
+def test_concurrent_readers(path):
+    counts = []
+    with storage.ReaderPool(path, size=2) as pool:
+        def read():
+            for _ in range(50):
+                counts.append(len(pool.user_results(1)))
+
+        threads = [threading.Thread(target=read) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        with storage.ResultStore(path) as store:
+            store.add_many(make_results())
+        for thread in threads:
+            thread.join()
+    assert len(counts) == 200
+    assert set(counts) <= {6, 12}, (
+        'Читатели должны видеть только завершённые пачки.'
+    )
+    with storage.ReaderPool(path, size=1) as pool:
+        assert len(pool.user_results(1)) == 12
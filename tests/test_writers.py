@@ -0,0 +1,83 @@
+import io
+import json
+import random
+
+import pytest
+
+import homework
+import writers
+
+
+def make_messages():
+    rnd = random.Random(0)
+    messages = [homework.InfoMessage('Swimming', 1, 75, 1, 80),
+                homework.InfoMessage('Running', 12, 0.7839, 0.065325,
+                                     -81.32032799999999)]
+    messages.extend(
+        homework.InfoMessage('SportsWalking', rnd.uniform(0, 5),
+                             rnd.uniform(0, 50), rnd.uniform(0, 30),
+                             rnd.uniform(-100, 1000))
+        for _ in range(200))
+    return messages
+
+
+def test_text_matches_get_message():
+    messages = make_messages()
+    stream = io.StringIO()
+    with writers.MessageWriter(stream, batch_size=7) as writer:
+        writer.write(messages[0])
+        writer.write_many(messages[1:])
+    assert stream.getvalue().splitlines() == [
+        info_message.get_message() for info_message in messages
+    ], 'Текстовый вывод должен совпадать с `get_message`.'
+    assert writer.written == len(messages)
+
+
+@pytest.mark.parametrize('fmt', ['csv', 'jsonl'])
+def test_full_precision(fmt):
+    messages = make_messages()
+    stream = io.StringIO()
+    with writers.MessageWriter(stream, fmt) as writer:
+        writer.write_many(messages)
+    lines = stream.getvalue().splitlines()
+    if fmt == 'csv':
+        assert lines.pop(0) == writers.CSV_HEADER.strip()
+        rows = [line.split(',') for line in lines]
+    else:
+        rows = [list(json.loads(line).values()) for line in lines]
+    for row, info_message in zip(rows, messages):
+        assert row[0] == info_message.training_type
+        assert [float(value) for value in row[1:]] == [
+            info_message.duration, info_message.distance,
+            info_message.speed, info_message.calories
+        ], 'Числа должны выводиться без потери точности.'
+
+
+def test_buffered_writes():
+    class CountingStream(io.StringIO):
+        writes = 0
+
+        def write(self, text):
+            self.writes += 1
+            return super().write(text)
+
+    stream = CountingStream()
+    with writers.MessageWriter(stream, batch_size=100) as writer:
+        writer.write_many(make_messages())
+    assert stream.writes == 3, 'Сообщения должны записываться блоками.'
+
+
+@pytest.mark.parametrize('fmt', ['text', 'csv', 'jsonl'])
+def test_write_columns_matches_write_many(fmt):
+    messages = [info_message for info_message in make_messages()
+                if info_message.training_type == 'SportsWalking']
+    expected = io.StringIO()
+    with writers.MessageWriter(expected, fmt) as writer:
+        writer.write_many(messages)
+    stream = io.StringIO()
+    with writers.MessageWriter(stream, fmt, batch_size=7) as writer:
+        writer.write_columns('SportsWalking', *[
+            [getattr(info_message, field) for info_message in messages]
+            for field in ('duration', 'distance', 'speed', 'calories')])
+    assert stream.getvalue() == expected.getvalue()
+    assert writer.written == len(messages)
@@ -0,0 +1,91 @@
+"""Буферизованный вывод сообщений о тренировках.
+
+Сообщения форматируются в строки и накапливаются в буфере, который
+записывается в поток одним вызовом write. Подходит любой текстовый
+поток: файл, sys.stdout, канал или socket.makefile('w').
+
+Форматы вывода:
+* text - строки get_message, как печатает main;
+* csv - заголовок и значения с полной точностью;
+* jsonl - по объекту JSON в строке.
+"""
+from itertools import islice, repeat
+from typing import Iterable, TextIO
+
+from homework import MESSAGE_TEMPLATE, InfoMessage, message_values
+
+TEXT_TEMPLATE = MESSAGE_TEMPLATE + '\n'
+CSV_HEADER = 'training_type,duration,distance,speed,calories\n'
+CSV_TEMPLATE = '%s,%r,%r,%r,%r\n'
+# training_type - имя класса тренировки, экранирование в JSON не нужно
+JSONL_TEMPLATE = ('{"training_type": "%s", "duration": %r, '
+                  '"distance": %r, "speed": %r, "calories": %r}\n')
+
+TEMPLATES = {'text': TEXT_TEMPLATE,
+             'csv': CSV_TEMPLATE,
+             'jsonl': JSONL_TEMPLATE}
+HEADERS = {'csv': CSV_HEADER}
+
+
+class MessageWriter:
+    """Запись сообщений о тренировках крупными блоками.
+
+    Строки копятся в буфере и уходят в поток, когда их набирается
+    batch_size, а также при flush и выходе из блока with.
+    """
+
+    def __init__(self, stream: TextIO, fmt: str = 'text',
+                 batch_size: int = 4096) -> None:
+        self.stream = stream
+        self.batch_size = batch_size
+        self.format_line = TEMPLATES[fmt].__mod__
+        self.buffer = []
+        self.written = 0
+        if fmt in HEADERS:
+            self.stream.write(HEADERS[fmt])
+
+    def write(self, info_message: InfoMessage) -> None:
+        """Добавить сообщение в буфер."""
+        self.buffer.append(self.format_line(message_values(info_message)))
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def write_many(self, messages: Iterable[InfoMessage]) -> None:
+        """Добавить в буфер все сообщения из messages."""
+        self.extend(map(self.format_line, map(message_values, messages)))
+
+    def write_columns(self, training_type: str, durations, distances,
+                      speeds, calories) -> None:
+        """Добавить в буфер сообщения из столбцов показателей.
+
+        Объекты InfoMessage не создаются, столбцы подходят
+        из compute_batch.
+        """
+        lines = map(self.format_line,
+                    zip(repeat(training_type), durations, distances,
+                        speeds, calories))
+        self.extend(lines)
+
+    def extend(self, lines: Iterable[str]) -> None:
+        """Добавить готовые строки, сбрасывая буфер по batch_size."""
+        lines = iter(lines)
+        while True:
+            self.buffer.extend(
+                islice(lines, self.batch_size - len(self.buffer)))
+            if len(self.buffer) < self.batch_size:
+                break
+            self.flush()
+
+    def flush(self) -> None:
+        """Записать накопленные строки в поток."""
+        if self.buffer:
+            self.stream.write(''.join(self.buffer))
+            self.written += len(self.buffer)
+            self.buffer.clear()
+        self.stream.flush()
+
+    def __enter__(self) -> 'MessageWriter':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.flush()